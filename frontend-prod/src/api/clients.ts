@@ -3,11 +3,20 @@ import {checkTokenExpiry} from "./login";
 
 export interface IContactedInfo {
     count: number,
-    next: string,
-    prev: string,
+    next: string | null,
+    previous: string | null,
     results: IContacted[]
 }
 
+export interface IContactedCursorInfo {
+    count: number | null,
+    next: string | null,
+    previous: string | null,
+    results: IContacted[]
+}
+
+type ContactedCountMode = 'exact' | 'estimated' | 'none';
+
 export interface IContacted {
     client_id: string,
     emails: IEmail[],
@@ -35,6 +44,26 @@ export interface IClientsList {
     "phone_number": string | null
 }
 
+export interface IClientSuggestion {
+    "odu_id": string,
+    "full_name": string,
+    "phone_number": string | null
+}
+
+export interface ICallerIdSMS {
+    "practice_id": string | null,
+    "status": string,
+    "sent_at": string | null,
+    "text": string | null
+}
+
+export interface ICallerIdClient {
+    "odu_id": string,
+    "full_name": string,
+    "phone_number": string,
+    "last_sms": ICallerIdSMS | null
+}
+
 export interface IPhone {
     app_number: string,
     odu_id: string,
@@ -115,6 +144,40 @@ export const getClients = async (data: SearchData) => {
     }
 };
 
+export const getClientSuggestions = async (query: string, limit?: number) => {
+    try {
+        await checkTokenExpiry();
+        const token = localStorage.getItem('token');
+        const headers = {
+            Authorization: `Bearer ${token}`,
+        };
+        const response: AxiosResponse<IClientSuggestion[]> = await axios.get( apiEndpoint + 'api/v1/call-center/clients/typeahead/', {
+            params: {query, limit}, headers
+        });
+        return response.data;
+    } catch (error) {
+        console.error(error);
+        throw error;
+    }
+};
+
+export const getClientsByCallerId = async (number: string) => {
+    try {
+        await checkTokenExpiry();
+        const token = localStorage.getItem('token');
+        const headers = {
+            Authorization: `Bearer ${token}`,
+        };
+        const response: AxiosResponse<ICallerIdClient[]> = await axios.get( apiEndpoint + 'api/v1/call-center/clients/caller-id/', {
+            params: {number}, headers
+        });
+        return response.data;
+    } catch (error) {
+        console.error(error);
+        throw error;
+    }
+};
+
 export const getClientInfo = async (id: string) => {
     try {
         await checkTokenExpiry();
@@ -165,6 +228,30 @@ export const updateClient = async (id: string, data: any) => {
     }
 }
 
+export interface IPatientOutcome {
+    odu_id: string,
+    outcome?: null | string,
+    opt_out?: null | boolean,
+    comment?: null | string,
+    outcome_at?: null | Date,
+}
+
+export const updatePatientOutcomes = async (patients: IPatientOutcome[]) => {
+    try {
+        await checkTokenExpiry();
+        const token = localStorage.getItem('token');
+        const headers = {
+            Authorization: `Bearer ${token}`,
+        };
+        const response: AxiosResponse<IPatientOutcome[]> = await axios.patch( apiEndpoint + `api/v1/call-center/patients/outcomes/`, {patients}
+        , {headers});
+        return response.data;
+    } catch (error) {
+        console.error(error);
+        throw error;
+    }
+}
+
 export const getFAQ = async (id: string) => {
     try {
         await checkTokenExpiry();
@@ -200,6 +287,25 @@ export const getContactedInfo = async (
     }
 }
 
+export const getContactedInfoByCursor = async (
+    {cursor = '', limit, count, name, followed, sent_after, sent_before, practice}
+        : { cursor?: string, limit: number, count?: ContactedCountMode, name?: string, followed?: boolean, sent_after?: string, sent_before?: string, practice?: string[] }) => {
+    try {
+        await checkTokenExpiry();
+        const token = localStorage.getItem('token');
+        const headers = {
+            Authorization: `Bearer ${token}`,
+        };
+        const response: AxiosResponse<IContactedCursorInfo> = await axios.get( apiEndpoint + `api/v1/call-center/clients/contacted/`,
+            {params: {cursor, limit, count, name, followed, sent_after, sent_before, practice: practice ? practice.join(',') : undefined}, headers});
+        return response.data;
+    }
+    catch (error) {
+        console.error(error);
+        throw error;
+    }
+}
+
 export const switchSMS = async (sms_id: string) => {
     try {
         await checkTokenExpiry();
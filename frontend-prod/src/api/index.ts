@@ -1,11 +1,17 @@
 export {login, checkTokenExpiry} from "./login";
 export {
     getClients,
+    getClientSuggestions,
+    getClientsByCallerId,
     getClientInfo,
     getOutcomes,
     updateClient,
+    updatePatientOutcomes,
     getFAQ,
     type IClientsList,
+    type IClientSuggestion,
+    type ICallerIdClient,
     type IEmail,
     type IPhone,
+    type IPatientOutcome,
 } from "./clients";
@@ -7,6 +7,8 @@ from .views import (
     APIInfoView,
     DBHealthCheckView,
     HealthCheckView,
+    MetricsView,
+    ProfileDownloadView,
     SMSEventCreationTestView,
     SMSEventCreationSubtaskLaunchTestView,
     DailyEmailUpdatesTestView,
@@ -18,6 +20,8 @@ urlpatterns = [
     path('v1/', include(v1_urlpatterns)),
     path('health-check/', HealthCheckView.as_view()),
     path('db-health-check/', DBHealthCheckView.as_view()),
+    path('metrics', MetricsView.as_view()),
+    path('profiles/<str:profile_id>', ProfileDownloadView.as_view()),
     path('sms-event-creation/<str:odu_id>', SMSEventCreationTestView.as_view()),
     path('daily-email-updates', DailyEmailUpdatesTestView.as_view()),
 ]
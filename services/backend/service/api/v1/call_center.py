@@ -1,19 +1,27 @@
 from django.urls import path
 
 from apps.call_center.api.views import (
+    ClientCallerIdView,
     ClientContactedListView,
     ClientDetailView,
+    ClientExportView,
     ClientListView,
+    ClientTypeaheadView,
     FAQListView,
     OutcomeListView,
+    PatientOutcomeBulkUpdateView,
     PracticeListView,
     SMSHistoryUpdateView,
 )
 
 urlpatterns = [
     path('clients/', ClientListView.as_view()),
+    path('clients/typeahead/', ClientTypeaheadView.as_view()),
+    path('clients/caller-id/', ClientCallerIdView.as_view()),
+    path('clients/export/', ClientExportView.as_view()),
     path('clients/<str:odu_id>', ClientDetailView.as_view()),
     path('clients/contacted/', ClientContactedListView.as_view()),
+    path('patients/outcomes/', PatientOutcomeBulkUpdateView.as_view()),
     path('practices/', PracticeListView.as_view()),
     path('outcomes/', OutcomeListView.as_view()),
     path('faq/<str:odu_id>', FAQListView.as_view()),
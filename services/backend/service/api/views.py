@@ -1,10 +1,12 @@
+import hmac
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import DatabaseError
-from django.http import JsonResponse
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, views
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 
 from apps.call_center.db.models import Practice
 from apps.email.tasks.daily_updates_emailing import (
@@ -14,6 +16,8 @@ from apps.sms.tasks.sms_aggregating import (
     SMSEventCreationTask,
     SMSEventCreationSubtaskLaunchPeriodicTask,
 )
+from libs.drf.profiling import RequestProfiler
+from libs.metrics.registry import registry
 
 User = get_user_model()
 
@@ -26,6 +30,9 @@ class DBHealthCheckView(views.APIView):
             User.objects.first()
         except DatabaseError:
             return JsonResponse({'status': 'error'})
+        connection = connections[DEFAULT_DB_ALIAS]
+        if hasattr(connection, 'get_pool_stats'):
+            return JsonResponse({'pools': connection.get_pool_stats()})
         return JsonResponse({})
 
 
@@ -36,6 +43,39 @@ class HealthCheckView(views.APIView):
         return JsonResponse({})
 
 
+class HasMetricsToken(permissions.BasePermission):
+    '''Allows the scraper sending `Authorization: Bearer <METRICS_TOKEN>`, nobody if the token is not set.'''
+
+    def has_permission(self, request, view):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return bool(
+            settings.METRICS_TOKEN
+            and scheme == 'Bearer'
+            and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+        )
+
+
+class MetricsView(views.APIView):
+    authentication_classes = ()
+    permission_classes = (HasMetricsToken,)
+
+    def get(self, request, *args, **kwargs):
+        registry.flush()
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileDownloadView(views.APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        report = RequestProfiler.load(kwargs['profile_id'])
+        if report is None:
+            raise NotFound
+        response = JsonResponse(report, json_dumps_params={'indent': 2})
+        response['Content-Disposition'] = f'attachment; filename="profile-{report["id"]}.json"'
+        return response
+
+
 class APIInfoView(views.APIView):
     permission_classes = (permissions.AllowAny,)
 
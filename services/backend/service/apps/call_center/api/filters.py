@@ -1,11 +1,12 @@
 from django.core import validators
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
 from apps.call_center.consts import (
     FULL_NAME_QUERY_PARAMETER_MAX_LENGTH,
     FULL_NAME_QUERY_PARAMETER_MIN_LENGTH,
 )
-from apps.call_center.db.models import Client, SMSHistory
+from apps.call_center.db.models import Client, Phone, SMSHistory
 
 
 class ClientListFilter(filters.FilterSet):
@@ -18,10 +19,16 @@ class ClientListFilter(filters.FilterSet):
         fields = ('phone_number',)
 
     def phone_number_filter(self, queryset, name, value):
+        # a subquery instead of a join, so clients are not repeated per phone
         return queryset.filter(
-            phones__is_primary=True,
-            phones__app_number__exact=value,
-            phones__extractor_removed_at__isnull=True,
+            Exists(
+                Phone.objects.filter(
+                    client=OuterRef('odu_id'),
+                    is_primary=True,
+                    app_number__exact=value,
+                    extractor_removed_at__isnull=True,
+                )
+            )
         )
 
 
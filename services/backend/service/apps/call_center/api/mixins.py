@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+from libs.cache.reference import ReferenceDataCache
+
+
+class ReferenceDataETagMixin(ABC):
+    '''
+    HTTP caching of an endpoint served from a reference cache.
+
+    The ETag is the fingerprint stored with the cached data, so it changes
+    with the data, also after changes that do not invalidate the cache, e.g.
+    writes of the extractor, once the cached value expires. A conditional GET
+    is answered with 304 from the cache, the only query is the lookup of the
+    authenticated user.
+
+    The data and its fingerprint are returned by get_reference_entry().
+    '''
+    reference_cache: ReferenceDataCache
+
+    @abstractmethod
+    def get_reference_entry(self) -> tuple[Any, str]:
+        ...
+
+    def get(self, request, *args, **kwargs):
+        data, fingerprint = self.get_reference_entry()
+        etag = f'"{self.reference_cache.name}:{fingerprint}"'
+        response = get_conditional_response(request, etag=etag) or Response(data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
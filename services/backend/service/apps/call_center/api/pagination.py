@@ -0,0 +1,233 @@
+import base64
+import binascii
+import json
+import uuid
+from collections import OrderedDict
+
+import arrow
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.call_center.consts import (
+    CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT,
+    CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT,
+    CLIENTS_SET_PAGINATION_DEFAULT_LIMIT,
+    CLIENTS_SET_PAGINATION_MAX_LIMIT,
+    PaginationCountMode,
+)
+from libs.db.utils import get_estimated_count
+
+
+def encode_cursor(position: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(value: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise NotFound(pagination.CursorPagination.invalid_cursor_message)
+    if not isinstance(position, dict):
+        raise NotFound(pagination.CursorPagination.invalid_cursor_message)
+    return position
+
+
+def get_limit(request, query_param: str, default_limit: int, max_limit: int) -> int:
+    try:
+        limit = int(request.query_params[query_param])
+    except (KeyError, ValueError):
+        return default_limit
+    return min(limit, max_limit) if limit > 0 else default_limit
+
+
+class SentAtKeysetPagination(pagination.BasePagination):
+    '''
+    Keyset pagination over (sent_at, uuid) in descending order.
+
+    Pages are selected with a range condition on the composite sent_at_uuid_idx
+    index instead of an OFFSET, so deep pages cost the same as the first one.
+    The total count is the planner estimate by default and can be switched to
+    an exact COUNT(*) or disabled with the `count` query parameter.
+    '''
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    count_query_param = 'count'
+    default_limit = CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT
+    max_limit = CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        self.count = self.get_count(queryset, request)
+
+        position = None
+        if cursor := request.query_params.get(self.cursor_query_param):
+            position = decode_cursor(cursor)
+        self.has_position = position is not None
+        self.is_reversed = bool(position and position.get('r'))
+
+        queryset = queryset.filter(sent_at__isnull=False)
+        if position:
+            queryset = queryset.filter(self._get_position_lookup(position))
+        if self.is_reversed:
+            queryset = queryset.order_by('sent_at', 'uuid')
+        else:
+            queryset = queryset.order_by('-sent_at', '-uuid')
+
+        results = list(queryset[:self.limit + 1])
+        self.has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if self.is_reversed:
+            results.reverse()
+        self.page = results
+        return results
+
+    def _get_position_lookup(self, position: dict) -> Q:
+        try:
+            sent_at = arrow.get(position['s']).datetime
+            uuid_value = uuid.UUID(position['u'])
+        except (KeyError, TypeError, ValueError, arrow.parser.ParserError):
+            raise NotFound(pagination.CursorPagination.invalid_cursor_message)
+        # the redundant bound on sent_at lets Postgres use the index range
+        if position.get('r'):
+            return Q(sent_at__gte=sent_at) & (
+                Q(sent_at__gt=sent_at) | Q(uuid__gt=uuid_value)
+            )
+        return Q(sent_at__lte=sent_at) & (Q(sent_at__lt=sent_at) | Q(uuid__lt=uuid_value))
+
+    def get_limit(self, request) -> int:
+        return get_limit(
+            request, self.limit_query_param, self.default_limit, self.max_limit
+        )
+
+    def get_count(self, queryset, request) -> int | None:
+        count_mode = request.query_params.get(
+            self.count_query_param, PaginationCountMode.ESTIMATED.value
+        )
+        if count_mode == PaginationCountMode.EXACT.value:
+            return queryset.count()
+        if count_mode == PaginationCountMode.NONE.value:
+            return None
+        return get_estimated_count(queryset)
+
+    def _get_link(self, item, is_reversed: bool) -> str:
+        cursor = encode_cursor(
+            {'s': item.sent_at.isoformat(), 'u': str(item.uuid), 'r': is_reversed}
+        )
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self) -> str | None:
+        has_next = self.has_position if self.is_reversed else self.has_more
+        if not self.page or not has_next:
+            return None
+        return self._get_link(self.page[-1], is_reversed=False)
+
+    def get_previous_link(self) -> str | None:
+        has_previous = self.has_more if self.is_reversed else self.has_position
+        if not has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(
+                remove_query_param(self.base_url, self.cursor_query_param),
+                self.cursor_query_param,
+                '',
+            )
+        return self._get_link(self.page[0], is_reversed=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ('count', self.count),
+                    ('next', self.get_next_link()),
+                    ('previous', self.get_previous_link()),
+                    ('results', data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return pagination.LimitOffsetPagination().get_paginated_response_schema(schema)
+
+
+class ClientContactedSetPagination(pagination.LimitOffsetPagination):
+    '''
+    Limit/offset pagination, or keyset pagination when the `cursor` query
+    parameter is passed (an empty value requests the first page).
+    '''
+    default_limit = CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT
+    max_limit = CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT
+    keyset_pagination_class = SentAtKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        self.keyset_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ClientSetPagination(pagination.BasePagination):
+    '''
+    Keyset pagination on odu_id for the client list without filters.
+
+    Search and phone number lookups return short lists and stay unpaginated.
+    '''
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = CLIENTS_SET_PAGINATION_DEFAULT_LIMIT
+    max_limit = CLIENTS_SET_PAGINATION_MAX_LIMIT
+    unpaginated_query_params = ('search', 'phone_number')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if any(param in request.query_params for param in self.unpaginated_query_params):
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        limit = get_limit(
+            request, self.limit_query_param, self.default_limit, self.max_limit
+        )
+        if cursor := request.query_params.get(self.cursor_query_param):
+            position = decode_cursor(cursor)
+            if not isinstance(position.get('o'), str):
+                raise NotFound(pagination.CursorPagination.invalid_cursor_message)
+            queryset = queryset.filter(odu_id__gt=position['o'])
+
+        results = list(queryset.order_by('odu_id')[:limit + 1])
+        self.has_more = len(results) > limit
+        self.page = results[:limit]
+        return self.page
+
+    def get_next_link(self) -> str | None:
+        if not self.has_more:
+            return None
+        cursor = encode_cursor({'o': self.page[-1].odu_id})
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ('next', self.get_next_link()),
+                    ('results', data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
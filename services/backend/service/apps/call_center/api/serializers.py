@@ -1,13 +1,25 @@
 import uuid
+from datetime import datetime
 
 import arrow
 from dateutil.relativedelta import relativedelta
 from django.db import transaction
+from django.db.models import Q, QuerySet
 from rest_framework import serializers
 
 from apps.base.constants.errors import SystemMessageEnum
 from apps.base.exceptions import ProjectValidationError
-from apps.call_center.consts import ReminderStatus, APPOINTMENT_DATE_FORMAT
+from apps.call_center.consts import (
+    APPOINTMENT_DATE_FORMAT,
+    CALLER_ID_NUMBER_MAX_LENGTH,
+    PATIENT_OUTCOMES_BULK_UPDATE_MAX_SIZE,
+    ExportFileFormat,
+    TYPEAHEAD_DEFAULT_LIMIT,
+    TYPEAHEAD_MAX_LIMIT,
+    TYPEAHEAD_QUERY_MAX_LENGTH,
+    TYPEAHEAD_QUERY_MIN_LENGTH,
+    ReminderStatus,
+)
 from apps.call_center.db.entities.reminders import Appointment, Reminder
 from apps.call_center.db.models import (
     Client,
@@ -15,10 +27,155 @@ from apps.call_center.db.models import (
     Outcome,
     Patient,
     Phone,
+    Practice,
     SMSHistory,
 )
-from apps.call_center.services.outcome_side_effects import OutcomeSideEffectsService
+from apps.call_center.services.client_caller_id import ClientCallerIdIndex
+from apps.call_center.tasks.outcome_side_effects import follow_up_sent_sms
 from apps.sms.consts import PERIOD_TO_DISPLAY_REMINDERS_IN_YEARS, SMSHistoryStatus
+from libs.drf.serializers import ValuesSerializer, group_by
+
+
+def get_active_clients() -> QuerySet:
+    return Client.objects.filter(is_callable=True)
+
+
+def get_active_patients(**lookups) -> QuerySet:
+    # The lookups share the join of the relationships filter, so a
+    # relationships__client_id lookup only matches patients whose relationship
+    # to that client is not removed. The Prefetch('patients') of the client
+    # detail used to join the relationships twice and also listed a patient
+    # whose relationship to the client was removed while another one was
+    # active; the detail no longer shows such patients.
+    return Patient.objects.filter(
+        ~Q(pims_is_deceased=True),
+        ~Q(pims_is_inactive=True),
+        ~Q(pims_is_deleted=True),
+        ~Q(is_deceased=True),
+        extractor_removed_at__isnull=True,
+        death_date__isnull=True,
+        euthanasia_date__isnull=True,
+        relationships__extractor_removed_at__isnull=True,
+        **lookups,
+    )
+
+
+def get_active_appointments() -> QuerySet:
+    return Appointment.objects.filter(
+        ~Q(is_canceled_appointment=True),
+        appointment_datetime__isnull=False,
+        extractor_removed_at__isnull=True,
+    ).order_by('-appointment_datetime')
+
+
+def get_active_reminders() -> QuerySet:
+    return Reminder.objects.filter(
+        date_due__isnull=False,
+        extractor_removed_at__isnull=True,
+    ).order_by('-date_due')
+
+
+# The client detail shows the last past appointment, the future ones and the reminders
+# of the last years, so only those rows are read instead of the whole patient history.
+def get_today_start() -> datetime:
+    return arrow.utcnow().floor('day').datetime
+
+
+def get_future_appointments(today_start: datetime) -> QuerySet:
+    return get_active_appointments().filter(appointment_datetime__gte=today_start)
+
+
+def get_last_past_appointments(today_start: datetime) -> QuerySet:
+    return (
+        get_active_appointments()
+        .filter(appointment_datetime__lt=today_start)
+        .order_by('patient_id', '-appointment_datetime')
+        .distinct('patient_id')
+    )
+
+
+def get_displayed_reminders() -> QuerySet:
+    '''
+    Reminders of the display period, one per patient, practice, client, due date
+    and description, the last updated one wins. Ordered by the due date.
+    '''
+    date_from = arrow.utcnow().shift(years=-PERIOD_TO_DISPLAY_REMINDERS_IN_YEARS).date()
+    key = ('patient_id', 'date_due', 'practice_id', 'client_id', 'description')
+    return (
+        get_active_reminders()
+        .filter(date_due__gte=date_from)
+        .order_by(*key, '-updated_at')
+        .distinct(*key)
+    )
+
+
+def get_primary_emails_and_phones(
+    client_ids: list[str],
+) -> tuple[dict[str, list[tuple]], dict[str, list[tuple]]]:
+    emails = Email.objects.filter(
+        client_id__in=client_ids, is_primary=True, extractor_removed_at__isnull=True
+    ).values_list('client_id', 'odu_id', 'address', named=True)
+    phones = Phone.objects.filter(
+        client_id__in=client_ids, is_primary=True, extractor_removed_at__isnull=True
+    ).values_list('client_id', 'odu_id', 'app_number', named=True)
+    return group_by(emails, 'client_id'), group_by(phones, 'client_id')
+
+
+def get_client_practices(client_id: str, server_id: str) -> list[dict]:
+    practices = list(
+        Practice.objects.filter(server_id=server_id).values('odu_id', 'name')
+    )
+    if len(practices) == 1:
+        return practices
+
+    sms_history = get_sent_sms_history().filter(client_id=client_id).first()
+    return select_client_practices(
+        practices, sms_history.practice_id if sms_history else None
+    )
+
+
+def get_clients_practices(rows: list[tuple]) -> dict[str, list[dict]]:
+    '''get_client_practices() of the client rows with server_id, in two queries.'''
+    practices = group_by(
+        Practice.objects.filter(server_id__in={row.server_id for row in rows})
+        .order_by('odu_id')
+        .values_list('server_id', 'odu_id', 'name', named=True),
+        'server_id',
+    )
+    shared_server_client_ids = [
+        row.odu_id for row in rows if len(practices.get(row.server_id, ())) > 1
+    ]
+    last_sms_practice_ids = dict(
+        get_sent_sms_history()
+        .filter(client_id__in=shared_server_client_ids)
+        .order_by('client_id', '-sent_at')
+        .distinct('client_id')
+        .values_list('client_id', 'practice_id')
+    ) if shared_server_client_ids else {}
+    return {
+        row.odu_id: select_client_practices(
+            [
+                {'odu_id': practice.odu_id, 'name': practice.name}
+                for practice in practices.get(row.server_id, ())
+            ],
+            last_sms_practice_ids.get(row.odu_id),
+        )
+        for row in rows
+    }
+
+
+def get_sent_sms_history() -> QuerySet:
+    return SMSHistory.objects.filter(
+        status=SMSHistoryStatus.SENT.value,
+        practice__is_archived=False,
+    ).order_by('-sent_at')
+
+
+def select_client_practices(practices: list[dict], last_sms_practice_id: str | None) -> list[dict]:
+    '''The practice of the last SMS sent to the client, if the server of the client has several.'''
+    if len(practices) > 1 and last_sms_practice_id in {practice['odu_id'] for practice in practices}:
+        return [practice for practice in practices if practice['odu_id'] == last_sms_practice_id]
+    return practices
 
 
 class ClientListQueryParamsSerializer(serializers.Serializer):
@@ -26,11 +183,40 @@ class ClientListQueryParamsSerializer(serializers.Serializer):
     phone_number = serializers.CharField(required=False, min_length=10, max_length=10)
 
     def validate(self, attrs):
-        if len(attrs) != 1:
+        if len(attrs) > 1:
             raise ProjectValidationError(detail=SystemMessageEnum.X0002.value)
         return attrs
 
 
+class ClientExportQueryParamsSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(
+        choices=ExportFileFormat.choices,
+        required=False,
+        default=ExportFileFormat.JSON_LINES.value,
+    )
+
+
+class ClientTypeaheadQueryParamsSerializer(serializers.Serializer):
+    query = serializers.CharField(
+        min_length=TYPEAHEAD_QUERY_MIN_LENGTH, max_length=TYPEAHEAD_QUERY_MAX_LENGTH
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=TYPEAHEAD_MAX_LIMIT,
+        default=TYPEAHEAD_DEFAULT_LIMIT,
+    )
+
+
+class ClientCallerIdQueryParamsSerializer(serializers.Serializer):
+    number = serializers.CharField(max_length=CALLER_ID_NUMBER_MAX_LENGTH)
+
+    def validate_number(self, value: str) -> str:
+        if not (number := ClientCallerIdIndex.normalize(value)):
+            raise ProjectValidationError(SystemMessageEnum.X0004.value)
+        return number
+
+
 class ClientListSerializer(serializers.ModelSerializer):
     email_address = serializers.SerializerMethodField()
     phone_number = serializers.SerializerMethodField()
@@ -110,7 +296,7 @@ class ClientPatientsSerializer(serializers.ModelSerializer):
         )
 
     def validate_outcome(self, value):
-        outcomes = Outcome.objects.values_list('text', flat=True)
+        outcomes = Outcome.get_texts()
         if value is not None and value not in outcomes:
             raise ProjectValidationError(SystemMessageEnum.X0003.value)
         return value
@@ -130,39 +316,46 @@ class ClientPatientsSerializer(serializers.ModelSerializer):
         return instance
 
     def get_last_appointment(self, obj: Patient) -> dict | None:
-        now = arrow.utcnow().date()
-        for appointment in obj.prefetched_appointments:
-            if appointment.appointment_datetime.date() < now:
-                return AppointmentSerializer(appointment).data
+        if obj.prefetched_last_appointments:
+            return AppointmentSerializer(obj.prefetched_last_appointments[0]).data
         return None
 
     def get_next_appointments(self, obj: Patient) -> list[dict]:
-        now = arrow.utcnow().date()
-        appointments_to_return = []
-        for appointment in obj.prefetched_appointments:
-            if appointment.appointment_datetime.date() >= now:
-                appointments_to_return.append(appointment)
-        return AppointmentSerializer(appointments_to_return, many=True).data
+        return AppointmentSerializer(obj.prefetched_next_appointments, many=True).data
 
     def get_reminders(self, obj: Patient) -> list[dict]:
-        reminders_to_return = []
-        seen = set()
-        date_from = arrow.utcnow().shift(years=-PERIOD_TO_DISPLAY_REMINDERS_IN_YEARS).date()
-
-        for reminder in reversed(list(obj.prefetched_reminders)):
-            if reminder.date_due >= date_from:
-                key = (
-                    reminder.practice_id,
-                    reminder.client_id,
-                    reminder.patient_id,
-                    reminder.date_due,
-                    reminder.description,
-                )
-                if key not in seen:
-                    seen.add(key)
-                    reminders_to_return.append(reminder)
+        return ReminderSerializer(obj.prefetched_reminders, many=True).data
 
-        return ReminderSerializer(reminders_to_return, many=True).data
+
+class PatientOutcomeSerializer(serializers.ModelSerializer):
+    odu_id = serializers.CharField(max_length=255)
+
+    class Meta:
+        model = Patient
+        read_only_fields = ('outcome_at',)
+        fields = (
+            'odu_id',
+            'outcome',
+            'opt_out',
+            'comment',
+            'outcome_at',
+        )
+
+
+class PatientOutcomeBulkUpdateSerializer(serializers.Serializer):
+    patients = PatientOutcomeSerializer(
+        many=True, allow_empty=False, max_length=PATIENT_OUTCOMES_BULK_UPDATE_MAX_SIZE
+    )
+
+    def validate_patients(self, value: list[dict]) -> list[dict]:
+        if len({patient['odu_id'] for patient in value}) != len(value):
+            raise ProjectValidationError(SystemMessageEnum.X0001.value, field='patients')
+        outcomes = set(Outcome.get_texts())
+        for patient in value:
+            outcome = patient.get('outcome')
+            if outcome is not None and outcome not in outcomes:
+                raise ProjectValidationError(SystemMessageEnum.X0003.value)
+        return value
 
 
 class ClientPhoneSerializer(serializers.ModelSerializer):
@@ -211,22 +404,7 @@ class ClientDetailSerializer(serializers.ModelSerializer):
         )
 
     def get_practices(self, obj: Client) -> list[dict] | None:
-        practices = list(obj.server.practices.values('odu_id', 'name'))
-        if len(practices) == 1:
-            return practices
-
-        # Optimize: Fix N+1 query + inefficient algorithm
-        # Change from O(n²) list comprehension to O(n) set lookup
-        practice_ids_set = {p['odu_id'] for p in practices}  # O(n) conversion
-        sms_history = SMSHistory.objects.filter(
-            status=SMSHistoryStatus.SENT.value,
-            practice__is_archived=False,
-            client=obj,
-        ).order_by('-sent_at').first()
-        if sms_history and sms_history.practice_id in practice_ids_set:  # O(1) lookup
-            return [p for p in practices if p['odu_id'] == sms_history.practice_id]
-
-        return practices
+        return get_client_practices(obj.odu_id, obj.server_id)
 
 
 class ClientDetailUpdateSerializer(serializers.ModelSerializer):
@@ -359,10 +537,12 @@ class ClientDetailUpdateSerializer(serializers.ModelSerializer):
                         serializer_class=ClientPatientsSerializer,
                     )
 
-                    if patients_to_handle_outcome_update:
-                        OutcomeSideEffectsService(
-                            updated_patients=patients_to_handle_outcome_update
-                        ).follow_up_sent_sms()
+            if patients_to_handle_outcome_update:
+                follow_up_sent_sms({
+                    client.odu_id: [
+                        patient.odu_id for patient in patients_to_handle_outcome_update
+                    ]
+                })
 
     @transaction.atomic
     def update(self, instance, validated_data):
@@ -380,11 +560,6 @@ class ClientDetailUpdateSerializer(serializers.ModelSerializer):
             return instance
 
 
-class FAQListSerializer(serializers.Serializer):
-    question = serializers.CharField(source='question.text')
-    answer = serializers.CharField(source='text')
-
-
 class PracticeListSerializer(serializers.Serializer):
     odu_id = serializers.CharField(source='practice_id')
     name = serializers.CharField(source='practice.name')
@@ -420,3 +595,226 @@ class ClientContactedListSerializer(serializers.ModelSerializer):
             'phones',
             'patients',
         )
+
+
+class ClientListValuesSerializer(ValuesSerializer):
+    '''Same output as ClientListSerializer, built from values_list() rows.'''
+    fields = {
+        'odu_id': 'odu_id',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'full_name': 'full_name',
+        'email_address': None,
+        'phone_number': None,
+    }
+
+    def load_related(self, rows):
+        self.emails, self.phones = get_primary_emails_and_phones(
+            [row.odu_id for row in rows]
+        )
+
+    def get_email_address(self, row) -> str | None:
+        emails = self.emails.get(row.odu_id)
+        return emails[0].address if emails else None
+
+    def get_phone_number(self, row) -> str | None:
+        phones = self.phones.get(row.odu_id)
+        return phones[0].app_number if phones else None
+
+
+class ClientEmailValuesSerializer(ValuesSerializer):
+    fields = {'odu_id': 'odu_id', 'address': 'address'}
+
+
+class ClientPhoneValuesSerializer(ValuesSerializer):
+    fields = {'odu_id': 'odu_id', 'app_number': 'app_number'}
+
+
+class SMSPatientValuesSerializer(ValuesSerializer):
+    fields = {'odu_id': 'patient__odu_id', 'name': 'patient__name'}
+
+
+class ClientContactedListValuesSerializer(ValuesSerializer):
+    '''Same output as ClientContactedListSerializer, built from values_list() rows.'''
+    fields = {
+        'client_id': 'client_id',
+        'full_name': 'client__full_name',
+        'practice_id': 'practice_id',
+        'practice_name': 'practice__name',
+        'sent_at': ('sent_at', serializers.DateTimeField()),
+        'sms_history_id': ('uuid', serializers.CharField()),
+        'is_followed': 'is_followed',
+        'emails': None,
+        'phones': None,
+        'patients': None,
+    }
+
+    def load_related(self, rows):
+        self.emails, self.phones = get_primary_emails_and_phones(
+            list({row.client_id for row in rows if row.client_id is not None})
+        )
+        self.reminders = group_by(
+            Reminder.objects.filter(
+                sms_history_id__in=[row.uuid for row in rows]
+            ).values_list('sms_history_id', *SMSPatientValuesSerializer.lookups, named=True),
+            'sms_history_id',
+        )
+        self.email_serializer = ClientEmailValuesSerializer(None)
+        self.phone_serializer = ClientPhoneValuesSerializer(None)
+        self.patient_serializer = SMSPatientValuesSerializer(None)
+
+    def get_emails(self, row) -> list[dict] | None:
+        if row.client_id is None:
+            return None
+        return [
+            self.email_serializer.to_representation(email)
+            for email in self.emails.get(row.client_id, ())
+        ]
+
+    def get_phones(self, row) -> list[dict] | None:
+        if row.client_id is None:
+            return None
+        return [
+            self.phone_serializer.to_representation(phone)
+            for phone in self.phones.get(row.client_id, ())
+        ]
+
+    def get_patients(self, row) -> list[dict]:
+        return [
+            self.patient_serializer.to_representation(reminder)
+            for reminder in self.reminders.get(row.uuid, ())
+        ]
+
+
+class ClientPatientValuesSerializer(ValuesSerializer):
+    '''Same output as ClientPatientsSerializer, built from values_list() rows.'''
+    fields = {
+        'odu_id': 'odu_id',
+        'species_description': 'species_description',
+        'breed_description': 'breed_description',
+        'gender_description': 'gender_description',
+        'name': 'name',
+        'patient_age': None,
+        'outcome': 'outcome',
+        'opt_out': 'opt_out',
+        'comment': 'comment',
+        'outcome_at': ('outcome_at', serializers.DateTimeField()),
+        'next_appointments': None,
+        'last_appointment': None,
+        'reminders': None,
+    }
+    extra_lookups = ('birth_date',)
+    appointment_date_field = serializers.DateTimeField(format=APPOINTMENT_DATE_FORMAT)
+    reminder_date_due_field = serializers.DateField()
+
+    def load_related(self, rows):
+        patient_ids = [row.odu_id for row in rows]
+        self.today = arrow.utcnow().date()
+        today_start = get_today_start()
+        self.next_appointments = group_by(
+            get_future_appointments(today_start)
+            .filter(patient_id__in=patient_ids)
+            .values_list('patient_id', 'appointment_datetime', named=True),
+            'patient_id',
+        )
+        self.last_appointments = group_by(
+            get_last_past_appointments(today_start)
+            .filter(patient_id__in=patient_ids)
+            .values_list('patient_id', 'appointment_datetime', named=True),
+            'patient_id',
+        )
+        self.reminders = group_by(
+            get_displayed_reminders()
+            .filter(patient_id__in=patient_ids)
+            .values_list('patient_id', 'date_due', 'description', 'sms_status', named=True),
+            'patient_id',
+        )
+
+    def get_patient_age(self, row) -> int | None:
+        if row.birth_date:
+            return relativedelta(self.today, row.birth_date).years
+
+    def _get_appointment(self, appointment) -> dict:
+        return {
+            'date': self.appointment_date_field.to_representation(
+                appointment.appointment_datetime
+            )
+        }
+
+    def get_next_appointments(self, row) -> list[dict]:
+        return [
+            self._get_appointment(appointment)
+            for appointment in self.next_appointments.get(row.odu_id, ())
+        ]
+
+    def get_last_appointment(self, row) -> dict | None:
+        for appointment in self.last_appointments.get(row.odu_id, ()):
+            return self._get_appointment(appointment)
+        return None
+
+    def get_reminders(self, row) -> list[dict]:
+        return [
+            {
+                'date_due': self.reminder_date_due_field.to_representation(reminder.date_due),
+                'description': reminder.description,
+                'sms_status': reminder.sms_status,
+            }
+            for reminder in self.reminders.get(row.odu_id, ())
+        ]
+
+
+class ClientDetailValuesSerializer(ValuesSerializer):
+    '''Same output as ClientDetailSerializer, built from values_list() rows.'''
+    fields = {
+        'odu_id': 'odu_id',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'full_name': 'full_name',
+        'emails': None,
+        'phones': None,
+        'practices': None,
+        'patients': None,
+    }
+    extra_lookups = ('server_id',)
+
+    def load_related(self, rows):
+        client_ids = [row.odu_id for row in rows]
+        self.emails, self.phones = get_primary_emails_and_phones(client_ids)
+        self.email_serializer = ClientEmailValuesSerializer(None)
+        self.phone_serializer = ClientPhoneValuesSerializer(None)
+        self.practices = get_clients_practices(rows)
+
+        # one row per client and patient with an active relationship between them,
+        # see get_active_patients(); the history of all patients is loaded at once
+        patients = list(
+            ClientPatientValuesSerializer.get_rows(
+                get_active_patients(relationships__client_id__in=client_ids)
+                .order_by('relationships__client_id', 'odu_id')
+                .distinct('relationships__client_id', 'odu_id'),
+                'relationships__client_id',
+            )
+        )
+        self.patient_serializer = ClientPatientValuesSerializer(None)
+        self.patient_serializer.load_related(patients)
+        self.patients = group_by(patients, 'relationships__client_id')
+
+    def get_emails(self, row) -> list[dict]:
+        return [
+            self.email_serializer.to_representation(email)
+            for email in self.emails.get(row.odu_id, ())
+        ]
+
+    def get_phones(self, row) -> list[dict]:
+        return [
+            self.phone_serializer.to_representation(phone)
+            for phone in self.phones.get(row.odu_id, ())
+        ]
+
+    def get_practices(self, row) -> list[dict]:
+        return self.practices[row.odu_id]
+
+    def get_patients(self, row) -> list[dict]:
+        return [
+            self.patient_serializer.to_representation(patient)
+            for patient in self.patients.get(row.odu_id, ())
+        ]
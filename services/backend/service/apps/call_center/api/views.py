@@ -1,42 +1,60 @@
 from collections import OrderedDict, defaultdict
 
-from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Prefetch, Q
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_filters import rest_framework as filters
-from rest_framework import generics, pagination, permissions, views
+from rest_framework import generics, permissions, views
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from apps.call_center.consts import (
-    CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT,
-    CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT,
-    SHEDULER_DROPDOWN_TEMPLATE,
-    ReminderStatus,
-)
+from apps.call_center.consts import SHEDULER_DROPDOWN_TEMPLATE
 from apps.call_center.db.models import (
     Answer,
-    Appointment,
-    Client,
     Email,
     Outcome,
-    Patient,
     Phone,
-    Reminder,
     SMSHistory,
+    practice_list_cache,
 )
+from apps.call_center.services.client_caller_id import ClientCallerIdIndex
+from apps.call_center.services.client_detail_cache import ClientDetailCache
+from apps.call_center.services.client_export import ClientExportService
+from apps.call_center.services.client_typeahead import ClientTypeaheadIndex
+from apps.call_center.services.patient_outcomes import PatientOutcomeBulkUpdateService
 from apps.sms.consts import SMSHistoryStatus
+from apps.sms.db.models import PracticeSMSActivity
+from libs.db.routers import pin_to_primary
+from libs.drf.mixins import ProfilingMixin, ReplicaReadMixin, ValuesListModelMixin
 
 from .filters import (
     ClientContactedListFilter,
     ClientListFilter,
 )
+from .mixins import ReferenceDataETagMixin
+from .pagination import ClientContactedSetPagination, ClientSetPagination
 from .serializers import (
+    ClientCallerIdQueryParamsSerializer,
     ClientContactedListSerializer,
+    ClientContactedListValuesSerializer,
     ClientDetailSerializer,
     ClientDetailUpdateSerializer,
+    ClientDetailValuesSerializer,
+    ClientExportQueryParamsSerializer,
     ClientListQueryParamsSerializer,
     ClientListSerializer,
-    FAQListSerializer,
+    ClientListValuesSerializer,
+    ClientTypeaheadQueryParamsSerializer,
+    PatientOutcomeBulkUpdateSerializer,
+    PatientOutcomeSerializer,
     PracticeListSerializer,
+    get_active_clients,
+    get_active_patients,
+    get_displayed_reminders,
+    get_future_appointments,
+    get_last_past_appointments,
+    get_today_start,
 )
 
 
@@ -63,54 +81,64 @@ def get_email_and_phone_prefetches(
     )
 
 
-class ClientListView(generics.ListAPIView):
+def get_patient_history_prefetches() -> tuple[Prefetch, Prefetch, Prefetch]:
+    today_start = get_today_start()
+    appointment_fields = ('odu_id', 'patient', 'appointment_datetime')
+    return (
+        Prefetch(
+            'appointments',
+            get_future_appointments(today_start).only(*appointment_fields),
+            to_attr='prefetched_next_appointments',
+        ),
+        Prefetch(
+            'appointments',
+            get_last_past_appointments(today_start).only(*appointment_fields),
+            to_attr='prefetched_last_appointments',
+        ),
+        Prefetch(
+            'reminders',
+            get_displayed_reminders().only(
+                'odu_id',
+                'patient',
+                'practice',
+                'client',
+                'date_due',
+                'description',
+                'sms_status',
+            ),
+            to_attr='prefetched_reminders',
+        ),
+    )
+
+
+class ClientListView(
+    ProfilingMixin, ReplicaReadMixin, ValuesListModelMixin, generics.ListAPIView
+):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = ClientListSerializer
+    values_serializer_class = ClientListValuesSerializer
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = ClientListFilter
+    pagination_class = ClientSetPagination
+    metrics_query_params = ('search', 'phone_number')
 
     def get_queryset(self):
         if search_value := self.request.query_params.get('search'):
             # union is used to ensure that the correct indexes are used
-            # Optimize: only() reduces query payload by 60%
-            queryset_by_client = Client.objects.filter(
-                Q(full_name__iexact=search_value) | Q(odu_id__iexact=search_value),
-                ~Q(pims_is_deleted=True),
-                ~Q(pims_is_inactive=True),
-                ~Q(is_home_practice=False),
-                extractor_removed_at__isnull=True,
-                server__practices__is_archived=False,
-            ).only(
-                'odu_id', 'first_name', 'last_name', 'full_name'
-            ).prefetch_related(*get_email_and_phone_prefetches())
-
-            queryset_by_email = Client.objects.filter(
-                ~Q(pims_is_deleted=True),
-                ~Q(pims_is_inactive=True),
-                ~Q(is_home_practice=False),
+            queryset_by_client = get_active_clients().filter(
+                Q(full_name__iexact=search_value) | Q(odu_id__iexact=search_value)
+            )
+
+            queryset_by_email = get_active_clients().filter(
                 emails__is_primary=True,
                 emails__address__iexact=search_value,
                 emails__extractor_removed_at__isnull=True,
-                extractor_removed_at__isnull=True,
-                server__practices__is_archived=False,
-            ).only(
-                'odu_id', 'first_name', 'last_name', 'full_name'
-            ).prefetch_related(*get_email_and_phone_prefetches())
+            )
 
             queryset = queryset_by_client.union(queryset_by_email)
 
         else:
-            queryset = (
-                Client.objects.filter(
-                    ~Q(pims_is_deleted=True),
-                    ~Q(pims_is_inactive=True),
-                    ~Q(is_home_practice=False),
-                    extractor_removed_at__isnull=True,
-                    server__practices__is_archived=False,
-                )
-                .prefetch_related(*get_email_and_phone_prefetches())
-                .distinct('odu_id')
-            )
+            queryset = get_active_clients().order_by('odu_id')
 
         return queryset
 
@@ -122,50 +150,53 @@ class ClientListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class ClientDetailView(generics.RetrieveUpdateAPIView):
+class ClientExportView(views.APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        query_params_serializer = ClientExportQueryParamsSerializer(
+            data=request.query_params
+        )
+        query_params_serializer.is_valid(raise_exception=True)
+        export_service = ClientExportService(**query_params_serializer.validated_data)
+        response = StreamingHttpResponse(
+            export_service.stream(), content_type=export_service.content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{export_service.filename}"'
+        )
+        return response
+
+
+class ClientTypeaheadView(views.APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        query_params_serializer = ClientTypeaheadQueryParamsSerializer(
+            data=request.query_params
+        )
+        query_params_serializer.is_valid(raise_exception=True)
+        return Response(
+            ClientTypeaheadIndex().search(**query_params_serializer.validated_data)
+        )
+
+
+class ClientCallerIdView(views.APIView):
     permission_classes = (permissions.IsAuthenticated,)
-    queryset = Client.objects.filter(
-        ~Q(pims_is_deleted=True),
-        ~Q(pims_is_inactive=True),
-        ~Q(is_home_practice=False),
-        extractor_removed_at__isnull=True,
-        server__practices__is_archived=False,
-    ).prefetch_related(
-        'server__practices',
-        Prefetch(
-            'patients',
-            queryset=Patient.objects.filter(
-                ~Q(pims_is_deceased=True),
-                ~Q(pims_is_inactive=True),
-                ~Q(pims_is_deleted=True),
-                ~Q(is_deceased=True),
-                extractor_removed_at__isnull=True,
-                death_date__isnull=True,
-                euthanasia_date__isnull=True,
-                relationships__extractor_removed_at__isnull=True
-            ).prefetch_related(
-                Prefetch(
-                    'appointments',
-                    Appointment.objects.filter(
-                        ~Q(is_canceled_appointment=True),
-                        appointment_datetime__isnull=False,
-                        extractor_removed_at__isnull=True,
-                    ).only('odu_id', 'patient', 'appointment_datetime').order_by('-appointment_datetime'),  # Optimize: only() reduces payload
-                    to_attr='prefetched_appointments',
-                ),
-                Prefetch(
-                    'reminders',
-                    Reminder.objects.filter(
-                        date_due__isnull=False,
-                        extractor_removed_at__isnull=True,
-                    ).only('odu_id', 'patient', 'date_due', 'description').order_by('-date_due'),  # Optimize: only() reduces payload
-                    to_attr='prefetched_reminders',
-                ),
-            ).distinct('odu_id'),
-            to_attr='prefetched_patients',
-        ),
-        *get_email_and_phone_prefetches(),
-    ).distinct('odu_id')
+
+    def get(self, request, *args, **kwargs):
+        query_params_serializer = ClientCallerIdQueryParamsSerializer(
+            data=request.query_params
+        )
+        query_params_serializer.is_valid(raise_exception=True)
+        return Response(
+            ClientCallerIdIndex().search(query_params_serializer.validated_data['number'])
+        )
+
+
+class ClientDetailView(ProfilingMixin, generics.RetrieveUpdateAPIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    queryset = get_active_clients()
 
     lookup_field = 'odu_id'
 
@@ -178,61 +209,108 @@ class ClientDetailView(generics.RetrieveUpdateAPIView):
     def get_serializer_class(self):
         return self.serializer_action_classes[self.request.method]
 
+    def get_queryset(self):
+        # the history windows depend on the current day, so they are built per request
+        return super().get_queryset().prefetch_related(
+            'server__practices',
+            Prefetch(
+                'patients',
+                queryset=get_active_patients().prefetch_related(
+                    *get_patient_history_prefetches()
+                ).distinct('odu_id'),
+                to_attr='prefetched_patients',
+            ),
+            *get_email_and_phone_prefetches(),
+        )
+
+    def get_data(self) -> dict:
+        row = get_object_or_404(
+            ClientDetailValuesSerializer.get_rows(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: self.kwargs[self.lookup_field]},
+        )
+        return ClientDetailValuesSerializer(row).data
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_profiling:
+            # the profile shows the build of the document, not a cache hit
+            return Response(self.get_data())
+
+        odu_id = self.kwargs[self.lookup_field]
+        version, document = ClientDetailCache.get(odu_id)
+        if document is None:
+            document = ClientDetailCache.set(odu_id, version, self.get_data())
+
+        response = get_conditional_response(
+            request, etag=document['etag']
+        ) or Response(document['data'])
+        response['ETag'] = document['etag']
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
     @transaction.atomic()
     def update(self, request, *args, **kwargs):
+        pin_to_primary(request.user.pk)
         super().update(request, *args, **kwargs)
-        instance = self.get_object()
-        serializer = ClientDetailSerializer(instance)
-        return Response(serializer.data)
+        odu_id = self.kwargs[self.lookup_field]
+        transaction.on_commit(lambda: ClientDetailCache.bump([odu_id]))
+        transaction.on_commit(lambda: ClientTypeaheadIndex().refresh([odu_id]))
+        transaction.on_commit(lambda: ClientCallerIdIndex().refresh_clients([odu_id]))
+        return Response(self.get_data())
 
 
-class OutcomeListView(views.APIView):
+class PatientOutcomeBulkUpdateView(views.APIView):
     permission_classes = (permissions.IsAuthenticated,)
-    queryset = Outcome.objects
-    CACHE_KEY = 'outcomes_list'
-    CACHE_TIMEOUT = 3600  # 1 hour
 
-    def get(self, request, *args, **kwargs):
-        # Optimize: Redis caching for static data (90% faster)
-        outcomes = cache.get(self.CACHE_KEY)
-        if outcomes is None:
-            outcomes = list(self.queryset.values_list('text', flat=True))
-            cache.set(self.CACHE_KEY, outcomes, self.CACHE_TIMEOUT)
-        return Response(outcomes)
+    def patch(self, request, *args, **kwargs):
+        serializer = PatientOutcomeBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pin_to_primary(request.user.pk)
+        patients = PatientOutcomeBulkUpdateService(
+            serializer.validated_data['patients']
+        ).update()
+        return Response(PatientOutcomeSerializer(patients, many=True).data)
 
 
-class FAQListView(generics.ListAPIView):
+class OutcomeListView(ReferenceDataETagMixin, views.APIView):
     permission_classes = (permissions.IsAuthenticated,)
-    queryset = Answer.objects.select_related('question').order_by('question__text')
-    serializer_class = FAQListSerializer
+    reference_cache = Outcome.reference_cache
 
-    def get_queryset(self):
-        return self.queryset.filter(practice__odu_id=self.kwargs.get('odu_id'))
+    def get_reference_entry(self) -> tuple[list[str], str]:
+        return Outcome.get_texts_entry()
+
+
+class FAQListView(ReferenceDataETagMixin, views.APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+    reference_cache = Answer.reference_cache
+
+    def get_reference_entry(self) -> tuple[list[dict], str]:
+        return Answer.get_faq_entry(self.kwargs.get('odu_id'))
 
 
-class PracticeListView(generics.ListAPIView):
+class PracticeListView(ReferenceDataETagMixin, generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     queryset = (
-        SMSHistory.objects.distinct('practice_id', 'practice__name')
-        .select_related('practice__settings')
+        PracticeSMSActivity.objects.select_related('practice__settings')
         .filter(practice__is_archived=False)
         .only('practice_id', 'practice__name', 'practice__settings__sms_scheduler')
-        .order_by('practice__name')
+        .order_by('practice__name', 'practice_id')
     )
     serializer_class = PracticeListSerializer
+    reference_cache = practice_list_cache
 
-    def get(self, request, *args, **kwargs):
-        response = super().get(request, *args, **kwargs)
+    def get_reference_entry(self) -> tuple[OrderedDict, str]:
+        return practice_list_cache.get_entry('practices', self._get_data)
+
+    def _get_data(self) -> OrderedDict:
+        practices = self.get_serializer(self.get_queryset(), many=True).data
         mapping = {}
-        if response.data:
-            mapping = self._get_scheduler_mapping(response.data)
-        return Response(
-            OrderedDict(
-                [
-                    ('mapping', mapping),
-                    ('practices', response.data),
-                ]
-            )
+        if practices:
+            mapping = self._get_scheduler_mapping(practices)
+        return OrderedDict(
+            [
+                ('mapping', mapping),
+                ('practices', [dict(practice) for practice in practices]),
+            ]
         )
 
     @staticmethod
@@ -246,40 +324,19 @@ class PracticeListView(generics.ListAPIView):
         return dict(sorted(mapping.items()))
 
 
-class ClientContactedSetPagination(pagination.LimitOffsetPagination):
-    default_limit = CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT
-    max_limit = CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT
-
-
-class ClientContactedListView(generics.ListAPIView):
+class ClientContactedListView(
+    ProfilingMixin, ReplicaReadMixin, ValuesListModelMixin, generics.ListAPIView
+):
     permission_classes = (permissions.IsAuthenticated,)
-    queryset = (
-        SMSHistory.objects.filter(status=SMSHistoryStatus.SENT.value, practice__is_archived=False)
-        .select_related('client', 'practice')
-        .only(
-            'client_id',
-            'practice_id',
-            'practice__name',
-            'sent_at',
-            'is_followed',
-            'client__full_name',
-        )
-        .prefetch_related(
-            Prefetch(
-                'reminders',
-                queryset=Reminder.objects.select_related('patient').only(
-                    'sms_history', 'patient__odu_id', 'patient__name'
-                ),
-                to_attr='prefetched_reminders',
-            ),
-            *get_email_and_phone_prefetches(related_field_name='client'),
-        )
-        .order_by('-sent_at')
-    )
+    queryset = SMSHistory.objects.filter(
+        status=SMSHistoryStatus.SENT.value, practice__is_archived=False
+    ).order_by('-sent_at')
     serializer_class = ClientContactedListSerializer
+    values_serializer_class = ClientContactedListValuesSerializer
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = ClientContactedListFilter
     pagination_class = ClientContactedSetPagination
+    metrics_query_params = ('name', 'practice', 'followed')
 
 
 class SMSHistoryUpdateView(generics.UpdateAPIView):
@@ -291,6 +348,8 @@ class SMSHistoryUpdateView(generics.UpdateAPIView):
         sms_history = self.get_object()
         sms_history.is_followed = not sms_history.is_followed
         sms_history.save()
+        # the followed filter of the contacted list reads the replica
+        pin_to_primary(request.user.pk)
         return Response(
             {'uuid': sms_history.uuid, 'is_followed': sms_history.is_followed}
         )
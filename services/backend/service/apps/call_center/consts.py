@@ -2,6 +2,18 @@ from django.db import models
 
 CLIENTS_CONTACTED_SET_PAGINATION_DEFAULT_LIMIT = 10
 CLIENTS_CONTACTED_SET_PAGINATION_MAX_LIMIT = 100
+CLIENTS_SET_PAGINATION_DEFAULT_LIMIT = 100
+CLIENTS_SET_PAGINATION_MAX_LIMIT = 1000
+CLIENTS_EXPORT_CHUNK_SIZE = 2000
+CLIENTS_EXPORT_FIELDS = (
+    'odu_id',
+    'first_name',
+    'last_name',
+    'full_name',
+    'email_address',
+    'phone_number',
+)
+PATIENT_OUTCOMES_BULK_UPDATE_MAX_SIZE = 200
 FULL_NAME_QUERY_PARAMETER_MIN_LENGTH = 3
 FULL_NAME_QUERY_PARAMETER_MAX_LENGTH = 511
 
@@ -9,6 +21,50 @@ SHEDULER_DROPDOWN_TEMPLATE = 'View {}\'s Practices'
 
 APPOINTMENT_DATE_FORMAT = '%Y-%m-%d'
 
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 25
+TYPEAHEAD_QUERY_MIN_LENGTH = 2
+TYPEAHEAD_QUERY_MAX_LENGTH = 100
+# several index terms of one client can match the same prefix
+TYPEAHEAD_CANDIDATES_FACTOR = 3
+TYPEAHEAD_TERMS_KEY = 'call_center:typeahead:terms'
+TYPEAHEAD_DOCUMENTS_KEY = 'call_center:typeahead:documents'
+TYPEAHEAD_INDEXING_WATERMARK_CACHE_KEY = 'call_center:typeahead:watermark'
+# extractor timestamps may be older than the moment the rows were committed
+TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES = 30
+TYPEAHEAD_INDEXING_CHUNK_SIZE = 1000
+
+CALLER_ID_NUMBER_MAX_LENGTH = 32
+CALLER_ID_CLIENTS_KEY = 'call_center:caller_id:clients'
+CALLER_ID_PHONES_KEY = 'call_center:caller_id:phones'
+CALLER_ID_INDEXING_WATERMARK_CACHE_KEY = 'call_center:caller_id:watermark'
+CALLER_ID_INDEXING_CHUNK_SIZE = 1000
+
+CLIENT_DETAIL_CACHE_NAME = 'client_detail'
+CLIENT_DETAIL_CACHE_KEY = 'call_center:client_detail:{odu_id}'
+CLIENT_DETAIL_CACHE_VERSION_KEY = 'call_center:client_detail_version:{odu_id}'
+# upper bound of staleness for changes that do not bump the client version
+CLIENT_DETAIL_CACHE_TIMEOUT = 15 * 60
+CLIENT_DETAIL_CACHE_INVALIDATION_CHUNK_SIZE = 1000
+CLIENT_CARD_BUILD_CHUNK_SIZE = 200
+CLIENT_CARD_WATERMARK_CACHE_KEY = 'call_center:client_card:watermark'
+
+OUTCOME_SIDE_EFFECTS_PATIENTS_KEY = 'call_center:outcome_side_effects:{client_id}:patients'
+OUTCOME_SIDE_EFFECTS_SCHEDULED_KEY = 'call_center:outcome_side_effects:{client_id}:scheduled'
+OUTCOME_SIDE_EFFECTS_PATIENTS_TIMEOUT = 60 * 60
+OUTCOME_SIDE_EFFECTS_COALESCING_WINDOW_IN_SECONDS = 10
+
+
+class ExportFileFormat(models.TextChoices):
+    JSON_LINES = 'jsonl'
+    CSV = 'csv'
+
+
+class PaginationCountMode(models.TextChoices):
+    EXACT = 'exact'
+    ESTIMATED = 'estimated'
+    NONE = 'none'
+
 
 class ReminderStatus(models.TextChoices):
     CHECKED = 'CHECKED', 'Checked and passed as redundant'
@@ -25,3 +25,15 @@ class BaseCallCenterModel(AbstractCallCenterModel):
 
     class Meta:
         abstract = True
+
+
+def get_changed_at_indexes(prefix: str) -> list[models.Index]:
+    '''
+    Indexes of the timestamps changed rows are found by, see get_changed_lookup().
+    Each column has its own index, so the OR of the lookup is a bitmap OR.
+    '''
+    return [
+        models.Index(fields=['extractor_updated_at'], name=f'{prefix}_ext_updated_idx'),
+        models.Index(fields=['extractor_removed_at'], name=f'{prefix}_ext_removed_idx'),
+        models.Index(fields=['updated_at'], name=f'{prefix}_updated_at_idx'),
+    ]
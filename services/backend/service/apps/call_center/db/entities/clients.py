@@ -1,8 +1,10 @@
 from django.core import validators
 from django.db import models
+from django.db.models import Q
 from django.db.models.functions import Upper
+from rest_framework.utils.encoders import JSONEncoder
 
-from apps.call_center.db.base_models import BaseCallCenterModel
+from apps.call_center.db.base_models import BaseCallCenterModel, get_changed_at_indexes
 from apps.call_center.db.validators import validate_is_digit
 
 from .patients import Patient
@@ -63,6 +65,8 @@ class Client(BaseCallCenterModel):
     )
 
     is_home_practice = models.BooleanField(null=True, db_column='IS_HOME_PRACTICE')
+    # set by database triggers on ingest and practice archiving, see migration 0045
+    is_callable = models.BooleanField(default=False, db_column='APP_IS_CALLABLE')
 
     def __str__(self) -> str | None:
         return f'{self.first_name} {self.last_name}'
@@ -81,6 +85,12 @@ class Client(BaseCallCenterModel):
                 Upper('odu_id'),
                 name='upper_odu_id_idx'
             ),
+            models.Index(
+                fields=['odu_id'],
+                condition=Q(is_callable=True),
+                name='client_callable_odu_id_idx',
+            ),
+            *get_changed_at_indexes('client'),
         ]
 
 
@@ -118,6 +128,9 @@ class ClientPatientRelationship(BaseCallCenterModel):
     def __str__(self) -> str | None:
         return f'{self.client} - {self.patient}'
 
+    class Meta:
+        indexes = get_changed_at_indexes('relationship')
+
 
 class Email(BaseCallCenterModel):
     odu_id = models.CharField(
@@ -152,6 +165,12 @@ class Email(BaseCallCenterModel):
                 'extractor_removed_at',
                 name='filter_by_email_idx'
             ),
+            models.Index(
+                fields=['client'],
+                condition=Q(is_primary=True, extractor_removed_at__isnull=True),
+                name='primary_email_client_idx',
+            ),
+            *get_changed_at_indexes('email'),
         ]
 
 
@@ -191,6 +210,17 @@ class Phone(BaseCallCenterModel):
                 fields=['app_number', 'is_primary', 'extractor_removed_at'],
                 name='filter_by_phone_idx'
             ),
+            models.Index(
+                fields=['client'],
+                condition=Q(is_primary=True, extractor_removed_at__isnull=True),
+                name='primary_phone_client_idx',
+            ),
+            models.Index(
+                fields=['app_number'],
+                condition=Q(is_primary=True, extractor_removed_at__isnull=True),
+                name='primary_phone_app_number_idx',
+            ),
+            *get_changed_at_indexes('phone'),
         ]
 
     def __str__(self) -> str | None:
@@ -231,3 +261,19 @@ class Address(BaseCallCenterModel):
 
     def __str__(self) -> str | None:
         return f'{self.line_1}, {self.city}, {self.state} {self.postal_code}'
+
+
+class ClientCard(models.Model):
+    '''
+    Read model of the client detail, the document served by ClientDetailView.
+
+    A card is only valid for the client detail cache version it was built for,
+    see ClientDetailCache.
+    '''
+    client = models.OneToOneField(
+        Client, on_delete=models.CASCADE, primary_key=True, related_name='card'
+    )
+    version = models.BigIntegerField()
+    etag = models.CharField(max_length=64)
+    document = models.JSONField(encoder=JSONEncoder)
+    built_at = models.DateTimeField(auto_now=True)
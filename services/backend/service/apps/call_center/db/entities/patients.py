@@ -1,7 +1,12 @@
 from django.db import models
 
+from libs.cache.reference import (
+    ReferenceDataCache,
+    ReferenceDataModelMixin,
+    ReferenceDataQuerySet,
+)
 from libs.db.base_models import BaseModel
-from apps.call_center.db.base_models import BaseCallCenterModel
+from apps.call_center.db.base_models import BaseCallCenterModel, get_changed_at_indexes
 
 from .servers import Server
 
@@ -67,12 +72,29 @@ class Patient(BaseCallCenterModel):
     def __str__(self) -> str | None:
         return self.name
 
+    class Meta:
+        indexes = get_changed_at_indexes('patient')
+
 
-class Outcome(BaseModel):
+class Outcome(ReferenceDataModelMixin, BaseModel):
     text = models.CharField(max_length=255)
 
+    reference_cache = ReferenceDataCache('outcomes')
+
+    objects = ReferenceDataQuerySet.as_manager()
+
     class Meta:
         ordering = ('text',)
 
     def __str__(self) -> str:
         return self.text
+
+    @classmethod
+    def get_texts(cls) -> list[str]:
+        return cls.get_texts_entry()[0]
+
+    @classmethod
+    def get_texts_entry(cls) -> tuple[list[str], str]:
+        return cls.reference_cache.get_entry(
+            'texts', lambda: list(cls.objects.values_list('text', flat=True))
+        )
@@ -2,6 +2,11 @@ from django.core import validators
 from django.db import models
 from django.db.models import Q
 
+from libs.cache.reference import (
+    ReferenceDataCache,
+    ReferenceDataModelMixin,
+    ReferenceDataQuerySet,
+)
 from libs.db.base_models import BaseModel
 from apps.base.constants.errors import SystemMessageEnum
 from apps.call_center.db.base_models import AbstractCallCenterModel
@@ -11,7 +16,12 @@ from apps.sms.consts import MAX_EXPIRY_PERIOD_IN_YEARS, MIN_EXPIRY_PERIOD_IN_WEE
 from .servers import Server
 
 
-class Practice(AbstractCallCenterModel):
+# practices with SMS activity, see PracticeSMSActivity; the extractor renames
+# practices directly in the database, so the list expires after five minutes
+practice_list_cache = ReferenceDataCache('practice_list', timeout=5 * 60)
+
+
+class Practice(ReferenceDataModelMixin, AbstractCallCenterModel):
     odu_id = models.CharField(primary_key=True, db_column='PRACTICE_ODU_ID')
     server = models.ForeignKey(
         Server,
@@ -46,13 +56,27 @@ class Practice(AbstractCallCenterModel):
     data_source = models.CharField(max_length=255, null=True, db_column='DATA_SOURCE')
     is_archived = models.BooleanField(default=False, db_column='APP_IS_ARCHIVED')
 
+    reference_cache = practice_list_cache
+
+    objects = ReferenceDataQuerySet.as_manager()
+
     def __str__(self) -> str | None:
         return self.name
 
+    class Meta:
+        indexes = [models.Index(fields=['updated_at'], name='practice_updated_at_idx')]
 
-class Question(BaseModel):
+
+faq_cache = ReferenceDataCache('faq')
+
+
+class Question(ReferenceDataModelMixin, BaseModel):
     text = models.CharField(max_length=255)
 
+    reference_cache = faq_cache
+
+    objects = ReferenceDataQuerySet.as_manager()
+
     class Meta:
         ordering = ('text',)
 
@@ -60,7 +84,7 @@ class Question(BaseModel):
         return self.text
 
 
-class Answer(BaseModel):
+class Answer(ReferenceDataModelMixin, BaseModel):
     practice = models.ForeignKey(
         Practice, on_delete=models.CASCADE, related_name='answers'
     )
@@ -69,6 +93,10 @@ class Answer(BaseModel):
     )
     text = models.CharField(verbose_name='Answer text', max_length=4000)
 
+    reference_cache = faq_cache
+
+    objects = ReferenceDataQuerySet.as_manager()
+
     class Meta:
         ordering = ('text',)
         constraints = (
@@ -80,8 +108,24 @@ class Answer(BaseModel):
     def __str__(self) -> str:
         return self.text if len(self.text) <= 100 else self.text[:100] + '...'
 
+    @classmethod
+    def get_faq(cls, practice_id: str) -> list[dict]:
+        return cls.get_faq_entry(practice_id)[0]
+
+    @classmethod
+    def get_faq_entry(cls, practice_id: str) -> tuple[list[dict], str]:
+        return cls.reference_cache.get_entry(
+            practice_id,
+            lambda: [
+                {'question': question, 'answer': answer}
+                for question, answer in cls.objects.filter(practice_id=practice_id)
+                .order_by('question__text')
+                .values_list('question__text', 'text')
+            ],
+        )
+
 
-class PracticeSettings(BaseModel):
+class PracticeSettings(ReferenceDataModelMixin, BaseModel):
     practice = models.OneToOneField(
         Practice, on_delete=models.CASCADE, related_name='settings'
     )
@@ -147,6 +191,11 @@ class PracticeSettings(BaseModel):
     rdo_name = models.CharField(max_length=100, blank=True)
     rdo_email = models.EmailField(blank=True)
 
+    reference_cache = ReferenceDataCache('practice_settings')
+    dependent_reference_caches = (practice_list_cache,)
+
+    objects = ReferenceDataQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.CheckConstraint(
@@ -189,3 +238,13 @@ class PracticeSettings(BaseModel):
                 violation_error_message=SystemMessageEnum.X0007.value.detail,
             ),
         ]
+
+    @classmethod
+    def get_sms_sending_values(cls, practice_id: str) -> dict:
+        '''The SMS sending settings of the practice as plain values; do not modify them.'''
+        return cls.reference_cache.get(
+            practice_id,
+            lambda: cls.objects.filter(practice_id=practice_id)
+            .values('is_sms_mailing_enabled', 'sms_senders_phone')
+            .get(),
+        )
@@ -1,7 +1,8 @@
 from django.db import models
+from django.db.models import Q
 
 from apps.call_center.consts import ReminderStatus
-from apps.call_center.db.base_models import BaseCallCenterModel
+from apps.call_center.db.base_models import BaseCallCenterModel, get_changed_at_indexes
 from apps.call_center.db.models import Client, Patient, Practice, Server
 from apps.sms.db.models import SMSHistory
 
@@ -66,6 +67,19 @@ class Reminder(BaseCallCenterModel):
     class Meta:
         indexes = [
             models.Index(fields=['date_due'], name='date_due_idx'),
+            # reminders to aggregate into SMS
+            models.Index(
+                fields=['practice', 'date_due', 'patient'],
+                condition=Q(sms_status__isnull=True, extractor_removed_at__isnull=True),
+                name='reminder_pending_idx',
+            ),
+            # reminders of the client detail
+            models.Index(
+                fields=['patient', 'date_due'],
+                condition=Q(date_due__isnull=False, extractor_removed_at__isnull=True),
+                name='reminder_patient_date_due_idx',
+            ),
+            *get_changed_at_indexes('reminder'),
         ]
 
 
@@ -123,3 +137,13 @@ class Appointment(BaseCallCenterModel):
 
     def __str__(self) -> str:
         return self.odu_id
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['patient', '-appointment_datetime'],
+                condition=Q(extractor_removed_at__isnull=True),
+                name='appointment_patient_dt_idx',
+            ),
+            *get_changed_at_indexes('appointment'),
+        ]
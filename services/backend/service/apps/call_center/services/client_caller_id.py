@@ -0,0 +1,173 @@
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models.fields.json import KT
+from django_redis import get_redis_connection
+
+from apps.call_center.consts import (
+    CALLER_ID_CLIENTS_KEY,
+    CALLER_ID_INDEXING_CHUNK_SIZE,
+    CALLER_ID_PHONES_KEY,
+)
+from apps.call_center.db.models import Client, Phone
+from apps.sms.db.models import SMSHistory
+
+REBUILD_KEY_SUFFIX = ':rebuild'
+
+
+class ClientCallerIdIndex:
+    '''
+    Index of the primary phone numbers of clients stored in Redis.
+
+    One hash maps an app_number to the space separated odu_ids of its clients,
+    so a lookup is a single HGET. A second hash keeps the number every phone
+    is indexed under, so a phone whose number changes is dropped from the old
+    one. Whether a client is active is checked on lookup.
+    '''
+
+    def __init__(self):
+        self.redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+
+    @staticmethod
+    def normalize(number: str) -> str | None:
+        '''Returns the number in the 10-digit format of Phone.app_number.'''
+        digits = ''.join(char for char in number if char.isdigit())
+        if len(digits) == 11 and digits.startswith('1'):
+            digits = digits[1:]
+        return digits if len(digits) == 10 else None
+
+    @staticmethod
+    def _get_phones():
+        return Phone.objects.filter(
+            is_primary=True,
+            app_number__isnull=False,
+            client__isnull=False,
+            extractor_removed_at__isnull=True,
+        )
+
+    def get_client_ids(self, app_number: str) -> list[str]:
+        client_ids = self.redis.hget(CALLER_ID_CLIENTS_KEY, app_number)
+        return client_ids.decode().split(' ') if client_ids else []
+
+    def search(self, app_number: str) -> list[dict]:
+        '''Returns the active clients with the number and their most recent SMS.'''
+        client_ids = self.get_client_ids(app_number)
+        if not client_ids:
+            return []
+        clients = (
+            Client.objects.filter(odu_id__in=client_ids, is_callable=True)
+            .order_by('full_name', 'odu_id')
+            .values_list('odu_id', 'full_name')
+        )
+        last_sms = {
+            sms['client_id']: sms
+            for sms in SMSHistory.objects.filter(client_id__in=client_ids)
+            .order_by('client_id', '-created_at')
+            .distinct('client_id')
+            .values(
+                'client_id', 'practice_id', 'status', 'sent_at', text=KT('event_context__text')
+            )
+        }
+        return [
+            {
+                'odu_id': odu_id,
+                'full_name': full_name,
+                'phone_number': app_number,
+                'last_sms': self._get_sms_document(last_sms.get(odu_id)),
+            }
+            for odu_id, full_name in clients
+        ]
+
+    @staticmethod
+    def _get_sms_document(sms: dict | None) -> dict | None:
+        if sms is None:
+            return None
+        return {
+            'practice_id': sms['practice_id'],
+            'status': sms['status'],
+            'sent_at': sms['sent_at'],
+            'text': sms['text'],
+        }
+
+    def refresh_clients(self, client_ids: Iterable[str]) -> None:
+        self.refresh(
+            Phone.objects.filter(client_id__in=list(client_ids)).values_list(
+                'odu_id', flat=True
+            )
+        )
+
+    def refresh(self, phone_ids: Iterable[str]) -> None:
+        '''Re-indexes the given phones and drops the ones that are no longer primary.'''
+        phone_ids = list(set(phone_ids))
+        for i in range(0, len(phone_ids), CALLER_ID_INDEXING_CHUNK_SIZE):
+            self._refresh_chunk(phone_ids[i:i + CALLER_ID_INDEXING_CHUNK_SIZE])
+
+    def _refresh_chunk(self, phone_ids: list[str]) -> None:
+        old_numbers = self.redis.hmget(CALLER_ID_PHONES_KEY, phone_ids)
+        new_numbers = dict(
+            self._get_phones()
+            .filter(odu_id__in=phone_ids)
+            .values_list('odu_id', 'app_number')
+        )
+        # the other clients of the affected numbers are read again as well
+        numbers = {number.decode() for number in old_numbers if number}
+        numbers.update(new_numbers.values())
+        client_ids_by_number = defaultdict(set)
+        for number, client_id in (
+            self._get_phones()
+            .filter(app_number__in=numbers)
+            .values_list('app_number', 'client_id')
+        ):
+            client_ids_by_number[number].add(client_id)
+
+        pipeline = self.redis.pipeline()
+        if removed_phone_ids := [odu_id for odu_id in phone_ids if odu_id not in new_numbers]:
+            pipeline.hdel(CALLER_ID_PHONES_KEY, *removed_phone_ids)
+        if new_numbers:
+            pipeline.hset(CALLER_ID_PHONES_KEY, mapping=new_numbers)
+        for number in numbers:
+            if client_ids := client_ids_by_number.get(number):
+                pipeline.hset(CALLER_ID_CLIENTS_KEY, number, ' '.join(sorted(client_ids)))
+            else:
+                pipeline.hdel(CALLER_ID_CLIENTS_KEY, number)
+        pipeline.execute()
+
+    def rebuild(self) -> None:
+        '''Builds the index from scratch and swaps it with the current one atomically.'''
+        clients_key = CALLER_ID_CLIENTS_KEY + REBUILD_KEY_SUFFIX
+        phones_key = CALLER_ID_PHONES_KEY + REBUILD_KEY_SUFFIX
+        self.redis.delete(clients_key, phones_key)
+
+        client_ids_by_number = defaultdict(set)
+        phones = {}
+        for odu_id, number, client_id in (
+            self._get_phones()
+            .values_list('odu_id', 'app_number', 'client_id')
+            .iterator(chunk_size=CALLER_ID_INDEXING_CHUNK_SIZE)
+        ):
+            client_ids_by_number[number].add(client_id)
+            phones[odu_id] = number
+            if len(phones) == CALLER_ID_INDEXING_CHUNK_SIZE:
+                self.redis.hset(phones_key, mapping=phones)
+                phones = {}
+        if phones:
+            self.redis.hset(phones_key, mapping=phones)
+
+        numbers = list(client_ids_by_number)
+        for i in range(0, len(numbers), CALLER_ID_INDEXING_CHUNK_SIZE):
+            self.redis.hset(
+                clients_key,
+                mapping={
+                    number: ' '.join(sorted(client_ids_by_number[number]))
+                    for number in numbers[i:i + CALLER_ID_INDEXING_CHUNK_SIZE]
+                },
+            )
+
+        pipeline = self.redis.pipeline(transaction=True)
+        if not numbers:
+            pipeline.delete(CALLER_ID_CLIENTS_KEY, CALLER_ID_PHONES_KEY)
+        else:
+            pipeline.rename(clients_key, CALLER_ID_CLIENTS_KEY)
+            pipeline.rename(phones_key, CALLER_ID_PHONES_KEY)
+        pipeline.execute()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.call_center.consts import (
+    CLIENT_DETAIL_CACHE_INVALIDATION_CHUNK_SIZE,
+    CLIENT_DETAIL_CACHE_KEY,
+    CLIENT_DETAIL_CACHE_NAME,
+    CLIENT_DETAIL_CACHE_TIMEOUT,
+    CLIENT_DETAIL_CACHE_VERSION_KEY,
+)
+from apps.call_center.db.models import Client, ClientCard
+from libs.metrics.requests import count_cache_result
+
+
+class ClientDetailCache:
+    '''
+    Cache of serialized client documents validated by a per-client version.
+
+    Every write that changes what the client detail shows bumps the version,
+    which makes the stored document stale without deleting it. The document is
+    stored together with the version it was built for, so a lookup reads both
+    keys in one round trip.
+
+    ClientCard rows are the durable copy of the documents, so a Redis miss is
+    a primary key lookup. Cards carry their version as well and are deleted on
+    bump, so a card outlives neither a change nor a reset of the versions.
+    '''
+
+    @staticmethod
+    def _get_key(odu_id: str) -> str:
+        return CLIENT_DETAIL_CACHE_KEY.format(odu_id=odu_id)
+
+    @staticmethod
+    def _get_version_key(odu_id: str) -> str:
+        return CLIENT_DETAIL_CACHE_VERSION_KEY.format(odu_id=odu_id)
+
+    @staticmethod
+    def get_etag(data: dict) -> str:
+        content = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+        return f'"{hashlib.md5(content).hexdigest()}"'
+
+    @classmethod
+    def get(cls, odu_id: str) -> tuple[int, dict | None]:
+        '''Returns the current client version and the document if it is up to date.'''
+        key, version_key = cls._get_key(odu_id), cls._get_version_key(odu_id)
+        values = cache.get_many([key, version_key])
+        version = values.get(version_key, 0)
+        document = values.get(key)
+        if document and document['version'] == version:
+            count_cache_result(CLIENT_DETAIL_CACHE_NAME, 'hits')
+            return version, document
+
+        card = (
+            ClientCard.objects.filter(client_id=odu_id, version=version)
+            .values_list('etag', 'document')
+            .first()
+        )
+        if card is None:
+            count_cache_result(CLIENT_DETAIL_CACHE_NAME, 'misses')
+            return version, None
+        count_cache_result(CLIENT_DETAIL_CACHE_NAME, 'card_hits')
+        document = {'version': version, 'etag': card[0], 'data': card[1]}
+        cache.set(key, document, timeout=CLIENT_DETAIL_CACHE_TIMEOUT)
+        return version, document
+
+    @classmethod
+    def set(cls, odu_id: str, version: int, data: dict) -> dict:
+        document = {'version': version, 'etag': cls.get_etag(data), 'data': data}
+        cache.set(cls._get_key(odu_id), document, timeout=CLIENT_DETAIL_CACHE_TIMEOUT)
+        cls.set_cards({odu_id: version}, {odu_id: data})
+        return document
+
+    @classmethod
+    def get_versions(cls, odu_ids: list[str]) -> dict[str, int]:
+        '''Versions to build documents for, read before the data the documents are built from.'''
+        versions = cache.get_many([cls._get_version_key(odu_id) for odu_id in odu_ids])
+        return {
+            odu_id: versions.get(cls._get_version_key(odu_id), 0) for odu_id in odu_ids
+        }
+
+    @staticmethod
+    def set_cards(versions: dict[str, int], data: dict[str, dict]) -> None:
+        ClientCard.objects.bulk_create(
+            [
+                ClientCard(
+                    client_id=odu_id,
+                    version=versions[odu_id],
+                    etag=ClientDetailCache.get_etag(client_data),
+                    document=client_data,
+                )
+                for odu_id, client_data in data.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['client'],
+            update_fields=['version', 'etag', 'document', 'built_at'],
+        )
+
+    @classmethod
+    def bump(cls, odu_ids: Iterable[str]) -> None:
+        odu_ids = list(set(odu_ids))
+        redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+        for i in range(0, len(odu_ids), CLIENT_DETAIL_CACHE_INVALIDATION_CHUNK_SIZE):
+            chunk = odu_ids[i:i + CLIENT_DETAIL_CACHE_INVALIDATION_CHUNK_SIZE]
+            ClientCard.objects.filter(client_id__in=chunk).delete()
+            pipeline = redis.pipeline(transaction=False)
+            for odu_id in chunk:
+                pipeline.incr(cache.make_key(cls._get_version_key(odu_id)))
+            pipeline.execute()
+
+    @classmethod
+    def bump_practice(cls, practice_id: str) -> None:
+        '''Invalidates the documents of all clients of the practice's server.'''
+        cls.bump(
+            Client.objects.filter(server__practices=practice_id)
+            .values_list('odu_id', flat=True)
+            .iterator(chunk_size=CLIENT_DETAIL_CACHE_INVALIDATION_CHUNK_SIZE)
+        )
@@ -0,0 +1,161 @@
+import json
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django_redis import get_redis_connection
+
+from apps.call_center.consts import (
+    TYPEAHEAD_CANDIDATES_FACTOR,
+    TYPEAHEAD_DOCUMENTS_KEY,
+    TYPEAHEAD_INDEXING_CHUNK_SIZE,
+    TYPEAHEAD_QUERY_MAX_LENGTH,
+    TYPEAHEAD_TERMS_KEY,
+)
+from apps.call_center.db.models import Client, Phone
+
+TERM_SEPARATOR = '\x00'
+REBUILD_KEY_SUFFIX = ':rebuild'
+
+
+class ClientTypeaheadIndex:
+    '''
+    Prefix index of the names of active clients stored in Redis.
+
+    Every word of a normalized full name starts an index term ("smith john" and
+    "john" for "Smith John"), and all terms are members of one sorted set with
+    the same score, so a prefix lookup is a single ZRANGEBYLEX range scan.
+    The documents returned to the UI are stored in a hash keyed by odu_id.
+    '''
+
+    def __init__(self):
+        self.redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+
+    @staticmethod
+    def normalize(value: str | None) -> str:
+        return ' '.join((value or '').lower().split())[:TYPEAHEAD_QUERY_MAX_LENGTH]
+
+    @classmethod
+    def _get_terms(cls, odu_id: str, full_name: str | None) -> list[str]:
+        words = cls.normalize(full_name).split(' ')
+        return [
+            f'{" ".join(words[i:])}{TERM_SEPARATOR}{odu_id}'
+            for i in range(len(words))
+            if words[i]
+        ]
+
+    @staticmethod
+    def _get_clients(odu_ids: list[str] | None = None):
+        queryset = Client.objects.filter(is_callable=True)
+        if odu_ids is not None:
+            queryset = queryset.filter(odu_id__in=odu_ids)
+        return (
+            queryset.only('odu_id', 'full_name')
+            .prefetch_related(
+                Prefetch(
+                    'phones',
+                    queryset=Phone.objects.filter(
+                        is_primary=True, extractor_removed_at__isnull=True
+                    )
+                    .only('odu_id', 'client', 'app_number')
+                    .order_by('odu_id'),
+                    to_attr='prefetched_phones',
+                )
+            )
+            .order_by('odu_id')
+        )
+
+    @staticmethod
+    def _get_document(client: Client) -> dict:
+        return {
+            'odu_id': client.odu_id,
+            'full_name': client.full_name,
+            'phone_number': (
+                client.prefetched_phones[0].app_number
+                if client.prefetched_phones
+                else None
+            ),
+        }
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        prefix = self.normalize(query).encode()
+        if not prefix:
+            return []
+        members = self.redis.zrangebylex(
+            TYPEAHEAD_TERMS_KEY,
+            b'[' + prefix,
+            b'[' + prefix + b'\xff',
+            start=0,
+            num=limit * TYPEAHEAD_CANDIDATES_FACTOR,
+        )
+        odu_ids = []
+        for member in members:
+            odu_id = member.decode().rsplit(TERM_SEPARATOR, 1)[-1]
+            if odu_id not in odu_ids:
+                odu_ids.append(odu_id)
+            if len(odu_ids) == limit:
+                break
+        if not odu_ids:
+            return []
+        documents = self.redis.hmget(TYPEAHEAD_DOCUMENTS_KEY, odu_ids)
+        return [json.loads(document) for document in documents if document]
+
+    def refresh(self, odu_ids: Iterable[str]) -> None:
+        '''Re-indexes the given clients and drops the ones that are no longer active.'''
+        odu_ids = list(set(odu_ids))
+        for i in range(0, len(odu_ids), TYPEAHEAD_INDEXING_CHUNK_SIZE):
+            self._refresh_chunk(odu_ids[i:i + TYPEAHEAD_INDEXING_CHUNK_SIZE])
+
+    def _refresh_chunk(self, odu_ids: list[str]) -> None:
+        clients = {client.odu_id: client for client in self._get_clients(odu_ids)}
+        old_documents = self.redis.hmget(TYPEAHEAD_DOCUMENTS_KEY, odu_ids)
+        pipeline = self.redis.pipeline()
+        for odu_id, old_document in zip(odu_ids, old_documents):
+            if old_document:
+                old_terms = self._get_terms(odu_id, json.loads(old_document)['full_name'])
+                if old_terms:
+                    pipeline.zrem(TYPEAHEAD_TERMS_KEY, *old_terms)
+                pipeline.hdel(TYPEAHEAD_DOCUMENTS_KEY, odu_id)
+            if client := clients.get(odu_id):
+                self._add(pipeline, client, TYPEAHEAD_TERMS_KEY, TYPEAHEAD_DOCUMENTS_KEY)
+        pipeline.execute()
+
+    def rebuild(self) -> None:
+        '''Builds the index from scratch and swaps it with the current one atomically.'''
+        terms_key = TYPEAHEAD_TERMS_KEY + REBUILD_KEY_SUFFIX
+        documents_key = TYPEAHEAD_DOCUMENTS_KEY + REBUILD_KEY_SUFFIX
+        self.redis.delete(terms_key, documents_key)
+
+        is_empty = True
+        for chunk in self._iterate_chunks(self._get_clients()):
+            pipeline = self.redis.pipeline()
+            for client in chunk:
+                is_empty = not self._add(pipeline, client, terms_key, documents_key) and is_empty
+            pipeline.execute()
+
+        pipeline = self.redis.pipeline(transaction=True)
+        if is_empty:
+            pipeline.delete(TYPEAHEAD_TERMS_KEY, TYPEAHEAD_DOCUMENTS_KEY)
+        else:
+            pipeline.rename(terms_key, TYPEAHEAD_TERMS_KEY)
+            pipeline.rename(documents_key, TYPEAHEAD_DOCUMENTS_KEY)
+        pipeline.execute()
+
+    def _add(self, pipeline, client: Client, terms_key: str, documents_key: str) -> bool:
+        terms = self._get_terms(client.odu_id, client.full_name)
+        if not terms:
+            return False
+        pipeline.zadd(terms_key, {term: 0 for term in terms})
+        pipeline.hset(documents_key, client.odu_id, json.dumps(self._get_document(client)))
+        return True
+
+    @staticmethod
+    def _iterate_chunks(queryset) -> Iterator[list[Client]]:
+        chunk = []
+        for client in queryset.iterator(chunk_size=TYPEAHEAD_INDEXING_CHUNK_SIZE):
+            chunk.append(client)
+            if len(chunk) == TYPEAHEAD_INDEXING_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
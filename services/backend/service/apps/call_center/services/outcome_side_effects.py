@@ -1,40 +1,90 @@
-from apps.call_center.db.entities.patients import Patient
+from typing import Iterable
+
+import arrow
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django_redis import get_redis_connection
+
+from apps.call_center.consts import (
+    OUTCOME_SIDE_EFFECTS_COALESCING_WINDOW_IN_SECONDS,
+    OUTCOME_SIDE_EFFECTS_PATIENTS_KEY,
+    OUTCOME_SIDE_EFFECTS_PATIENTS_TIMEOUT,
+    OUTCOME_SIDE_EFFECTS_SCHEDULED_KEY,
+)
+from apps.call_center.db.entities.reminders import Reminder
 from apps.sms.consts import SMSHistoryStatus
 from apps.sms.db.models import SMSHistory
 
 
 class OutcomeSideEffectsService:
-    def __init__(self, updated_patients: list[Patient]):
-        self.updated_patients = updated_patients
-        self.updated_patient_ids = [patient.odu_id for patient in updated_patients]
-
-    def _get_sms_records(self) -> list[SMSHistory]:
-        return SMSHistory.objects.prefetch_related(
-            'reminders__patient',
-        ).filter(
+    def __init__(self, updated_patient_ids: Iterable[str]):
+        self.updated_patient_ids = list(set(updated_patient_ids))
+
+    def follow_up_sent_sms(self) -> int:
+        '''
+        Marks a sent SMS of the updated patients as followed when all its other
+        patients got an outcome after the SMS was sent. Runs as one UPDATE.
+
+        is_followed is shown by the contacted clients, not by the client detail,
+        so ClientDetailCache is not bumped here; the outcome updates that call
+        this bump the clients of their patients themselves.
+        '''
+        unchecked_reminders = Reminder.objects.filter(
+            sms_history=OuterRef('pk'),
+        ).exclude(
+            patient_id__in=self.updated_patient_ids,
+        ).exclude(
+            patient__outcome_at__gte=OuterRef('sent_at'),
+        )
+        return SMSHistory.objects.filter(
+            Exists(
+                Reminder.objects.filter(
+                    sms_history=OuterRef('pk'),
+                    patient_id__in=self.updated_patient_ids,
+                )
+            ),
+            ~Exists(unchecked_reminders),
             status=SMSHistoryStatus.SENT.value,
             is_followed=False,
-            reminders__patient_id__in=self.updated_patient_ids
-        ).distinct()
-
-    def _is_all_patients_checked(self, sms_record: SMSHistory) -> bool:
-        patients_from_sms_record = [reminder.patient for reminder in sms_record.reminders.all()]
-        not_updated_patients = [
-            patient
-            for patient in patients_from_sms_record
-            if patient.odu_id not in self.updated_patient_ids
-        ]
-        if not not_updated_patients:
-            return True
-
-        return all([
-            patient.outcome_at and patient.outcome_at >= sms_record.sent_at
-            for patient in not_updated_patients
-        ])
-
-    def follow_up_sent_sms(self):
-        sms_records = self._get_sms_records()
-        for sms_record in sms_records:
-            if self._is_all_patients_checked(sms_record):
-                sms_record.is_followed = True
-                sms_record.save()
+        ).update(is_followed=True, updated_at=arrow.utcnow().datetime)
+
+    @staticmethod
+    def defer(client_id: str, patient_ids: Iterable[str]) -> bool:
+        '''
+        Adds the patients to the pending follow-up of the client.
+
+        Returns True for the first call within the coalescing window, which is
+        the one that has to schedule the follow-up.
+        '''
+        redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+        patients_key = cache.make_key(
+            OUTCOME_SIDE_EFFECTS_PATIENTS_KEY.format(client_id=client_id)
+        )
+        pipeline = redis.pipeline()
+        pipeline.sadd(patients_key, *patient_ids)
+        pipeline.expire(patients_key, OUTCOME_SIDE_EFFECTS_PATIENTS_TIMEOUT)
+        # the flag expires in case the scheduled task is lost
+        pipeline.set(
+            cache.make_key(OUTCOME_SIDE_EFFECTS_SCHEDULED_KEY.format(client_id=client_id)),
+            1,
+            nx=True,
+            ex=OUTCOME_SIDE_EFFECTS_COALESCING_WINDOW_IN_SECONDS * 6,
+        )
+        return bool(pipeline.execute()[-1])
+
+    @staticmethod
+    def pop_deferred(client_id: str) -> list[str]:
+        redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+        patients_key = cache.make_key(
+            OUTCOME_SIDE_EFFECTS_PATIENTS_KEY.format(client_id=client_id)
+        )
+        # patients added after the flag is dropped are handled by a new task
+        redis.delete(
+            cache.make_key(OUTCOME_SIDE_EFFECTS_SCHEDULED_KEY.format(client_id=client_id))
+        )
+        pipeline = redis.pipeline(transaction=True)
+        pipeline.smembers(patients_key)
+        pipeline.delete(patients_key)
+        patient_ids, _ = pipeline.execute()
+        return [patient_id.decode() for patient_id in patient_ids]
@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+import arrow
+from django.db import transaction
+
+from apps.base.constants.errors import SystemMessageEnum
+from apps.base.exceptions import ProjectValidationError
+from apps.call_center.api.serializers import get_active_patients
+from apps.call_center.db.models import ClientPatientRelationship, Patient
+from apps.call_center.services.client_detail_cache import ClientDetailCache
+from apps.call_center.tasks.outcome_side_effects import follow_up_sent_sms
+
+PATIENT_OUTCOME_FIELDS = ('outcome', 'opt_out', 'comment')
+
+
+class PatientOutcomeBulkUpdateService:
+    '''
+    Applies outcome updates of many patients with a single bulk_update.
+
+    Like the client detail update, only active patients of callable clients
+    can be updated. The patients are locked, so concurrent updates of the same
+    patient apply one after the other. outcome_at is set only for the patients
+    whose outcome actually changed, and the SMS follow-up runs once for all
+    patients that got an outcome.
+    '''
+
+    def __init__(self, updates: list[dict]):
+        self.updates = {update['odu_id']: update for update in updates}
+
+    def _get_patients(self) -> list[Patient]:
+        # the relationships join would repeat a patient and rule out FOR UPDATE,
+        # so the active patients are a subquery; the order avoids deadlocks
+        active_patient_ids = get_active_patients(
+            odu_id__in=self.updates, relationships__client__is_callable=True
+        ).values('odu_id')
+        patients = list(
+            Patient.objects.filter(odu_id__in=active_patient_ids)
+            .select_for_update()
+            .order_by('odu_id')
+        )
+        if len(patients) != len(self.updates):
+            raise ProjectValidationError(SystemMessageEnum.X0001.value, field='patients')
+        return patients
+
+    @transaction.atomic
+    def update(self) -> list[Patient]:
+        patients = self._get_patients()
+        now = arrow.utcnow().datetime
+        fields = {'updated_at'}
+        patients_with_outcome = []
+        for patient in patients:
+            update = self.updates[patient.odu_id]
+            outcome = update.get('outcome')
+            if outcome is not None and patient.outcome != outcome:
+                patient.outcome_at = now
+                fields.add('outcome_at')
+            for field in PATIENT_OUTCOME_FIELDS:
+                if field in update:
+                    setattr(patient, field, update[field])
+                    fields.add(field)
+            if 'outcome' in update:
+                patients_with_outcome.append(patient)
+            patient.updated_at = now
+
+        Patient.objects.bulk_update(patients, fields=sorted(fields))
+        client_ids_by_patient = self._get_client_ids_by_patient()
+        if patients_with_outcome:
+            patient_ids_by_client = defaultdict(list)
+            for patient in patients_with_outcome:
+                for client_id in client_ids_by_patient[patient.odu_id]:
+                    patient_ids_by_client[client_id].append(patient.odu_id)
+            follow_up_sent_sms(patient_ids_by_client)
+
+        client_ids = {
+            client_id
+            for client_ids in client_ids_by_patient.values()
+            for client_id in client_ids
+        }
+        transaction.on_commit(lambda: ClientDetailCache.bump(client_ids))
+        return patients
+
+    def _get_client_ids_by_patient(self) -> dict[str, list[str]]:
+        client_ids_by_patient = defaultdict(list)
+        # every patient has one, _get_patients() only returns patients of callable clients
+        relationships = ClientPatientRelationship.objects.filter(
+            patient_id__in=self.updates,
+            extractor_removed_at__isnull=True,
+            client__is_callable=True,
+        ).values_list('patient_id', 'client_id').distinct()
+        for patient_id, client_id in relationships:
+            client_ids_by_patient[patient_id].append(client_id)
+        return client_ids_by_patient
@@ -0,0 +1,125 @@
+import datetime
+import logging
+
+import arrow
+from django.core.cache import cache
+
+from apps.call_center.api.serializers import (
+    ClientDetailValuesSerializer,
+    get_active_clients,
+)
+from apps.call_center.consts import (
+    CLIENT_CARD_BUILD_CHUNK_SIZE,
+    CLIENT_CARD_WATERMARK_CACHE_KEY,
+    TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES,
+)
+from apps.call_center.db.models import (
+    Appointment,
+    Client,
+    ClientPatientRelationship,
+    Email,
+    Patient,
+    Phone,
+    Reminder,
+)
+from apps.call_center.services.client_detail_cache import ClientDetailCache
+from apps.call_center.tasks.client_indexing import get_changed_lookup
+from apps.sms.db.models import SMSHistory
+from libs.celery.celery import app
+from libs.celery.consts import CeleryQueue
+
+logger = logging.getLogger(__package__)
+
+
+class ClientDetailCacheInvalidationTask(app.Task):
+    '''
+    Invalidates cached client details.
+
+    Called by the extractor loader after it writes client-related rows,
+    either for specific clients or for a whole practice.
+    '''
+    name = 'call_center.client_detail_cache_invalidation'
+    queue = CeleryQueue.DEFAULT
+
+    def run(
+        self, client_ids: list[str] | None = None, practice_id: str | None = None
+    ) -> None:
+        if client_ids:
+            ClientDetailCache.bump(client_ids)
+        if practice_id:
+            ClientDetailCache.bump_practice(practice_id)
+
+
+class ClientCardRefreshPeriodicTask(app.Task):
+    '''
+    Rebuilds the client cards of clients whose detail rows changed.
+
+    Extractor writes do not go through the API, so the changes are found by
+    their timestamps. Cards of other clients are built on their first request.
+    '''
+    name = 'call_center.client_card_refresh'
+    queue = CeleryQueue.DEFAULT
+
+    def run(self) -> None:
+        started_at = arrow.utcnow()
+        watermark = cache.get(CLIENT_CARD_WATERMARK_CACHE_KEY)
+        if watermark is not None:
+            since = arrow.get(watermark).shift(
+                minutes=-TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES
+            ).datetime
+            client_ids = list(self._get_changed_client_ids(since))
+            logger.info(f'refresh client cards of {len(client_ids)} clients')
+            ClientDetailCache.bump(client_ids)
+            for i in range(0, len(client_ids), CLIENT_CARD_BUILD_CHUNK_SIZE):
+                self._build(client_ids[i:i + CLIENT_CARD_BUILD_CHUNK_SIZE])
+
+        cache.set(CLIENT_CARD_WATERMARK_CACHE_KEY, started_at.isoformat(), timeout=None)
+
+    @staticmethod
+    def _build(client_ids: list[str]) -> None:
+        versions = ClientDetailCache.get_versions(client_ids)
+        rows = ClientDetailValuesSerializer.get_rows(
+            get_active_clients().filter(odu_id__in=client_ids)
+        )
+        documents = ClientDetailValuesSerializer(rows, many=True).data
+        ClientDetailCache.set_cards(
+            versions, {document['odu_id']: document for document in documents}
+        )
+
+    @staticmethod
+    def _get_changed_client_ids(since: datetime.datetime) -> set[str]:
+        changed = get_changed_lookup(since)
+        client_ids = set(Client.objects.filter(changed).values_list('odu_id', flat=True))
+        for model in (Email, Phone, ClientPatientRelationship):
+            client_ids.update(
+                model.objects.filter(changed, client__isnull=False).values_list(
+                    'client_id', flat=True
+                )
+            )
+        for model in (Appointment, Reminder):
+            client_ids.update(
+                model.objects.filter(changed)
+                .filter(patient__relationships__client__isnull=False)
+                .values_list('patient__relationships__client_id', flat=True)
+            )
+        client_ids.update(
+            Patient.objects.filter(changed)
+            .filter(relationships__client__isnull=False)
+            .values_list('relationships__client_id', flat=True)
+        )
+        # the practices of a client depend on the practice of its last SMS
+        client_ids.update(
+            SMSHistory.objects.filter(updated_at__gte=since, client__isnull=False)
+            .values_list('client_id', flat=True)
+        )
+        # archiving a practice changes the visibility of all clients of its server
+        client_ids.update(
+            Client.objects.filter(
+                server__practices__updated_at__gte=since
+            ).values_list('odu_id', flat=True)
+        )
+        return client_ids
+
+
+app.register_task(ClientDetailCacheInvalidationTask)
+app.register_task(ClientCardRefreshPeriodicTask)
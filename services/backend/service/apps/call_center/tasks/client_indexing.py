@@ -0,0 +1,105 @@
+import datetime
+import logging
+
+import arrow
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.call_center.consts import (
+    CALLER_ID_INDEXING_WATERMARK_CACHE_KEY,
+    TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES,
+    TYPEAHEAD_INDEXING_WATERMARK_CACHE_KEY,
+)
+from apps.call_center.db.models import Client, Phone
+from apps.call_center.services.client_caller_id import ClientCallerIdIndex
+from apps.call_center.services.client_typeahead import ClientTypeaheadIndex
+from libs.celery.celery import app
+from libs.celery.consts import CeleryQueue
+
+logger = logging.getLogger(__package__)
+
+
+def get_changed_lookup(since: datetime.datetime) -> Q:
+    return (
+        Q(extractor_updated_at__gte=since)
+        | Q(extractor_removed_at__gte=since)
+        | Q(updated_at__gte=since)
+    )
+
+
+class ClientTypeaheadIndexingPeriodicTask(app.Task):
+    name = 'call_center.client_typeahead_indexing'
+    queue = CeleryQueue.DEFAULT
+
+    def run(self, full_rebuild: bool = False) -> None:
+        started_at = arrow.utcnow()
+        watermark = cache.get(TYPEAHEAD_INDEXING_WATERMARK_CACHE_KEY)
+        index = ClientTypeaheadIndex()
+
+        if full_rebuild or watermark is None:
+            logger.info('rebuild client typeahead index')
+            index.rebuild()
+        else:
+            since = arrow.get(watermark).shift(
+                minutes=-TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES
+            ).datetime
+            client_ids = self._get_changed_client_ids(since)
+            logger.info(f'refresh client typeahead index for {len(client_ids)} clients')
+            index.refresh(client_ids)
+
+        cache.set(
+            TYPEAHEAD_INDEXING_WATERMARK_CACHE_KEY, started_at.isoformat(), timeout=None
+        )
+
+    @staticmethod
+    def _get_changed_client_ids(since: datetime.datetime) -> set[str]:
+        client_ids = set(
+            Client.objects.filter(get_changed_lookup(since)).values_list(
+                'odu_id', flat=True
+            )
+        )
+        client_ids.update(
+            Phone.objects.filter(
+                get_changed_lookup(since), client__isnull=False
+            ).values_list('client_id', flat=True)
+        )
+        # archiving a practice changes the visibility of all clients of its server
+        client_ids.update(
+            Client.objects.filter(
+                server__practices__updated_at__gte=since
+            ).values_list('odu_id', flat=True)
+        )
+        return client_ids
+
+
+class ClientCallerIdIndexingPeriodicTask(app.Task):
+    name = 'call_center.client_caller_id_indexing'
+    queue = CeleryQueue.DEFAULT
+
+    def run(self, full_rebuild: bool = False) -> None:
+        started_at = arrow.utcnow()
+        watermark = cache.get(CALLER_ID_INDEXING_WATERMARK_CACHE_KEY)
+        index = ClientCallerIdIndex()
+
+        if full_rebuild or watermark is None:
+            logger.info('rebuild client caller ID index')
+            index.rebuild()
+        else:
+            since = arrow.get(watermark).shift(
+                minutes=-TYPEAHEAD_INDEXING_OVERLAP_IN_MINUTES
+            ).datetime
+            phone_ids = set(
+                Phone.objects.filter(get_changed_lookup(since)).values_list(
+                    'odu_id', flat=True
+                )
+            )
+            logger.info(f'refresh client caller ID index for {len(phone_ids)} phones')
+            index.refresh(phone_ids)
+
+        cache.set(
+            CALLER_ID_INDEXING_WATERMARK_CACHE_KEY, started_at.isoformat(), timeout=None
+        )
+
+
+app.register_task(ClientTypeaheadIndexingPeriodicTask)
+app.register_task(ClientCallerIdIndexingPeriodicTask)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import transaction
+
+from apps.call_center.consts import OUTCOME_SIDE_EFFECTS_COALESCING_WINDOW_IN_SECONDS
+from apps.call_center.services.outcome_side_effects import OutcomeSideEffectsService
+from libs.celery.celery import app
+from libs.celery.consts import CeleryQueue
+
+
+class OutcomeSideEffectsTask(app.Task):
+    name = 'call_center.outcome_side_effects'
+    queue = CeleryQueue.DEFAULT
+
+    def run(self, client_id: str) -> None:
+        if patient_ids := OutcomeSideEffectsService.pop_deferred(client_id):
+            OutcomeSideEffectsService(patient_ids).follow_up_sent_sms()
+
+
+app.register_task(OutcomeSideEffectsTask)
+
+
+def follow_up_sent_sms(patient_ids_by_client: dict[str, list[str]]) -> None:
+    '''
+    Runs the SMS follow-up of the patients that got an outcome.
+
+    With DEFER_OUTCOME_SIDE_EFFECTS the follow-up leaves the request: the
+    patients are collected per client after commit and one task per client
+    runs once the coalescing window is over.
+    '''
+    if not settings.DEFER_OUTCOME_SIDE_EFFECTS:
+        OutcomeSideEffectsService(
+            patient_id
+            for patient_ids in patient_ids_by_client.values()
+            for patient_id in patient_ids
+        ).follow_up_sent_sms()
+        return
+
+    def defer():
+        for client_id, patient_ids in patient_ids_by_client.items():
+            if OutcomeSideEffectsService.defer(client_id, patient_ids):
+                OutcomeSideEffectsTask().apply_async(
+                    kwargs={'client_id': client_id},
+                    countdown=OUTCOME_SIDE_EFFECTS_COALESCING_WINDOW_IN_SECONDS,
+                )
+
+    transaction.on_commit(defer)
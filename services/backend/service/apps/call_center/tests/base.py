@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.management.query_fixtures import QueryFixture
+from libs.cache.reference import ReferenceDataCache
+
+
+class CacheTestCase(TestCase):
+    '''
+    Runs the tests with every cache on TEST_CACHE_STORAGE, a Redis database
+    of their own that is flushed before every test, together with the local
+    copies of the reference caches.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cache_settings = override_settings(
+            CACHES={
+                alias: {**options, 'LOCATION': settings.TEST_CACHE_STORAGE}
+                for alias, options in settings.CACHES.items()
+            }
+        )
+        cache_settings.enable()
+        cls.addClassCleanup(cache_settings.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for reference_cache in ReferenceDataCache.registry.values():
+            reference_cache.clear_local()
+
+
+class SyntheticDataTestCase(CacheTestCase):
+    '''
+    Generates a practice of synthetic data of every size of `fixture_sizes`,
+    the fixtures of the practices are in `fixtures` by size.
+    '''
+    fixture_sizes = (10, 50)
+    fixture_seed = 42
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fixtures = {
+            size: QueryFixture.generate(size, cls.fixture_seed, f'fixture-{size}')
+            for size in cls.fixture_sizes
+        }
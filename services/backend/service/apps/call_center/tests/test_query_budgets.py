@@ -0,0 +1,28 @@
+from collections import defaultdict
+
+from apps.call_center.tests.base import SyntheticDataTestCase
+from apps.management.query_budgets import check_runs, get_budget_cases, run_case
+from apps.users.db.models import User
+
+
+class QueryBudgetTestCase(SyntheticDataTestCase):
+    '''
+    Runs every case of apps.management.query_budgets against the practice of
+    each size, with page limits and batch sizes of the same size.
+    '''
+
+    def test_cases_are_within_their_budgets(self):
+        user = User(email='budget-check@localhost', is_staff=True)
+        cases = {}
+        runs = defaultdict(dict)
+        for size, fixture in self.fixtures.items():
+            for case in get_budget_cases(user, fixture):
+                cases.setdefault(case.name, case)
+                runs[case.name][size] = run_case(case, size)
+
+        for name, case_runs in runs.items():
+            with self.subTest(name):
+                recorder, _ = case_runs[max(case_runs)]
+                self.assertEqual(
+                    check_runs(cases[name], case_runs), [], '\n'.join(recorder.get_report())
+                )
@@ -0,0 +1,33 @@
+from django.db import connections
+
+from apps.call_center.tests.base import SyntheticDataTestCase
+from apps.management.query_plans import (
+    capture_statements,
+    check_plan,
+    get_plan_cases,
+    get_table_rows,
+)
+from libs.db.utils import explain
+
+
+class QueryPlanTestCase(SyntheticDataTestCase):
+    '''Checks the plans of apps.management.query_plans against the practice of each size.'''
+
+    def test_plans_are_within_their_budgets(self):
+        for size, fixture in self.fixtures.items():
+            for case in get_plan_cases(fixture):
+                for key, (alias, sql) in capture_statements(case).items():
+                    with self.subTest(key, size=size):
+                        plan = explain(connections[alias], sql)['Plan']
+                        self.assertEqual(check_plan(case, plan, get_table_rows(alias)), [], sql)
+
+    def test_statement_keys_do_not_depend_on_the_parameters(self):
+        # the baselines of check_query_plans are keyed by the normalized SQL
+        keys = [
+            {case.name: set(capture_statements(case)) for case in get_plan_cases(fixture)}
+            for fixture in self.fixtures.values()
+        ]
+        for name, case_keys in keys[0].items():
+            with self.subTest(name):
+                self.assertTrue(case_keys)
+                self.assertEqual(case_keys, keys[1][name])
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.call_center.api.views import FAQListView, OutcomeListView, PracticeListView
+from apps.call_center.db.models import Outcome
+from apps.call_center.tests.base import CacheTestCase
+from apps.users.db.models import User
+
+
+class ReferenceETagTestCase(CacheTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='etag@localhost', password='password')
+        cls.token = str(AccessToken.for_user(cls.user))
+        Outcome.objects.create(text='Scheduled')
+
+    def _get(self, view_class, kwargs: dict | None = None, **headers):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {self.token}', **headers
+        )
+        return view_class.as_view()(request, **(kwargs or {}))
+
+    def test_conditional_get_is_answered_from_the_cache(self):
+        cases = {
+            'outcomes': (OutcomeListView, {}),
+            'faq': (FAQListView, {'odu_id': 'etag-practice'}),
+            'practices': (PracticeListView, {}),
+        }
+        for name, (view_class, kwargs) in cases.items():
+            with self.subTest(name):
+                response = self._get(view_class, kwargs)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response.get('ETag'))
+
+                # only the user of the token is loaded
+                with self.assertNumQueries(1):
+                    conditional_response = self._get(
+                        view_class, kwargs, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(conditional_response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_follows_changes_not_invalidating_the_cache(self):
+        etag = self._get(OutcomeListView)['ETag']
+
+        # the invalidation runs on commit, which the test never reaches; the cached
+        # value expires meanwhile
+        Outcome.objects.update(text='Declined')
+        cache.delete(Outcome.reference_cache._get_key('texts'))
+        Outcome.reference_cache.clear_local()
+
+        response = self._get(OutcomeListView, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, ['Declined'])
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_bulk_writes_invalidate_the_cache(self):
+        # every write changes the texts, they apply one after the other
+        writes = {
+            'update': lambda: Outcome.objects.update(text='Declined'),
+            'bulk_create': lambda: Outcome.objects.bulk_create([Outcome(text='Declined')]),
+            'delete': lambda: Outcome.objects.filter(text='Declined').delete(),
+        }
+        for name, write in writes.items():
+            with self.subTest(name):
+                etag = self._get(OutcomeListView)['ETag']
+                with self.captureOnCommitCallbacks(execute=True):
+                    write()
+
+                response = self._get(OutcomeListView, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    response.data, list(Outcome.objects.values_list('text', flat=True))
+                )
@@ -0,0 +1,43 @@
+import json
+import platform
+from dataclasses import asdict, dataclass, field
+
+import arrow
+
+
+@dataclass
+class BenchmarkRun:
+    name: str
+    metrics: dict[str, float]
+    parameters: dict = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkResults:
+    '''
+    Results of a benchmark command, stored as JSON to be compared by compare_benchmarks.
+
+    Metrics are lower-is-better unless listed in `higher_is_better`. Metrics in
+    `exact` describe the work done, e.g. rows written, and must be equal for the
+    runs to be comparable.
+    '''
+    benchmark: str
+    runs: list[BenchmarkRun]
+    higher_is_better: tuple[str, ...] = ()
+    exact: tuple[str, ...] = ()
+    label: str = ''
+    created_at: str = field(default_factory=lambda: arrow.utcnow().isoformat())
+    host: str = field(default_factory=platform.node)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as results_file:
+            json.dump(asdict(self), results_file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'BenchmarkResults':
+        with open(path) as results_file:
+            data = json.load(results_file)
+        data['runs'] = [BenchmarkRun(**run) for run in data['runs']]
+        data['higher_is_better'] = tuple(data['higher_is_better'])
+        data['exact'] = tuple(data['exact'])
+        return cls(**data)
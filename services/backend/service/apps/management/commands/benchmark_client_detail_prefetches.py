@@ -0,0 +1,151 @@
+import statistics
+import time
+
+import arrow
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from apps.call_center.api.serializers import (
+    get_active_appointments,
+    get_active_patients,
+    get_active_reminders,
+    get_displayed_reminders,
+    get_future_appointments,
+    get_last_past_appointments,
+    get_today_start,
+)
+from apps.sms.consts import PERIOD_TO_DISPLAY_REMINDERS_IN_YEARS
+
+APPOINTMENT_FIELDS = ('patient_id', 'appointment_datetime')
+REMINDER_FIELDS = ('patient_id', 'practice_id', 'client_id', 'date_due', 'description', 'sms_status')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the whole appointment and reminder history the client detail used to '
+        'prefetch with the bounded windows it reads now: rows and bytes fetched, '
+        'database time, and the same appointments and reminders displayed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=500, help='patients to sample')
+        parser.add_argument('--iterations', type=int, default=10)
+
+    def handle(self, *args, **options):
+        # patients with the longest history are the ones the windows are for
+        patient_ids = list(
+            get_active_patients()
+            .annotate(appointment_count=Count('appointments'))
+            .order_by('-appointment_count')
+            .values_list('odu_id', flat=True)[:options['patients']]
+        )
+        if not patient_ids:
+            raise CommandError('no patients with appointments')
+
+        today_start = get_today_start()
+        cases = {
+            'appointments': (
+                get_active_appointments()
+                .filter(patient_id__in=patient_ids)
+                .values_list(*APPOINTMENT_FIELDS),
+                [
+                    get_future_appointments(today_start)
+                    .filter(patient_id__in=patient_ids)
+                    .values_list(*APPOINTMENT_FIELDS),
+                    get_last_past_appointments(today_start)
+                    .filter(patient_id__in=patient_ids)
+                    .values_list(*APPOINTMENT_FIELDS),
+                ],
+            ),
+            'reminders': (
+                get_active_reminders()
+                .filter(patient_id__in=patient_ids)
+                .values_list(*REMINDER_FIELDS),
+                [
+                    get_displayed_reminders()
+                    .filter(patient_id__in=patient_ids)
+                    .values_list(*REMINDER_FIELDS),
+                ],
+            ),
+        }
+
+        results = {}
+        for name, (before, after) in cases.items():
+            rows_before, rows_after = list(before), [list(queryset) for queryset in after]
+            results[name] = (rows_before, rows_after)
+            timing_before = self._measure([before], options['iterations'])
+            timing_after = self._measure(after, options['iterations'])
+            size_before = sum(len(repr(row)) for row in rows_before)
+            size_after = sum(len(repr(row)) for rows in rows_after for row in rows)
+            self.stdout.write(
+                f'{name}: {len(rows_before)} -> {sum(map(len, rows_after))} rows, '
+                f'{size_before} -> {size_after} bytes, '
+                f'{timing_before:.2f} -> {timing_after:.2f} ms '
+                f'in {len(after)} quer{"y" if len(after) == 1 else "ies"}'
+            )
+            with CaptureQueriesContext(connection) as queries:
+                for queryset in after:
+                    list(queryset.all())
+            for query in queries.captured_queries:
+                self.stdout.write(f'  {query["sql"]}', self.style.SQL_KEYWORD)
+
+        all_appointments, (next_appointments, last_appointments) = results['appointments']
+        all_reminders, (reminders,) = results['reminders']
+        if (
+            self._group(next_appointments)
+            != self._filter_next_appointments(all_appointments, today_start)
+            or self._group(last_appointments)
+            != self._filter_last_appointments(all_appointments, today_start)
+            or self._get_reminder_keys(self._group(reminders))
+            != self._get_reminder_keys(self._filter_reminders(all_reminders))
+        ):
+            raise CommandError('bounded windows return different appointments or reminders')
+        self.stdout.write('displayed appointments and reminders are identical')
+
+    @staticmethod
+    def _measure(querysets: list, iterations: int) -> float:
+        '''Median wall time of fetching all rows in milliseconds.'''
+        timings = []
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            for queryset in querysets:
+                list(queryset.all())
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return statistics.median(timings)
+
+    @staticmethod
+    def _group(rows: list[tuple]) -> dict[str, list[tuple]]:
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[0], []).append(row)
+        return groups
+
+    def _filter_next_appointments(self, rows, today_start) -> dict[str, list[tuple]]:
+        return self._group([row for row in rows if row[1] >= today_start])
+
+    def _filter_last_appointments(self, rows, today_start) -> dict[str, list[tuple]]:
+        last_appointments = {}
+        for row in rows:
+            if row[1] < today_start:
+                last_appointments.setdefault(row[0], [row])
+        return last_appointments
+
+    def _filter_reminders(self, rows) -> dict[str, list[tuple]]:
+        # the deduplication ClientPatientsSerializer.get_reminders used to do
+        date_from = arrow.utcnow().shift(years=-PERIOD_TO_DISPLAY_REMINDERS_IN_YEARS).date()
+        reminders, seen = [], set()
+        for row in reversed(rows):
+            if row[3] >= date_from and row[:5] not in seen:
+                seen.add(row[:5])
+                reminders.append(row)
+        return self._group(reminders)
+
+    @staticmethod
+    def _get_reminder_keys(reminders: dict[str, list[tuple]]) -> dict[str, list[tuple]]:
+        # duplicates may differ by the SMS status, which one was shown was never defined
+        return {
+            patient_id: sorted(row[:5] for row in rows)
+            for patient_id, rows in reminders.items()
+        }
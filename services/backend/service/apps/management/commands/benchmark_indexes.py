@@ -0,0 +1,282 @@
+import arrow
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import Count, QuerySet
+
+from apps.call_center.api.filters import ClientListFilter
+from apps.call_center.api.serializers import (
+    get_active_clients,
+    get_displayed_reminders,
+    get_last_past_appointments,
+    get_today_start,
+)
+from apps.call_center.db.entities.reminders import Appointment, Reminder
+from apps.call_center.db.models import (
+    Client,
+    ClientPatientRelationship,
+    Email,
+    Patient,
+    Phone,
+    Practice,
+    Server,
+)
+from apps.sms.consts import SMS_LIMIT_PER_MINUTE, SMSEventStatus
+from apps.sms.db.models import SMSEvent
+from apps.sms.tasks.sms_aggregating import SMSEventCreationTask
+from libs.db.utils import describe_plan_node, explain, iter_plan_nodes
+
+# the generated rows are rolled back with the transaction
+SERVERS = 20
+PRACTICES = 40
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates data in a transaction that is rolled back and compares EXPLAIN ANALYZE '
+        'of the hot queries with and without the partial indexes of migration 0047. '
+        'Indexes are dropped inside savepoints, which locks the tables meanwhile, so the '
+        'command refuses to run with DEBUG off unless --force is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=100_000)
+        parser.add_argument('--reminders-per-patient', type=int, default=10)
+        parser.add_argument('--appointments-per-patient', type=int, default=5)
+        parser.add_argument('--seed', type=float, default=0.42, help='between -1 and 1')
+        parser.add_argument('--force', action='store_true')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off, pass --force to run against this database')
+
+        with transaction.atomic():
+            self.stdout.write('generating data')
+            self._generate(options)
+            with connection.cursor() as cursor:
+                for model in (
+                    Client, Patient, ClientPatientRelationship, Phone, Email,
+                    Reminder, Appointment, SMSEvent,
+                ):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+            for name, index_name, queryset in self._get_cases():
+                before = self._explain(queryset, drop_index=index_name)
+                after = self._explain(queryset)
+                self.stdout.write(
+                    f'{name} ({index_name}): '
+                    f'{before["time"]:.2f} -> {after["time"]:.2f} ms, '
+                    f'{before["buffers"]} -> {after["buffers"]} buffers, '
+                    f'cost {before["cost"]:.0f} -> {after["cost"]:.0f}\n'
+                    f'  before: {", ".join(before["scans"])}\n'
+                    f'  after:  {", ".join(after["scans"])}'
+                )
+            transaction.set_rollback(True)
+
+    def _get_cases(self) -> list[tuple[str, str, QuerySet]]:
+        task = SMSEventCreationTask()
+        task.practice = Practice.objects.get(odu_id='bench-practice-1')
+        task.launch_date = None
+        patient_ids = [f'bench-patient-{i}' for i in range(1, 21)]
+        client_ids = [f'bench-client-{i}' for i in range(1, 101)]
+        primary = {'is_primary': True, 'extractor_removed_at__isnull': True}
+        return [
+            (
+                'aggregation patients',
+                'reminder_pending_idx',
+                task._get_patients().using(DEFAULT_DB_ALIAS),
+            ),
+            (
+                'aggregation reminders',
+                'reminder_pending_idx',
+                task._get_pending_reminders().filter(patient_id__in=patient_ids),
+            ),
+            (
+                'client detail reminders',
+                'reminder_patient_date_due_idx',
+                get_displayed_reminders().filter(patient_id__in=patient_ids),
+            ),
+            (
+                'client detail last appointments',
+                'appointment_patient_dt_idx',
+                get_last_past_appointments(get_today_start()).filter(
+                    patient_id__in=patient_ids
+                ),
+            ),
+            (
+                'primary phones',
+                'primary_phone_client_idx',
+                Phone.objects.filter(client_id__in=client_ids, **primary),
+            ),
+            (
+                'phone filter',
+                'primary_phone_app_number_idx',
+                ClientListFilter(
+                    data={'phone_number': '0000000001'}, queryset=get_active_clients()
+                ).qs,
+            ),
+            (
+                'primary emails',
+                'primary_email_client_idx',
+                Email.objects.filter(client_id__in=client_ids, **primary),
+            ),
+            (
+                'SMS event claim',
+                'sms_event_pending_idx',
+                SMSEvent.objects.filter(
+                    send_at__lte=arrow.utcnow().datetime,
+                    status=SMSEventStatus.PENDING.value,
+                )[:SMS_LIMIT_PER_MINUTE],
+            ),
+            (
+                'SMS events in progress',
+                'sms_event_in_progress_idx',
+                SMSEvent.objects.filter(status=SMSEventStatus.IN_PROGRESS.value)
+                .values('status')
+                .annotate(count=Count('*')),
+            ),
+        ]
+
+    def _explain(self, queryset: QuerySet, drop_index: str | None = None) -> dict:
+        sql, params = queryset.query.sql_with_params()
+        with transaction.atomic():
+            if drop_index is not None:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP INDEX "{drop_index}"')
+            explained = explain(connection, sql, params, options='ANALYZE, BUFFERS')
+            transaction.set_rollback(True)
+
+        plan = explained['Plan']
+        return {
+            'time': explained['Execution Time'],
+            'cost': plan['Total Cost'],
+            'buffers': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0),
+            'scans': [
+                describe_plan_node(node)
+                for _, node in iter_plan_nodes(plan)
+                if 'Relation Name' in node
+            ],
+        }
+
+    def _generate(self, options: dict) -> None:
+        patients = options['patients']
+        clients = max(patients * 2 // 3, 1)
+        tables = {
+            model.__name__: model._meta.db_table
+            for model in (
+                Server, Practice, Client, Patient, ClientPatientRelationship,
+                Phone, Email, Reminder, Appointment, SMSEvent,
+            )
+        }
+        statements = (
+            'SELECT setseed(%(seed)s)',
+            '''
+            INSERT INTO {Server} ("SERVER_ODU_ID", "SERVER_NAME")
+            SELECT -i, 'Bench server ' || i FROM generate_series(1, %(servers)s) i
+            ''',
+            '''
+            INSERT INTO {Practice} ("PRACTICE_ODU_ID", "SERVER_ODU_ID", "NAME", "APP_IS_ARCHIVED")
+            SELECT 'bench-practice-' || i, -(i %% %(servers)s + 1), 'Bench practice ' || i, i %% 10 = 0
+            FROM generate_series(1, %(practices)s) i
+            ''',
+            '''
+            INSERT INTO {Client} (
+                "CLIENT_ODU_ID", "SERVER_ODU_ID", "CLIENT_FIRST_NAME", "CLIENT_LAST_NAME",
+                "CLIENT_FULL_NAME", "PIMS_IS_DELETED", "PIMS_IS_INACTIVE", "IS_HOME_PRACTICE",
+                "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-client-' || i, -(i %% %(servers)s + 1), 'First' || i, 'Last' || i,
+                'First' || i || ' Last' || i, random() < 0.03, random() < 0.05,
+                random() >= 0.02, CASE WHEN random() < 0.1 THEN now() END
+            FROM generate_series(1, %(clients)s) i
+            ''',
+            '''
+            INSERT INTO {Patient} (
+                "PATIENT_ODU_ID", "SERVER_ODU_ID", "NAME", "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-patient-' || i, -((i %% %(clients)s + 1) %% %(servers)s + 1),
+                'Pet ' || i, CASE WHEN random() < 0.05 THEN now() END
+            FROM generate_series(1, %(patients)s) i
+            ''',
+            '''
+            INSERT INTO {ClientPatientRelationship} (
+                "CLIENT_PATIENT_RELATIONSHIP_ODU_ID", "CLIENT_ODU_ID", "PATIENT_ODU_ID",
+                "PIMS_IS_PRIMARY"
+            )
+            SELECT
+                'bench-relationship-' || i, 'bench-client-' || (i %% %(clients)s + 1),
+                'bench-patient-' || i, true
+            FROM generate_series(1, %(patients)s) i
+            ''',
+            '''
+            INSERT INTO {Phone} (
+                "PHONE_ODU_ID", "CLIENT_ODU_ID", "NUMBER", "APP_NUMBER", "PHONE_TYPE",
+                "IS_PRIMARY", "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-phone-' || i || '-' || k, 'bench-client-' || i,
+                lpad((i * 2 + k - 2)::text, 10, '0'), lpad((i * 2 + k - 2)::text, 10, '0'),
+                CASE WHEN random() < 0.1 THEN 'Fax' ELSE 'Mobile' END,
+                k = 1, CASE WHEN random() < 0.1 THEN now() END
+            FROM generate_series(1, %(clients)s) i, generate_series(1, 2) k
+            ''',
+            '''
+            INSERT INTO {Email} (
+                "EMAIL_ODU_ID", "CLIENT_ODU_ID", "ADDRESS", "IS_PRIMARY",
+                "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-email-' || i, 'bench-client-' || i, 'client' || i || '@example.com',
+                true, CASE WHEN random() < 0.1 THEN now() END
+            FROM generate_series(1, %(clients)s) i
+            ''',
+            '''
+            INSERT INTO {Reminder} (
+                "REMINDER_ODU_ID", "PATIENT_ODU_ID", "CLIENT_ODU_ID", "PRACTICE_ODU_ID",
+                "DUE_DATE", "DESCRIPTION", "APP_SMS_STATUS", "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-reminder-' || i, 'bench-patient-' || p,
+                'bench-client-' || (p %% %(clients)s + 1),
+                'bench-practice-' || (p %% %(practices)s + 1),
+                current_date + 60 - (random() * 15 * 365)::int, 'Vaccine ' || (i %% 7),
+                CASE WHEN random() < 0.8 THEN 'CHECKED' END,
+                CASE WHEN random() < 0.1 THEN now() END
+            FROM generate_series(1, %(reminders)s) i, LATERAL (
+                SELECT i %% %(patients)s + 1 AS p
+            ) patient
+            ''',
+            '''
+            INSERT INTO {Appointment} (
+                "APPOINTMENT_ODU_ID", "PATIENT_ODU_ID", "APPOINTMENT_DATETIME",
+                "IS_CANCELED_APPOINTMENT", "EXTRACTOR_REMOVED_AT_UTC"
+            )
+            SELECT
+                'bench-appointment-' || i, 'bench-patient-' || (i %% %(patients)s + 1),
+                now() + interval '1 year' - random() * interval '15 years',
+                random() < 0.05, CASE WHEN random() < 0.1 THEN now() END
+            FROM generate_series(1, %(appointments)s) i
+            ''',
+            '''
+            INSERT INTO {SMSEvent} (uuid, created_at, updated_at, send_at, context, status)
+            SELECT
+                gen_random_uuid(), now(), now(), now() + (random() * 8 - 1) * interval '1 day',
+                '{{}}'::jsonb, CASE WHEN random() < 0.02 THEN 'IN_PROGRESS' ELSE 'PENDING' END
+            FROM generate_series(1, %(sms_events)s) i
+            ''',
+        )
+        params = {
+            'seed': options['seed'],
+            'servers': SERVERS,
+            'practices': PRACTICES,
+            'clients': clients,
+            'patients': patients,
+            'reminders': patients * options['reminders_per_patient'],
+            'appointments': patients * options['appointments_per_patient'],
+            'sms_events': max(patients // 10, 1),
+        }
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement.format(**tables), params)
@@ -0,0 +1,121 @@
+import json
+import statistics
+import time
+from typing import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.call_center.api.serializers import (
+    ClientContactedListSerializer,
+    ClientContactedListValuesSerializer,
+    ClientDetailSerializer,
+    ClientDetailValuesSerializer,
+    ClientListSerializer,
+    ClientListValuesSerializer,
+)
+from apps.call_center.api.views import (
+    ClientContactedListView,
+    ClientDetailView,
+    ClientListView,
+    get_email_and_phone_prefetches,
+)
+from apps.call_center.db.models import Reminder
+from libs.drf.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the DRF serializers of the client list, contacted clients and '
+        'client detail endpoints with their values_list() based versions: '
+        'CPU time per request and identical output. The client detail differs, by '
+        'design, for clients with a patient whose relationship to them is removed while '
+        'another relationship of the patient is active, see get_active_patients().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=100, help='rows per list page')
+        parser.add_argument('--clients', type=int, default=10, help='clients for the detail')
+
+    def handle(self, *args, **options):
+        iterations, limit = options['iterations'], options['limit']
+        request = Request(APIRequestFactory().get('/'))
+        clients = ClientListView(request=request).get_queryset()
+        contacted = ClientContactedListView.queryset
+        client_details = ClientDetailView().get_queryset()
+        client_ids = list(clients.values_list('odu_id', flat=True)[:options['clients']])
+
+        cases = {
+            'clients list': (
+                lambda: ClientListSerializer(
+                    clients.prefetch_related(*get_email_and_phone_prefetches())[:limit],
+                    many=True,
+                ).data,
+                lambda: ClientListValuesSerializer(
+                    ClientListValuesSerializer.get_rows(clients)[:limit], many=True
+                ).data,
+            ),
+            'contacted clients': (
+                lambda: ClientContactedListSerializer(
+                    contacted.select_related('client', 'practice').prefetch_related(
+                        Prefetch(
+                            'reminders',
+                            queryset=Reminder.objects.select_related('patient'),
+                            to_attr='prefetched_reminders',
+                        ),
+                        *get_email_and_phone_prefetches(related_field_name='client'),
+                    )[:limit],
+                    many=True,
+                ).data,
+                lambda: ClientContactedListValuesSerializer(
+                    ClientContactedListValuesSerializer.get_rows(contacted)[:limit],
+                    many=True,
+                ).data,
+            ),
+            'client detail': (
+                lambda: [
+                    ClientDetailSerializer(client_details.get(odu_id=odu_id)).data
+                    for odu_id in client_ids
+                ],
+                lambda: [
+                    ClientDetailValuesSerializer(
+                        ClientDetailValuesSerializer.get_rows(client_details).get(
+                            odu_id=odu_id
+                        )
+                    ).data
+                    for odu_id in client_ids
+                ],
+            ),
+        }
+
+        has_differences = False
+        for name, (serialize_before, serialize_after) in cases.items():
+            before = JSONRenderer().render(serialize_before())
+            after = ORJSONRenderer().render(serialize_after())
+            is_identical = json.loads(before) == json.loads(after)
+            has_differences = has_differences or not is_identical
+
+            cpu_before = self._measure(lambda: JSONRenderer().render(serialize_before()), iterations)
+            cpu_after = self._measure(lambda: ORJSONRenderer().render(serialize_after()), iterations)
+            self.stdout.write(
+                f'{name}: {cpu_before:.2f} ms -> {cpu_after:.2f} ms CPU per request '
+                f'({cpu_before / cpu_after if cpu_after else 0:.1f}x), '
+                f'{len(before)} bytes, output {"identical" if is_identical else "DIFFERENT"}'
+            )
+
+        if has_differences:
+            raise CommandError('serializers return different output')
+
+    @staticmethod
+    def _measure(render: Callable, iterations: int) -> float:
+        '''Median CPU time of the process in milliseconds, database time excluded.'''
+        timings = []
+        for _ in range(iterations):
+            started_at = time.process_time()
+            render()
+            timings.append((time.process_time() - started_at) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,158 @@
+import statistics
+import time
+import tracemalloc
+
+import arrow
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import QuerySet
+
+from apps.call_center.db.models import Practice, PracticeSettings, Reminder
+from apps.management.benchmarks import BenchmarkResults, BenchmarkRun
+from apps.management.synthetic_data import CHUNK_MODELS, SyntheticDataGenerator
+from apps.sms.db.models import SMSEvent, SMSHistory
+from apps.sms.tasks.sms_aggregating import SMSEventCreationTask
+from libs.db.queries import QueryRecorder
+
+MODES = ('daily', 'launch')
+
+
+class BenchmarkSMSEventCreationTask(SMSEventCreationTask):
+    '''Reads the patients from the primary, which alone sees the generated rows.'''
+
+    def _get_patients(self) -> QuerySet:
+        return super()._get_patients().using(DEFAULT_DB_ALIAS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks SMSEventCreationTask on generated practices of increasing size, in '
+        'the daily mode and on the launch day. Every practice is generated in a '
+        'transaction that is rolled back afterwards. Records wall time, queries, database '
+        'time, rows written, peak Python memory and reminders per second; compare two '
+        'result files with compare_benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,50000',
+            type=lambda value: [int(size) for size in value.split(',')],
+            help='comma separated numbers of clients of the practices',
+        )
+        parser.add_argument('--modes', default=','.join(MODES), type=lambda value: value.split(','))
+        parser.add_argument('--repeat', type=int, default=3, help='timed runs, the median is kept')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='writes the results to this JSON file')
+        parser.add_argument('--label', default='', help='name of the run in the results')
+        parser.add_argument('--force', action='store_true')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off, pass --force to run against this database')
+        if unknown_modes := set(options['modes']) - set(MODES):
+            raise CommandError(f'unknown modes {", ".join(sorted(unknown_modes))}')
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        runs = []
+        for size in options['sizes']:
+            for mode in options['modes']:
+                metrics = self._benchmark(size, mode, options)
+                runs.append(
+                    BenchmarkRun(
+                        name=f'{mode} {size} clients',
+                        metrics=metrics,
+                        parameters={'clients': size, 'mode': mode, 'seed': options['seed']},
+                    )
+                )
+                self.stdout.write(
+                    f'{mode} {size} clients: {metrics["reminders"]} reminders in '
+                    f'{metrics["wall_time"]:.2f} s, {metrics["reminders_per_second"]:.0f}/s, '
+                    f'{metrics["queries"]} queries in {metrics["db_time"]:.2f} s, '
+                    f'{metrics["rows_written"]} rows written, '
+                    f'{metrics["peak_memory"] / 2 ** 20:.1f} MiB peak'
+                )
+
+        if options['output']:
+            BenchmarkResults(
+                benchmark='sms_aggregation',
+                runs=runs,
+                higher_is_better=('reminders_per_second',),
+                exact=('reminders', 'rows_written'),
+                label=options['label'],
+            ).save(options['output'])
+
+    def _benchmark(self, size: int, mode: str, options: dict) -> dict[str, float]:
+        today = arrow.utcnow().date()
+        with transaction.atomic():
+            generator = SyntheticDataGenerator(
+                options['seed'], prefix=f'benchmark-{mode}-{size}', today=today
+            )
+            # practices on their launch day have no checked reminders yet
+            generator.generate([size], launching_rate=1.0 if mode == 'launch' else 0.0)
+            practice_id = f'{generator.prefix}-practice-1'
+            PracticeSettings.objects.filter(practice_id=practice_id).update(
+                is_sms_mailing_enabled=True,
+                launch_date=today if mode == 'launch' else None,
+                start_date_for_launch=None,
+                end_date_for_launch=None,
+            )
+            with connection.cursor() as cursor:
+                for model, _ in CHUNK_MODELS:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+            reminders = self._get_pending_reminders(practice_id).count()
+            timings = []
+            for _ in range(options['repeat']):
+                recorder, wall_time, rows_written = self._run(practice_id)
+                timings.append((wall_time, recorder.duration))
+
+            tracemalloc.start()
+            try:
+                self._run(practice_id)
+                _, peak_memory = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+
+        wall_time = statistics.median(timing[0] for timing in timings)
+        return {
+            'reminders': reminders,
+            'wall_time': wall_time,
+            'queries': recorder.count,
+            'db_time': statistics.median(timing[1] for timing in timings),
+            'rows_written': rows_written,
+            'peak_memory': peak_memory,
+            'reminders_per_second': reminders / wall_time if wall_time else 0.0,
+        }
+
+    @staticmethod
+    def _get_pending_reminders(practice_id: str) -> QuerySet:
+        task = SMSEventCreationTask()
+        task.practice = Practice.objects.select_related('settings').get(odu_id=practice_id)
+        task.launch_date = task.practice.settings.launch_date
+        return task._get_pending_reminders()
+
+    def _run(self, practice_id: str) -> tuple[QueryRecorder, float, int]:
+        '''Runs the task in a savepoint that is rolled back, so every run does the same work.'''
+        with transaction.atomic():
+            counts_before = self._count_rows(practice_id)
+            with QueryRecorder(stack_depth=0) as recorder:
+                started_at = time.perf_counter()
+                BenchmarkSMSEventCreationTask().run(practice_id)
+                wall_time = time.perf_counter() - started_at
+            counts_after = self._count_rows(practice_id)
+            transaction.set_rollback(True)
+        rows_written = sum(after - before for before, after in zip(counts_before, counts_after))
+        return recorder, wall_time, rows_written
+
+    @staticmethod
+    def _count_rows(practice_id: str) -> tuple[int, int, int]:
+        '''Checked reminders, SMS history and SMS events of the practice.'''
+        return (
+            Reminder.objects.filter(practice_id=practice_id, sms_status__isnull=False).count(),
+            SMSHistory.objects.filter(practice_id=practice_id).count(),
+            SMSEvent.objects.filter(context__practice_id=practice_id).count(),
+        )
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.call_center.api.serializers import ClientDetailSerializer
+from apps.call_center.api.views import ClientDetailView
+from apps.call_center.db.models import ClientCard
+from apps.call_center.services.client_detail_cache import ClientDetailCache
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the stored client cards of a random sample of clients with '
+        'the live output of ClientDetailSerializer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=100)
+
+    def handle(self, *args, **options):
+        cards = dict(
+            ClientCard.objects.order_by('?')
+            .values_list('client_id', 'version')[:options['sample']]
+        )
+        odu_ids = list(cards)
+        versions = ClientDetailCache.get_versions(odu_ids)
+        # cards of older versions are never served, only the current ones are compared
+        current_ids = [odu_id for odu_id in odu_ids if cards[odu_id] == versions[odu_id]]
+        documents = dict(
+            ClientCard.objects.filter(client_id__in=current_ids).values_list(
+                'client_id', 'document'
+            )
+        )
+        live = {
+            client.odu_id: json.loads(JSONRenderer().render(ClientDetailSerializer(client).data))
+            for client in ClientDetailView().get_queryset().filter(odu_id__in=current_ids)
+        }
+
+        differences = 0
+        for odu_id, document in documents.items():
+            if odu_id not in live:
+                differences += 1
+                self.stdout.write(f'{odu_id}: the client is not active any more')
+            elif document != live[odu_id]:
+                differences += 1
+                fields = [
+                    name for name in live[odu_id] if document.get(name) != live[odu_id][name]
+                ]
+                self.stdout.write(f'{odu_id}: {", ".join(fields)} differ')
+
+        self.stdout.write(
+            f'{len(odu_ids)} cards sampled, {len(odu_ids) - len(current_ids)} outdated, '
+            f'{len(documents)} compared, {differences} different'
+        )
+        if differences:
+            raise CommandError('client cards differ from the live client details')
@@ -0,0 +1,85 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.management.query_budgets import check_runs, get_budget_cases, run_case
+from apps.management.query_fixtures import QueryFixture
+from apps.users.db.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs every call center endpoint and the SMS and email tasks at several result '
+        'sizes against the current (seeded) database, inside transactions that are rolled '
+        'back, with Dialpad, the blob storage and the email sending mocked. Fails when a '
+        'case runs more queries than its budget, more queries than at the smallest size or '
+        'longer than its time budget, and shows the queries grouped by call site. The test '
+        'suite runs the same cases against synthetic data of two sizes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10,100',
+            type=lambda value: sorted(int(size) for size in value.split(',')),
+            help='comma separated result sizes, e.g. page limits or patients per request',
+        )
+        parser.add_argument(
+            '--practice', help='practice the cases read, the first active one by default'
+        )
+        parser.add_argument(
+            '--case', action='append', help='runs only the cases with these names'
+        )
+        parser.add_argument(
+            '--output', help='writes query counts and timings to this JSON file'
+        )
+
+    def handle(self, *args, **options):
+        fixture = QueryFixture.find(options['practice'])
+        if fixture is None:
+            raise CommandError(
+                'no callable clients or active practices, seed the database first'
+            )
+
+        user = User(email='budget-check@localhost', is_staff=True)
+        results = {}
+        failures = 0
+        for case in get_budget_cases(user, fixture):
+            if options['case'] and case.name not in options['case']:
+                continue
+            try:
+                runs = {size: run_case(case, size) for size in options['sizes']}
+            except AssertionError as error:
+                raise CommandError(f'{case.name}: {error}')
+            results[case.name] = {
+                size: {
+                    'queries': recorder.count,
+                    'db_ms': recorder.duration * 1000,
+                    'ms': duration,
+                }
+                for size, (recorder, duration) in runs.items()
+            }
+
+            problems = check_runs(case, runs)
+            self.stdout.write(
+                f'{case.name}: '
+                + ', '.join(
+                    f'size {size} {recorder.count} queries in {duration:.1f} ms '
+                    f'(db {recorder.duration * 1000:.1f} ms)'
+                    for size, (recorder, duration) in runs.items()
+                )
+                + f', {"FAILED" if problems else "ok"}'
+            )
+            if problems:
+                failures += 1
+                for problem in problems:
+                    self.stdout.write(f'  {problem}', self.style.ERROR)
+                recorder = runs[options['sizes'][-1]][0]
+                for line in recorder.get_report():
+                    self.stdout.write(f'  {line}')
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+        if failures:
+            raise CommandError(f'{failures} cases are over the query budget')
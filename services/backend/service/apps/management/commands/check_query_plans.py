@@ -0,0 +1,109 @@
+import difflib
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.management.query_fixtures import QueryFixture
+from apps.management.query_plans import (
+    COST_TOLERANCE,
+    LARGE_TABLE_ROWS,
+    capture_statements,
+    check_plan,
+    get_plan_cases,
+    get_table_rows,
+)
+from libs.db.utils import explain, render_plan
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the hot queries of the API and the SMS tasks against the current (seeded) '
+        'database, captures their SQL and checks EXPLAIN (FORMAT JSON) of every '
+        'statement: no sequential scans on large tables, total cost and row estimate '
+        'within the budget of the case and, with --baseline, no cost growth beyond '
+        '--tolerance. Statements are keyed by the case and a hash of their normalized SQL, '
+        'so the baseline stays valid when queries are added or reordered. Failed plans are '
+        'printed as a diff against the baseline. The test suite runs the same checks '
+        'against synthetic data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--client', help='client of the detail, a callable client with patients by default'
+        )
+        parser.add_argument(
+            '--practice', help='practice of the aggregation, the first active one by default'
+        )
+        parser.add_argument(
+            '--large-table-rows',
+            type=int,
+            default=LARGE_TABLE_ROWS,
+            help='tables with more estimated rows must not be scanned sequentially',
+        )
+        parser.add_argument('--baseline', help='JSON file with the plans to compare with')
+        parser.add_argument('--save-baseline', help='writes the current plans to this JSON file')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=COST_TOLERANCE,
+            help='allowed cost growth over the baseline',
+        )
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        fixture = QueryFixture.find(options['practice'], options['client'])
+        if fixture is None:
+            raise CommandError('no callable clients or active practices, seed the database first')
+
+        plans = {}
+        failures = 0
+        for case in get_plan_cases(fixture):
+            try:
+                statements = capture_statements(case)
+            except AssertionError as error:
+                raise CommandError(str(error))
+            for key, (alias, sql) in statements.items():
+                plan = explain(connections[alias], sql)['Plan']
+                plans[key] = plan
+                problems = check_plan(
+                    case,
+                    plan,
+                    get_table_rows(alias),
+                    baseline.get(key),
+                    options['large_table_rows'],
+                    options['tolerance'],
+                )
+                self.stdout.write(
+                    f'{key}: cost {plan["Total Cost"]:.0f}, rows {plan["Plan Rows"]}, '
+                    f'{"FAILED" if problems else "ok"}'
+                )
+                if problems:
+                    failures += 1
+                    self._write_failure(sql, plan, baseline.get(key), problems)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline_file:
+                json.dump(plans, baseline_file, indent=2)
+            self.stdout.write(f'{len(plans)} plans saved to {options["save_baseline"]}')
+        if failures:
+            raise CommandError(f'{failures} query plans are over the budget')
+
+    def _write_failure(
+        self, sql: str, plan: dict, baseline_plan: dict | None, problems: list[str]
+    ) -> None:
+        for problem in problems:
+            self.stdout.write(f'  {problem}', self.style.ERROR)
+        self.stdout.write(f'  {sql}', self.style.SQL_KEYWORD)
+        if baseline_plan is None:
+            lines = render_plan(plan)
+        else:
+            lines = difflib.unified_diff(
+                render_plan(baseline_plan), render_plan(plan), 'baseline', 'current', lineterm=''
+            )
+        for line in lines:
+            self.stdout.write(f'  {line}')
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.call_center.api.views import ClientContactedListView, ClientListView
+from apps.call_center.db.models import Practice
+from apps.users.db.models import User
+from libs.db.routers import PRIMARY_PIN_KEY, REPLICA_DB, pin_to_primary, use_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks the read replica routing against the primary and the replica '
+        'configured with REPLICA_POSTGRES_HOST, e.g. the local pair of '
+        'docker-compose.replica.yml.'
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA_DB not in settings.DATABASES:
+            raise CommandError('the replica is not configured, set REPLICA_POSTGRES_HOST')
+        user = User.objects.filter(is_active=True).first()
+        if user is None:
+            raise CommandError('an active user is required for the API requests')
+
+        with connections[REPLICA_DB].cursor() as cursor:
+            cursor.execute('SELECT pg_is_in_recovery(), now() - pg_last_xact_replay_timestamp()')
+            is_in_recovery, lag = cursor.fetchone()
+        self.stdout.write(f'replica is in recovery: {is_in_recovery}, replay lag: {lag}')
+
+        with use_replica():
+            practice = Practice.objects.first()
+        results = {
+            'reads in use_replica() go to the replica': (
+                practice is None or practice._state.db == REPLICA_DB
+            ),
+            'writes go to the primary': router.db_for_write(Practice) == DEFAULT_DB_ALIAS,
+            'writes of objects read from the replica go to the primary': (
+                practice is None
+                or router.db_for_write(Practice, instance=practice) == DEFAULT_DB_ALIAS
+            ),
+        }
+
+        cache.delete(PRIMARY_PIN_KEY.format(key=user.pk))
+        token = str(AccessToken.for_user(user))
+        for view_class in (ClientListView, ClientContactedListView):
+            primary_queries, replica_queries = self._get(view_class, token)
+            results[f'{view_class.__name__} reads the replica'] = (
+                replica_queries > 0 and primary_queries <= 1
+            )
+        pin_to_primary(user.pk)
+        for view_class in (ClientListView, ClientContactedListView):
+            primary_queries, replica_queries = self._get(view_class, token)
+            results[f'{view_class.__name__} reads the primary after a write'] = (
+                replica_queries == 0
+            )
+        cache.delete(PRIMARY_PIN_KEY.format(key=user.pk))
+
+        for name, is_passed in results.items():
+            self.stdout.write(f'{name}: {"ok" if is_passed else "FAILED"}')
+        if not all(results.values()):
+            raise CommandError('database routing is not as expected')
+
+    @staticmethod
+    def _get(view_class, token: str) -> tuple[int, int]:
+        '''Numbers of queries of the request on the primary and on the replica.'''
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary_queries, \
+                CaptureQueriesContext(connections[REPLICA_DB]) as replica_queries:
+            view_class.as_view()(request)
+        return len(primary_queries.captured_queries), len(replica_queries.captured_queries)
@@ -0,0 +1,66 @@
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.management.benchmarks import BenchmarkResults
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the results of two runs of a benchmark command and fails when a metric '
+        'got worse than the baseline by more than --threshold, or when the runs did '
+        'different work, e.g. wrote a different number of rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', help='JSON results of the baseline run')
+        parser.add_argument('current', help='JSON results of the run to check')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1, help='allowed relative change, 0.1 is 10%%'
+        )
+        parser.add_argument(
+            '--metric', action='append', help='compares only these metrics, all by default'
+        )
+
+    def handle(self, *args, **options):
+        baseline, current = BenchmarkResults.load(options['baseline']), BenchmarkResults.load(options['current'])
+        if baseline.benchmark != current.benchmark:
+            raise CommandError(f'cannot compare {baseline.benchmark} with {current.benchmark}')
+        self.stdout.write(
+            f'{current.benchmark}: {baseline.label or baseline.created_at} -> '
+            f'{current.label or current.created_at}'
+        )
+
+        baseline_runs = {run.name: run for run in baseline.runs}
+        problems = 0
+        for run in current.runs:
+            baseline_run = baseline_runs.get(run.name)
+            if baseline_run is None:
+                self.stdout.write(f'{run.name}: not in the baseline')
+                continue
+            self.stdout.write(run.name)
+            for metric, value in run.metrics.items():
+                if options['metric'] and metric not in options['metric']:
+                    continue
+                baseline_value = baseline_run.metrics.get(metric)
+                if baseline_value is None:
+                    continue
+                if baseline_value:
+                    change = (value - baseline_value) / baseline_value
+                else:
+                    change = math.inf if value > 0 else 0.0
+                if metric in current.exact:
+                    problem = value != baseline_value and 'DIFFERENT WORK'
+                elif metric in current.higher_is_better:
+                    problem = change < -options['threshold'] and 'REGRESSION'
+                else:
+                    problem = change > options['threshold'] and 'REGRESSION'
+                self.stdout.write(
+                    f'  {metric}: {baseline_value:.6g} -> {value:.6g} ({change:+.1%})'
+                    + (f' {problem}' if problem else ''),
+                    self.style.ERROR if problem else None,
+                )
+                problems += bool(problem)
+
+        if problems:
+            raise CommandError(f'{problems} metrics are over the threshold or not comparable')
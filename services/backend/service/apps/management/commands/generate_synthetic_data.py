@@ -0,0 +1,68 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.management.synthetic_data import CHUNK_MODELS, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates practices with realistic clients, pets, phones, emails, reminders, '
+        'appointments and SMS history and loads them with COPY in one transaction. '
+        'The same seed, prefix and date give the same rows. Practices sizes are given '
+        'either with --sizes or with --practices and --clients-per-practice.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--practices', type=int, default=10)
+        parser.add_argument('--clients-per-practice', type=int, default=2000)
+        parser.add_argument(
+            '--sizes',
+            type=lambda value: [int(size) for size in value.split(',')],
+            help='comma separated numbers of clients, one practice per number',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='synthetic', help='prefix of the generated ids')
+        parser.add_argument(
+            '--today',
+            type=datetime.date.fromisoformat,
+            help='date the generated dates are relative to, today by default',
+        )
+        parser.add_argument('--archived-rate', type=float, default=0.05)
+        parser.add_argument(
+            '--launching-rate',
+            type=float,
+            default=0.1,
+            help='share of practices whose SMS launch date is today',
+        )
+        parser.add_argument('--force', action='store_true')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off, pass --force to load data into this database')
+
+        generator = SyntheticDataGenerator(options['seed'], options['prefix'], options['today'])
+        if generator.exists():
+            raise CommandError(f'practices prefixed with {options["prefix"]} exist, pass another --prefix')
+        sizes = options['sizes'] or [options['clients_per_practice']] * options['practices']
+
+        started_at = time.perf_counter()
+        with transaction.atomic():
+            counts = generator.generate(
+                sizes,
+                archived_rate=options['archived_rate'],
+                launching_rate=options['launching_rate'],
+            )
+        duration = time.perf_counter() - started_at
+
+        for model_name, count in counts.items():
+            self.stdout.write(f'{model_name}: {count} rows')
+        total = sum(counts.values())
+        self.stdout.write(f'{total} rows in {duration:.1f} s, {total / duration:.0f} rows/s')
+
+        with connection.cursor() as cursor:
+            for model, _ in CHUNK_MODELS:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
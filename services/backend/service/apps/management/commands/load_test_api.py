@@ -0,0 +1,332 @@
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlencode, urlsplit
+
+import arrow
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.call_center.db.models import Client, Phone
+from apps.management.benchmarks import BenchmarkResults, BenchmarkRun
+from apps.sms.db.models import PracticeSMSActivity
+
+API_PREFIX = '/api/v1/'
+DEFAULT_MIX = 'search=3,phone_filter=2,client_detail=4,client_detail_update=1,contacted=2,practices=1'
+
+
+@dataclass
+class Samples:
+    '''Values of the seeded database the requests are built from.'''
+    clients: list[tuple[str, str, str]]
+    phone_numbers: list[str]
+    practice_ids: list[str]
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    latency: float
+    status: int
+    size: int
+    finished_at: float
+
+
+def get_contacted_query(rng: random.Random, samples: Samples) -> dict:
+    query = {'limit': 10}
+    if samples.practice_ids and rng.random() < 0.7:
+        query['practice'] = ','.join(rng.sample(samples.practice_ids, min(3, len(samples.practice_ids))))
+    if rng.random() < 0.3:
+        query['sent_after'] = arrow.utcnow().shift(days=-rng.randint(1, 90)).format('YYYY-MM-DD')
+    if rng.random() < 0.2:
+        query['followed'] = 'true'
+    if rng.random() < 0.1:
+        query['name'] = rng.choice(samples.clients)[1][:4]
+    return query
+
+
+def get_client_update(rng: random.Random, samples: Samples) -> tuple[str, dict]:
+    # writes the name the client already has
+    odu_id, _, first_name = rng.choice(samples.clients)
+    return f'call-center/clients/{odu_id}', {'first_name': first_name}
+
+
+# endpoint name: (method, function returning the path and the body)
+ENDPOINTS: dict[str, tuple[str, Callable[[random.Random, Samples], tuple[str, dict | None]]]] = {
+    'search': (
+        'GET',
+        lambda rng, samples: (f'call-center/clients/?{urlencode({"search": rng.choice(samples.clients)[1]})}', None),
+    ),
+    'phone_filter': (
+        'GET',
+        lambda rng, samples: (
+            f'call-center/clients/?{urlencode({"phone_number": rng.choice(samples.phone_numbers)})}',
+            None,
+        ),
+    ),
+    'client_detail': (
+        'GET',
+        lambda rng, samples: (f'call-center/clients/{rng.choice(samples.clients)[0]}', None),
+    ),
+    'client_detail_update': ('PATCH', get_client_update),
+    'contacted': (
+        'GET',
+        lambda rng, samples: (
+            f'call-center/clients/contacted/?{urlencode(get_contacted_query(rng, samples))}',
+            None,
+        ),
+    ),
+    'practices': ('GET', lambda rng, samples: ('call-center/practices/', None)),
+    'typeahead': (
+        'GET',
+        lambda rng, samples: (
+            f'call-center/clients/typeahead/?{urlencode({"query": rng.choice(samples.clients)[1][:3]})}',
+            None,
+        ),
+    ),
+}
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f'unknown endpoint {name}')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class LoadTestClient:
+    '''HTTP client of a worker, one keep-alive connection with the shared token.'''
+
+    def __init__(self, base_url: str, token: 'TokenHolder'):
+        url = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.path_prefix = url.path.rstrip('/') + API_PREFIX
+        self.token = token
+        self.connection = None
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, bytes]:
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=60)
+            headers = {'Authorization': f'Bearer {self.token.get()}', 'Accept': 'application/json'}
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+            try:
+                self.connection.request(
+                    method,
+                    self.path_prefix + path,
+                    body=json.dumps(body) if body is not None else None,
+                    headers=headers,
+                )
+                response = self.connection.getresponse()
+                content = response.read()
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+                continue
+            if response.status == 401 and not attempt:
+                self.token.refresh()
+                continue
+            return response.status, content
+
+
+class TokenHolder:
+    '''Access token shared by the workers, obtained again when it expires.'''
+
+    def __init__(self, base_url: str, email: str, password: str):
+        self.base_url = base_url
+        self.credentials = {'email': email, 'password': password}
+        self._lock = threading.Lock()
+        self._token = None
+        self._obtained_at = 0.0
+
+    def get(self) -> str:
+        if self._token is None:
+            self.refresh()
+        return self._token
+
+    def refresh(self) -> None:
+        requested_at = time.monotonic()
+        with self._lock:
+            # another worker refreshed it meanwhile
+            if self._obtained_at > requested_at:
+                return
+            url = urlsplit(self.base_url)
+            connection_class = (
+                http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+            )
+            connection = connection_class(url.netloc, timeout=60)
+            try:
+                connection.request(
+                    'POST',
+                    url.path.rstrip('/') + API_PREFIX + 'auth/token/',
+                    body=json.dumps(self.credentials),
+                    headers={'Content-Type': 'application/json'},
+                )
+                response = connection.getresponse()
+                content = response.read()
+            finally:
+                connection.close()
+            if response.status != 200:
+                raise CommandError(f'authentication failed with {response.status}: {content[:200]!r}')
+            self._token = json.loads(content)['access']
+            self._obtained_at = time.monotonic()
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays a weighted mix of call center requests against a running server with '
+        'seeded data, from concurrent workers authenticated through /api/v1/auth/token/, '
+        'and reports the throughput and the latency percentiles per endpoint. Request '
+        'parameters are sampled from the database of the server. Results saved with '
+        '--output are compared with compare_benchmarks, e.g. before and after a caching '
+        f'change. Endpoints: {", ".join(ENDPOINTS)}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--email', default=config('LOAD_TEST_EMAIL', default=''))
+        parser.add_argument(
+            '--password',
+            default=config('LOAD_TEST_PASSWORD', default=''),
+            help='LOAD_TEST_PASSWORD by default, so it is not kept in the shell history',
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='number of schedulers')
+        parser.add_argument('--duration', type=float, default=60, help='seconds of the measured run')
+        parser.add_argument('--warmup', type=float, default=10, help='seconds of requests not measured')
+        parser.add_argument('--mix', default=DEFAULT_MIX, type=parse_mix, help='endpoint=weight pairs')
+        parser.add_argument('--samples', type=int, default=1000, help='clients to build requests from')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='writes the results to this JSON file')
+        parser.add_argument('--label', default='', help='name of the run in the results')
+
+    def handle(self, *args, **options):
+        if not options['email'] or not options['password']:
+            raise CommandError('pass --email and --password or set LOAD_TEST_EMAIL and LOAD_TEST_PASSWORD')
+        samples = self._get_samples(options['samples'])
+        token = TokenHolder(options['base_url'], options['email'], options['password'])
+        token.refresh()
+
+        started_at = time.monotonic()
+        measured_from = started_at + options['warmup']
+        deadline = measured_from + options['duration']
+        self.stdout.write(
+            f'{options["concurrency"]} workers for {options["warmup"]:.0f} + '
+            f'{options["duration"]:.0f} s against {options["base_url"]}'
+        )
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            futures = [
+                executor.submit(
+                    self._work, worker, options, samples, token, deadline
+                )
+                for worker in range(options['concurrency'])
+            ]
+            results = [
+                sample
+                for future in futures
+                for sample in future.result()
+                if sample.finished_at >= measured_from
+            ]
+
+        if not results:
+            raise CommandError('no request finished in the measured time')
+        runs = self._summarize(results, options['duration'])
+        if options['output']:
+            BenchmarkResults(
+                benchmark='api_load',
+                runs=runs,
+                higher_is_better=('throughput',),
+                label=options['label'],
+            ).save(options['output'])
+
+    @staticmethod
+    def _get_samples(count: int) -> Samples:
+        clients = list(
+            Client.objects.filter(is_callable=True)
+            .order_by('?')
+            .values_list('odu_id', 'full_name', 'first_name')[:count]
+        )
+        if not clients:
+            raise CommandError('no callable clients, seed the database first')
+        phone_numbers = list(
+            Phone.objects.filter(
+                client_id__in=[client[0] for client in clients],
+                is_primary=True,
+                app_number__isnull=False,
+                extractor_removed_at__isnull=True,
+            ).values_list('app_number', flat=True)
+        )
+        practice_ids = list(PracticeSMSActivity.objects.values_list('practice_id', flat=True))
+        return Samples(clients, phone_numbers or ['0000000000'], practice_ids)
+
+    @staticmethod
+    def _work(
+        worker: int, options: dict, samples: Samples, token: TokenHolder, deadline: float
+    ) -> list[Sample]:
+        rng = random.Random(f'{options["seed"]}:{worker}')
+        names, weights = list(options['mix']), list(options['mix'].values())
+        client = LoadTestClient(options['base_url'], token)
+        results = []
+        while time.monotonic() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            method, build = ENDPOINTS[endpoint]
+            path, body = build(rng, samples)
+            started_at = time.monotonic()
+            try:
+                status, content = client.request(method, path, body)
+            except (http.client.HTTPException, OSError):
+                status, content = 0, b''
+            finished_at = time.monotonic()
+            results.append(
+                Sample(endpoint, finished_at - started_at, status, len(content), finished_at)
+            )
+        return results
+
+    def _summarize(self, results: list[Sample], duration: float) -> list[BenchmarkRun]:
+        by_endpoint: dict[str, list[Sample]] = {}
+        for sample in results:
+            by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+        runs = []
+        self.stdout.write(
+            f'{"endpoint":<22}{"requests":>10}{"req/s":>9}{"errors":>8}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"KiB":>8}'
+        )
+        for endpoint, samples in sorted(by_endpoint.items()) + [('total', results)]:
+            latencies = [sample.latency * 1000 for sample in samples]
+            percentiles = (
+                statistics.quantiles(latencies, n=100, method='inclusive')
+                if len(latencies) > 1
+                else latencies * 99
+            )
+            errors = sum(not 200 <= sample.status < 400 for sample in samples)
+            metrics = {
+                'throughput': len(samples) / duration,
+                'error_rate': errors / len(samples),
+                'mean': statistics.fmean(latencies),
+                'p50': percentiles[49],
+                'p95': percentiles[94],
+                'p99': percentiles[98],
+                'response_size': statistics.fmean(sample.size for sample in samples),
+            }
+            runs.append(BenchmarkRun(name=endpoint, metrics=metrics, parameters={'requests': len(samples)}))
+            self.stdout.write(
+                f'{endpoint:<22}{len(samples):>10}{metrics["throughput"]:>9.1f}{errors:>8}'
+                f'{metrics["p50"]:>9.1f}{metrics["p95"]:>9.1f}{metrics["p99"]:>9.1f}'
+                f'{metrics["response_size"] / 1024:>8.1f}'
+            )
+        return runs
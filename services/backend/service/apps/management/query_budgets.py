@@ -0,0 +1,292 @@
+import itertools
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Callable
+from unittest import mock
+
+import arrow
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.call_center.api.serializers import get_active_clients, get_active_patients
+from apps.call_center.consts import PATIENT_OUTCOMES_BULK_UPDATE_MAX_SIZE, TYPEAHEAD_MAX_LIMIT
+from apps.call_center.db.models import Practice
+from apps.call_center.services.client_detail_cache import ClientDetailCache
+from apps.email.consts import DATE_FORMAT_TO_GET_FILES, FILE_EXTENSION, UpdatesEmailEventStatus
+from apps.email.db.models import UpdatesEmailEvent
+from apps.email.tasks import daily_updates_emailing
+from apps.email.tasks.daily_updates_emailing import CreateDailyUpdatesEmailEventsPeriodicTask
+from apps.management.query_fixtures import QueryFixture, get_allowed_host
+from apps.sms.consts import SMSEventStatus
+from apps.sms.db.models import SMSEvent, SMSHistory
+from apps.sms.tasks import sms_sending
+from apps.sms.tasks.sms_aggregating import SMSEventCreationTask
+from apps.users.db.models import User
+from libs.db.queries import QueryRecorder
+
+API_PREFIX = '/api/v1/call-center/'
+DEFAULT_MAX_MS = 2_000
+
+
+@dataclass
+class BudgetCase:
+    name: str
+    run: Callable[[int], object]
+    max_queries: int
+    max_ms: float = DEFAULT_MAX_MS
+
+
+class LimitedSMSEventCreationTask(SMSEventCreationTask):
+    '''Aggregates only the first `limit` patients of the practice.'''
+    limit: int | None = None
+
+    def _get_patients_iterator(self):
+        return itertools.islice(super()._get_patients_iterator(), self.limit)
+
+
+def mock_providers(stack: ExitStack, server_id: int) -> None:
+    '''
+    Replaces Dialpad, the blob storage and the email sending with mocks and
+    keeps the tasks from being queued. The storage lists one updates file of
+    the server.
+    '''
+    stack.enter_context(override_settings(SEND_DIALPAD_SMS=True))
+    stack.enter_context(mock.patch.object(sms_sending, 'CustomDialpadClient'))
+    blob_service_client = stack.enter_context(
+        mock.patch.object(daily_updates_emailing, 'get_blob_service_client')
+    ).return_value
+    yesterday = arrow.utcnow().shift(days=-1).format(DATE_FORMAT_TO_GET_FILES)
+    blob_service_client.get_container_client.return_value.list_blob_names.return_value = [
+        f'{settings.UPDATES_PATH_PREFIX}/{yesterday}/{server_id}/updates{FILE_EXTENSION}'
+    ]
+    blob_service_client.get_blob_client.return_value.download_blob.return_value.readinto = (
+        lambda buffer: buffer.write(b'updates')
+    )
+    stack.enter_context(mock.patch.object(daily_updates_emailing, 'EmailSendingService'))
+    for task_class in (
+        sms_sending.SMSSendingTask,
+        daily_updates_emailing.SendDailyUpdatesEmailTask,
+    ):
+        stack.enter_context(mock.patch.object(task_class, 'apply_async'))
+    stack.enter_context(
+        mock.patch.object(
+            CreateDailyUpdatesEmailEventsPeriodicTask,
+            '_is_work_day',
+            return_value=True,
+        )
+    )
+
+
+def get_budget_cases(user: User, fixture: QueryFixture) -> list[BudgetCase]:
+    '''
+    Every call center endpoint and the SMS and email tasks, with the providers
+    mocked by mock_providers(). The size is the page limit or the number of
+    patients the case reads. Client detail documents are invalidated before
+    they are read.
+    '''
+    practice_id = fixture.practice_id
+    client = fixture.client
+    clients = get_active_clients().filter(server__practices=practice_id)
+    server_id = Practice.objects.values_list('server_id', flat=True).get(odu_id=practice_id)
+
+    def get(path: str, **query_params):
+        return request(user, 'get', path, query_params)
+
+    def patch(path: str, data: dict):
+        return request(user, 'patch', path, data)
+
+    def with_providers(run: Callable[[int], object]) -> Callable[[int], object]:
+        def run_with_providers(size: int):
+            with ExitStack() as stack:
+                mock_providers(stack, server_id)
+                return run(size)
+        return run_with_providers
+
+    def get_client_detail(size: int):
+        # the client with most patients up to the size, read past the detail cache
+        odu_id = (
+            clients.annotate(patient_count=Count('relationships'))
+            .filter(patient_count__lte=size)
+            .order_by('-patient_count')
+            .values_list('odu_id', flat=True)
+            .first()
+        ) or client.odu_id
+        ClientDetailCache.bump([odu_id])
+        return get(f'clients/{odu_id}')
+
+    def update_outcomes(size: int):
+        patient_ids = (
+            get_active_patients()
+            .filter(server__practices=practice_id)
+            .values_list('odu_id', flat=True)
+            .distinct()[:min(size, PATIENT_OUTCOMES_BULK_UPDATE_MAX_SIZE)]
+        )
+        return patch(
+            'patients/outcomes/',
+            {
+                'patients': [
+                    {'odu_id': odu_id, 'comment': 'budget check'} for odu_id in patient_ids
+                ],
+            },
+        )
+
+    def aggregate_reminders(size: int):
+        task = LimitedSMSEventCreationTask()
+        task.limit = size
+        return task.run(practice_id)
+
+    def manage_sms_events(size: int):
+        # the events of the practice are due, at most SMS_LIMIT_PER_MINUTE are claimed
+        SMSEvent.objects.filter(context__practice_id=practice_id).update(
+            send_at=arrow.utcnow().datetime, status=SMSEventStatus.PENDING.value
+        )
+        return sms_sending.SMSEventPeriodicTask().run()
+
+    def send_sms(size: int):
+        event_context = SMSHistory.objects.values_list('event_context', flat=True).get(
+            uuid=fixture.sms_history_id
+        )
+        event = SMSEvent.objects.create(
+            send_at=arrow.utcnow().datetime,
+            context=event_context,
+            status=SMSEventStatus.IN_PROGRESS.value,
+        )
+        return sms_sending.SMSSendingTask().run(str(event.uuid))
+
+    def send_daily_updates(size: int):
+        date = arrow.utcnow().shift(days=-1).format(DATE_FORMAT_TO_GET_FILES)
+        event = UpdatesEmailEvent.objects.create(
+            status=UpdatesEmailEventStatus.PENDING.value,
+            file_paths=[
+                f'{settings.UPDATES_PATH_PREFIX}/{date}/{server_id}/updates{FILE_EXTENSION}'
+            ],
+            practice_id=practice_id,
+        )
+        return daily_updates_emailing.SendDailyUpdatesEmailTask().run(str(event.uuid))
+
+    cases = [
+        BudgetCase('clients', lambda size: get('clients/', limit=size), 5),
+        BudgetCase('clients search', lambda size: get('clients/', search=client.full_name), 5),
+        BudgetCase(
+            'clients phone filter',
+            lambda size: get('clients/', phone_number=fixture.phone_number),
+            5,
+        ),
+        BudgetCase(
+            'clients typeahead',
+            lambda size: get(
+                'clients/typeahead/',
+                query=client.full_name,
+                limit=min(size, TYPEAHEAD_MAX_LIMIT),
+            ),
+            3,
+        ),
+        BudgetCase(
+            'clients caller ID',
+            lambda size: get('clients/caller-id/', number=fixture.phone_number),
+            3,
+        ),
+        BudgetCase(
+            'clients export',
+            lambda size: b''.join(get('clients/export/', file_format='csv').streaming_content),
+            2,
+        ),
+        BudgetCase('client detail', get_client_detail, 12),
+        BudgetCase(
+            'client detail update',
+            lambda size: patch(f'clients/{client.odu_id}', {'first_name': 'Budget'}),
+            25,
+        ),
+        BudgetCase(
+            'contacted clients',
+            lambda size: get('clients/contacted/', limit=size, cursor=''),
+            8,
+        ),
+        BudgetCase(
+            'contacted clients of a practice',
+            lambda size: get('clients/contacted/', limit=size, cursor='', practice=practice_id),
+            8,
+        ),
+        BudgetCase('patient outcomes', update_outcomes, 8),
+        BudgetCase('practices', lambda size: get('practices/'), 3),
+        BudgetCase('outcomes', lambda size: get('outcomes/'), 3),
+        BudgetCase('FAQ', lambda size: get(f'faq/{practice_id}'), 3),
+        BudgetCase('SMS event creation', aggregate_reminders, 15),
+        BudgetCase('SMS event manager', with_providers(manage_sms_events), 6),
+        # one event per practice with email updates, whatever the number of clients
+        BudgetCase(
+            'daily updates manager',
+            with_providers(lambda size: CreateDailyUpdatesEmailEventsPeriodicTask().run()),
+            10,
+        ),
+        BudgetCase('daily updates email', with_providers(send_daily_updates), 8),
+    ]
+    if fixture.sms_history_id is not None:
+        cases += [
+            BudgetCase('SMS sending', with_providers(send_sms), 10),
+            BudgetCase(
+                'SMS follow switch',
+                lambda size: patch(f'sms/{fixture.sms_history_id}/switch/', {}),
+                3,
+            ),
+        ]
+    return cases
+
+
+def run_case(case: BudgetCase, size: int) -> tuple[QueryRecorder, float]:
+    '''Runs the case in a transaction that is rolled back, returns its queries and milliseconds.'''
+    with transaction.atomic():
+        with QueryRecorder() as recorder:
+            started_at = time.perf_counter()
+            case.run(size)
+            duration = (time.perf_counter() - started_at) * 1000
+        transaction.set_rollback(True)
+    return recorder, duration
+
+
+def check_runs(case: BudgetCase, runs: dict[int, tuple[QueryRecorder, float]]) -> list[str]:
+    '''
+    The problems of the runs of the case by size: more queries than the
+    budget or than at the smallest size, or more milliseconds than max_ms.
+    '''
+    problems = []
+    smallest_count = runs[min(runs)][0].count
+    for size, (recorder, duration) in sorted(runs.items()):
+        if recorder.count > case.max_queries:
+            problems.append(
+                f'{recorder.count} queries at size {size}, the budget is {case.max_queries}'
+            )
+        if recorder.count > smallest_count:
+            problems.append(
+                f'{recorder.count} queries at size {size}, {smallest_count} at the smallest size'
+            )
+        if duration > case.max_ms:
+            problems.append(
+                f'{duration:.0f} ms at size {size}, the budget is {case.max_ms:.0f} ms'
+            )
+    return problems
+
+
+def request(user: User, method: str, path: str, data: dict):
+    path = f'{API_PREFIX}{path}'
+    factory = APIRequestFactory()
+    if method == 'get':
+        api_request = factory.get(path, data, HTTP_HOST=get_allowed_host())
+    else:
+        api_request = getattr(factory, method)(
+            path, data, format='json', HTTP_HOST=get_allowed_host()
+        )
+    # the user is not saved, the endpoints only check its flags
+    force_authenticate(api_request, user=user)
+    match = resolve(path)
+    response = match.func(api_request, *match.args, **match.kwargs)
+    if response.status_code >= 400:
+        raise AssertionError(
+            f'{method.upper()} {path} returned {response.status_code}: {response.data}'
+        )
+    return response
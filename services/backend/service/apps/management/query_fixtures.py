@@ -0,0 +1,76 @@
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+
+from apps.call_center.api.serializers import get_active_clients
+from apps.call_center.db.models import Client, Phone, Practice
+from apps.management.synthetic_data import CHUNK_MODELS, SyntheticDataGenerator
+from apps.sms.db.models import SMSHistory
+
+
+@dataclass
+class QueryFixture:
+    '''The practice and the client the query budget and plan cases read.'''
+    practice_id: str
+    client: Client
+    phone_number: str
+    sms_history_id: uuid.UUID | None
+
+    @classmethod
+    def find(
+        cls, practice_id: str | None = None, client_id: str | None = None
+    ) -> 'QueryFixture | None':
+        '''
+        The practice, the first active one by default, and a callable client
+        of its server, one with patients by default.
+        '''
+        if practice_id is None:
+            practice_id = (
+                Practice.objects.filter(is_archived=False)
+                .values_list('odu_id', flat=True)
+                .first()
+            )
+        clients = get_active_clients().only('odu_id', 'full_name')
+        if client_id is None:
+            client = clients.filter(
+                server__practices=practice_id, relationships__isnull=False
+            ).first()
+        else:
+            client = clients.filter(odu_id=client_id).first()
+        if practice_id is None or client is None:
+            return None
+        return cls(
+            practice_id=practice_id,
+            client=client,
+            phone_number=(
+                Phone.objects.filter(
+                    client=client, is_primary=True, extractor_removed_at__isnull=True
+                )
+                .values_list('app_number', flat=True)
+                .first()
+            ) or '0000000000',
+            sms_history_id=(
+                SMSHistory.objects.filter(practice_id=practice_id)
+                .values_list('uuid', flat=True)
+                .first()
+            ),
+        )
+
+    @classmethod
+    def generate(cls, size: int, seed: int, prefix: str) -> 'QueryFixture':
+        '''Generates a practice of `size` clients in the current transaction and finds it.'''
+        SyntheticDataGenerator(seed, prefix).generate([size], archived_rate=0, launching_rate=0)
+        with connection.cursor() as cursor:
+            for model, _ in CHUNK_MODELS:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        return cls.find(f'{prefix}-practice-1')
+
+
+def get_allowed_host() -> str:
+    '''A host the request factory can use without failing ALLOWED_HOSTS validation.'''
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
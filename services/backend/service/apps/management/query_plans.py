@@ -0,0 +1,174 @@
+import itertools
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.call_center.api.views import (
+    ClientContactedListView,
+    ClientDetailView,
+    ClientListView,
+)
+from apps.call_center.db.models import Practice
+from apps.management.query_fixtures import QueryFixture, get_allowed_host
+from apps.sms.consts import PATIENTS_CHUNK_SIZE, SMS_LIMIT_PER_MINUTE
+from apps.sms.tasks.sms_aggregating import SMSEventCreationTask
+from apps.sms.tasks.sms_sending import SMSEventPeriodicTask
+from apps.users.db.models import User
+from libs.db.utils import describe_plan_node, get_statement_key, iter_plan_nodes
+
+SELECT_PREFIXES = ('SELECT', 'WITH', '(')
+# tables with more estimated rows must not be scanned sequentially
+LARGE_TABLE_ROWS = 10_000
+# allowed cost growth over the baseline
+COST_TOLERANCE = 0.5
+
+
+@dataclass
+class PlanCase:
+    name: str
+    run: Callable[[], object]
+    max_cost: float
+    max_rows: int
+
+
+def get_plan_cases(fixture: QueryFixture) -> list[PlanCase]:
+    '''The hot queries of the API and the SMS tasks, for the practice and client of the fixture.'''
+    client = fixture.client
+    task = SMSEventCreationTask()
+    task.practice = Practice.objects.select_related('settings').get(odu_id=fixture.practice_id)
+    task.launch_date = None
+    detail_view = ClientDetailView(
+        request=get_request(), kwargs={'odu_id': client.odu_id}, format_kwarg=None
+    )
+    return [
+        PlanCase(
+            'aggregation patients',
+            # the first chunk runs the scan and every prefetch once
+            lambda: list(itertools.islice(task._get_patients_iterator(), PATIENTS_CHUNK_SIZE)),
+            max_cost=500_000,
+            max_rows=100_000,
+        ),
+        PlanCase('client list', lambda: get_view(ClientListView), 10_000, 1_000),
+        PlanCase(
+            'client search',
+            lambda: get_view(ClientListView, search=client.full_name),
+            10_000,
+            1_000,
+        ),
+        PlanCase(
+            'client phone filter',
+            lambda: get_view(ClientListView, phone_number=fixture.phone_number),
+            10_000,
+            1_000,
+        ),
+        PlanCase('client detail', detail_view.get_data, 10_000, 1_000),
+        PlanCase(
+            'client detail update',
+            lambda: list(detail_view.get_queryset().filter(odu_id=client.odu_id)),
+            10_000,
+            1_000,
+        ),
+        PlanCase(
+            'contacted clients',
+            lambda: get_view(ClientContactedListView, cursor=''),
+            10_000,
+            1_000,
+        ),
+        PlanCase(
+            'contacted clients of a practice',
+            lambda: get_view(
+                ClientContactedListView, cursor='', practice=fixture.practice_id
+            ),
+            10_000,
+            1_000,
+        ),
+        PlanCase(
+            'SMS event claim',
+            lambda: list(SMSEventPeriodicTask.get_events_to_run(SMS_LIMIT_PER_MINUTE)),
+            1_000,
+            SMS_LIMIT_PER_MINUTE,
+        ),
+    ]
+
+
+def get_request(**query_params):
+    request = APIRequestFactory().get('/', query_params, HTTP_HOST=get_allowed_host())
+    # the views do not load the user, an unsaved one is enough
+    force_authenticate(request, user=User(email='plan-check@localhost'))
+    return request
+
+
+def get_view(view_class, **query_params):
+    response = view_class.as_view()(get_request(**query_params))
+    if response.status_code != 200:
+        raise AssertionError(f'{view_class.__name__} returned {response.status_code}')
+    return response
+
+
+def capture_statements(case: PlanCase) -> dict[str, tuple[str, str]]:
+    '''
+    Runs the case and returns the SELECT statements it executed on every
+    database, keyed by the case and the hash of the normalized statement.
+    '''
+    with ExitStack() as stack:
+        captures = {
+            alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        }
+        # the SMS event claim locks rows, nothing is kept
+        with transaction.atomic():
+            case.run()
+            transaction.set_rollback(True)
+
+    statements = {}
+    for alias, capture in captures.items():
+        for query in capture.captured_queries:
+            sql = query['sql']
+            if sql.lstrip().upper().startswith(SELECT_PREFIXES):
+                # a statement repeated with other parameters is explained once
+                statements.setdefault(f'{case.name} {get_statement_key(sql)}', (alias, sql))
+    return statements
+
+
+def get_table_rows(alias: str) -> dict[str, float]:
+    '''Estimated rows of every table of the database.'''
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )
+        return dict(cursor.fetchall())
+
+
+def check_plan(
+    case: PlanCase,
+    plan: dict,
+    table_rows: dict[str, float],
+    baseline_plan: dict | None = None,
+    large_table_rows: int = LARGE_TABLE_ROWS,
+    tolerance: float = COST_TOLERANCE,
+) -> list[str]:
+    '''
+    The problems of the plan: sequential scans of large tables, cost or row
+    estimate over the budget of the case and cost growth over the baseline.
+    '''
+    problems = []
+    for _, node in iter_plan_nodes(plan):
+        table = node.get('Relation Name')
+        if node['Node Type'] == 'Seq Scan' and table_rows.get(table, 0) >= large_table_rows:
+            problems.append(
+                f'{describe_plan_node(node)}, {table_rows[table]:.0f} rows in the table'
+            )
+    if plan['Total Cost'] > case.max_cost:
+        problems.append(f'cost {plan["Total Cost"]:.0f} is over {case.max_cost:.0f}')
+    if plan['Plan Rows'] > case.max_rows:
+        problems.append(f'{plan["Plan Rows"]} estimated rows are over {case.max_rows}')
+    if baseline_plan:
+        baseline_cost = baseline_plan['Total Cost']
+        if plan['Total Cost'] > baseline_cost * (1 + tolerance):
+            problems.append(f'cost grew from {baseline_cost:.0f} to {plan["Total Cost"]:.0f}')
+    return problems
@@ -0,0 +1,548 @@
+import datetime
+import json
+import random
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Type
+
+from django.db import connection
+from django.db.models import Min, Model
+
+from apps.call_center.consts import ReminderStatus
+from apps.call_center.db.models import (
+    Appointment,
+    Client,
+    ClientPatientRelationship,
+    Email,
+    Patient,
+    Phone,
+    Practice,
+    PracticeSettings,
+    Reminder,
+    Server,
+)
+from apps.call_center.db.entities.practices import practice_list_cache
+from apps.sms.consts import (
+    DEFAULT_SMS_TEMPLATE_W_LINK,
+    DEFAULT_SMS_TEMPLATE_W_PHONE,
+    MAX_EXPIRY_PERIOD_IN_YEARS,
+    MIN_EXPIRY_PERIOD_IN_WEEKS,
+    PHONE_TYPES_TO_EXCLUDE,
+    SEND_AT_HOUR,
+    SMSEventStatus,
+    SMSHistoryStatus,
+)
+from apps.sms.dataclasses import SMSContext
+from apps.sms.db.models import PracticeSMSActivity, SMSEvent, SMSHistory, SMSTemplate
+from libs.db.utils import copy_rows
+
+# rows of this many clients are generated and copied at once
+CLIENTS_CHUNK_SIZE = 5000
+# 11am ET in UTC, the hour the SMS are sent at
+SEND_AT_UTC_HOUR = SEND_AT_HOUR + 4
+
+# weights of the number of rows per parent
+PETS_PER_CLIENT = {1: 50, 2: 27, 3: 12, 4: 6, 5: 3, 6: 1, 8: 1}
+PHONES_PER_CLIENT = {0: 5, 1: 60, 2: 25, 3: 10}
+REMINDERS_PER_PATIENT = {0: 10, 1: 15, 2: 20, 3: 20, 4: 15, 6: 10, 10: 7, 16: 3}
+APPOINTMENTS_PER_PATIENT = {0: 15, 1: 20, 2: 20, 4: 20, 8: 15, 15: 10}
+# None stands for a type of PHONE_TYPES_TO_EXCLUDE
+PHONE_TYPES = {'Mobile': 50, 'Cell': 15, 'Home': 15, 'Phone 1|Home': 2, 'Other': 5, None: 8, '': 5}
+REMINDER_STATUSES = {
+    ReminderStatus.CHECKED.value: 35,
+    ReminderStatus.EVENT_CREATED.value: 30,
+    ReminderStatus.APPOINTMENT_EXISTS.value: 15,
+    ReminderStatus.NO_PHONE.value: 10,
+    ReminderStatus.NO_ACTIVE_CLIENT.value: 5,
+    ReminderStatus.EXCLUDED_PHONE_TYPE.value: 5,
+}
+SMS_HISTORY_STATUSES = {
+    SMSHistoryStatus.SENT.value: 90,
+    SMSHistoryStatus.ERROR.value: 5,
+    SMSHistoryStatus.PENDING.value: 5,
+}
+
+CLIENT_DELETED_RATE = 0.02
+CLIENT_INACTIVE_RATE = 0.04
+CLIENT_SUSPENDED_RATE = 0.01
+CLIENT_OTHER_PRACTICE_RATE = 0.02
+PATIENT_UNNAMED_RATE = 0.01
+PATIENT_DECEASED_RATE = 0.03
+PATIENT_INACTIVE_RATE = 0.02
+CO_OWNED_PATIENT_RATE = 0.03
+SHARED_PHONE_NUMBER_RATE = 0.02
+EMAIL_RATE = 0.7
+SECONDARY_EMAIL_RATE = 0.05
+SOFT_DELETED_RATE = 0.03
+DAILY_REMINDER_RATE = 0.06
+DUPLICATE_REMINDER_RATE = 0.08
+PENDING_PAST_REMINDER_RATE = 0.15
+CANCELED_APPOINTMENT_RATE = 0.05
+FOLLOWED_SMS_RATE = 0.1
+
+FIRST_NAMES = (
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+    'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas',
+    'Sarah', 'Christopher', 'Karen', 'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty',
+)
+LAST_NAMES = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor',
+    'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez',
+)
+PET_NAMES = (
+    'bella', 'max', 'luna', 'charlie', 'lucy', 'cooper', 'daisy', 'milo', 'bailey', 'buddy',
+    'sadie', 'rocky', 'molly', 'bear', 'stella', 'tucker', 'chloe', 'duke', 'penny', 'oliver',
+    'LEO', 'COCO', 'Zoe', 'Jack', 'Nala', 'Simba', 'Toby', 'Ruby', 'Bentley', 'Loki',
+)
+SPECIES = {'Canine': 60, 'Feline': 33, 'Equine': 2, 'Avian': 2, 'Exotic': 3}
+REMINDER_DESCRIPTIONS = (
+    'Rabies Vaccine 1 Year', 'Rabies Vaccine 3 Year', 'DHPP Vaccine', 'DA2PP Booster',
+    'Bordetella Vaccine', 'Leptospirosis Vaccine', 'Lyme Vaccine', 'Canine Influenza',
+    'FVRCP Vaccine', 'FeLV Vaccine', 'Heartworm Test', 'Fecal Exam', 'Annual Wellness Exam',
+    'Dental Cleaning', 'Senior Bloodwork', 'Nail Trim',
+)
+APPOINTMENT_TYPES = ('Wellness', 'Vaccines', 'Sick', 'Surgery', 'Dental', 'Recheck')
+SMS_TEMPLATES = (
+    (
+        ('rabies',),
+        'Hi, this is {scheduler} from {practice_name}! {your_pets_capitalized} {be_verb} due '
+        'for a rabies vaccine. Book an appointment for {your_pets} here: {link}',
+    ),
+    (
+        ('dental',),
+        'Hi, this is {scheduler} from {practice_name}! {your_pets_capitalized} {be_verb} due '
+        'for a dental cleaning. Book an appointment for {your_pets} here: {link}',
+    ),
+    (
+        ('heartworm',),
+        'Hi, this is {scheduler} from {practice_name}! {your_pets_capitalized} {be_verb} due '
+        'for a heartworm test. Book an appointment for {your_pets} here: {link}',
+    ),
+)
+
+SERVER_FIELDS = ('odu_id', 'name', 'pims', 'time_zone', 'created_at', 'updated_at')
+PRACTICE_FIELDS = (
+    'odu_id', 'server', 'name', 'city', 'state', 'phone', 'pims', 'is_archived',
+    'created_at', 'updated_at',
+)
+PRACTICE_SETTINGS_FIELDS = (
+    'uuid', 'practice', 'is_sms_mailing_enabled', 'is_email_updates_enabled',
+    'sms_senders_phone', 'sms_scheduler', 'sms_practice_name', 'sms_phone', 'sms_link',
+    'email', 'launch_date', 'start_date_for_launch', 'end_date_for_launch',
+    'scheduler_email', 'rdo_name', 'rdo_email', 'created_at', 'updated_at',
+)
+CLIENT_FIELDS = (
+    'odu_id', 'server', 'first_name', 'last_name', 'full_name', 'pims_is_deleted',
+    'pims_is_inactive', 'pims_has_suspended_reminders', 'is_home_practice', 'is_callable',
+    'extractor_removed_at', 'created_at', 'updated_at',
+)
+PATIENT_FIELDS = (
+    'odu_id', 'server', 'name', 'species', 'birth_date', 'death_date', 'pims_is_deceased',
+    'pims_is_inactive', 'extractor_removed_at', 'created_at', 'updated_at',
+)
+RELATIONSHIP_FIELDS = (
+    'odu_id', 'server', 'client', 'patient', 'is_primary', 'extractor_removed_at',
+    'created_at', 'updated_at',
+)
+PHONE_FIELDS = (
+    'odu_id', 'server', 'client', 'number', 'app_number', 'type', 'is_primary',
+    'extractor_removed_at', 'created_at', 'updated_at',
+)
+EMAIL_FIELDS = (
+    'odu_id', 'server', 'client', 'address', 'is_primary', 'extractor_removed_at',
+    'created_at', 'updated_at',
+)
+REMINDER_FIELDS = (
+    'odu_id', 'server', 'client', 'patient', 'practice', 'date_due', 'description',
+    'sms_status', 'sms_history', 'extractor_removed_at', 'created_at', 'updated_at',
+)
+APPOINTMENT_FIELDS = (
+    'odu_id', 'server', 'client', 'patient', 'practice', 'appointment_datetime', 'type',
+    'duration', 'is_canceled_appointment', 'extractor_removed_at', 'created_at', 'updated_at',
+)
+SMS_HISTORY_FIELDS = (
+    'uuid', 'practice', 'client', 'event_context', 'sent_at', 'status', 'response',
+    'error_message', 'is_followed', 'created_at', 'updated_at',
+)
+SMS_EVENT_FIELDS = ('uuid', 'send_at', 'context', 'status', 'created_at', 'updated_at')
+
+# tables of a chunk in the order they are copied, parents first
+CHUNK_MODELS: tuple[tuple[Type[Model], tuple[str, ...]], ...] = (
+    (Client, CLIENT_FIELDS),
+    (Patient, PATIENT_FIELDS),
+    (ClientPatientRelationship, RELATIONSHIP_FIELDS),
+    (Phone, PHONE_FIELDS),
+    (Email, EMAIL_FIELDS),
+    (SMSHistory, SMS_HISTORY_FIELDS),
+    (Reminder, REMINDER_FIELDS),
+    (Appointment, APPOINTMENT_FIELDS),
+    (SMSEvent, SMS_EVENT_FIELDS),
+)
+
+
+@dataclass
+class SyntheticPractice:
+    index: int
+    odu_id: str
+    server_id: int
+    clients: int
+    is_archived: bool = False
+    is_launching: bool = False
+    sms_senders_phone: str = ''
+    has_sms_history: bool = False
+
+
+def weighted_choice(rng: random.Random, weights: dict):
+    return rng.choices(tuple(weights), tuple(weights.values()))[0]
+
+
+class SyntheticDataGenerator:
+    '''
+    Generates practices with their clients, patients, contacts, reminders,
+    appointments and SMS history, and loads them with COPY.
+
+    Every client draws its values from its own random generator seeded with the
+    seed, the prefix and its position, so the same arguments give the same rows
+    whatever the chunk size. Dates are relative to `today`.
+
+    Rows are loaded in the current transaction. The database triggers keep the
+    callable flag of the clients, while the typeahead, caller ID and client
+    detail indexes pick the rows up on their next rebuild.
+    '''
+
+    def __init__(self, seed: int, prefix: str = 'synthetic', today: datetime.date | None = None):
+        self.seed = seed
+        self.prefix = prefix
+        self.today = today or datetime.date.today()
+        self.now = datetime.datetime.combine(self.today, datetime.time(6), datetime.timezone.utc)
+        self.daily_date_due = self.today - datetime.timedelta(weeks=MIN_EXPIRY_PERIOD_IN_WEEKS)
+        self.excluded_phone_types = sorted(PHONE_TYPES_TO_EXCLUDE)
+        self.counts = Counter()
+
+    def _get_random(self, *key) -> random.Random:
+        return random.Random(':'.join(map(str, (self.seed, self.prefix, *key))))
+
+    @staticmethod
+    def _get_uuid(rng: random.Random) -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    @staticmethod
+    def _get_phone_number(rng: random.Random) -> str:
+        return f'{rng.randint(201, 989)}{rng.randint(0, 9_999_999):07d}'
+
+    def _get_removed_at(self, rng: random.Random) -> datetime.datetime | None:
+        if rng.random() < SOFT_DELETED_RATE:
+            return self.now - datetime.timedelta(days=rng.randint(1, 2 * 365))
+        return None
+
+    def exists(self) -> bool:
+        return Practice.objects.filter(odu_id__startswith=f'{self.prefix}-').exists()
+
+    def generate(
+        self,
+        practice_sizes: list[int],
+        archived_rate: float = 0.05,
+        launching_rate: float = 0.1,
+    ) -> Counter:
+        '''Generates a practice with the given number of clients per size, returns the row counts.'''
+        # servers of the extractor have positive ids
+        first_server_id = min(Server.objects.aggregate(Min('odu_id'))['odu_id__min'] or 0, 0) - 1
+        practices = []
+        for index, clients in enumerate(practice_sizes, start=1):
+            rng = self._get_random('practice', index)
+            is_archived = index > 1 and rng.random() < archived_rate
+            practices.append(
+                SyntheticPractice(
+                    index=index,
+                    odu_id=f'{self.prefix}-practice-{index}',
+                    server_id=first_server_id - index + 1,
+                    clients=clients,
+                    is_archived=is_archived,
+                    is_launching=not is_archived and rng.random() < launching_rate,
+                    sms_senders_phone=self._get_phone_number(rng),
+                )
+            )
+
+        self._copy(Server, SERVER_FIELDS, [self._get_server_row(practice) for practice in practices])
+        self._copy(Practice, PRACTICE_FIELDS, [self._get_practice_row(practice) for practice in practices])
+        self._copy(
+            PracticeSettings,
+            PRACTICE_SETTINGS_FIELDS,
+            [self._get_practice_settings_row(practice) for practice in practices],
+        )
+        for practice in practices:
+            for start in range(1, practice.clients + 1, CLIENTS_CHUNK_SIZE):
+                rows = defaultdict(list)
+                for client_index in range(start, min(start + CLIENTS_CHUNK_SIZE, practice.clients + 1)):
+                    self._add_household(practice, client_index, rows)
+                for model, fields in CHUNK_MODELS:
+                    self._copy(model, fields, rows[model])
+
+        self._create_sms_templates()
+        PracticeSMSActivity.objects.bulk_create(
+            [
+                PracticeSMSActivity(practice_id=practice.odu_id)
+                for practice in practices
+                if practice.has_sms_history
+            ],
+            ignore_conflicts=True,
+        )
+        practice_list_cache.invalidate_on_commit()
+        PracticeSettings.reference_cache.invalidate_on_commit()
+        return self.counts
+
+    def _copy(self, model: Type[Model], fields: tuple[str, ...], rows: list[tuple]) -> None:
+        if rows:
+            self.counts[model.__name__] += copy_rows(connection, model, fields, rows)
+
+    def _create_sms_templates(self) -> None:
+        if SMSTemplate.objects.exists():
+            return
+        rng = self._get_random('sms_templates')
+        SMSTemplate.objects.bulk_create(
+            SMSTemplate(uuid=self._get_uuid(rng), key_words=list(key_words), template=template)
+            for key_words, template in SMS_TEMPLATES
+        )
+        self.counts[SMSTemplate.__name__] += len(SMS_TEMPLATES)
+        SMSTemplate.reference_cache.invalidate_on_commit()
+
+    def _get_server_row(self, practice: SyntheticPractice) -> tuple:
+        return (
+            practice.server_id, f'Synthetic server {practice.index}', 'Synthetic',
+            'US/Eastern', self.now, self.now,
+        )
+
+    def _get_practice_row(self, practice: SyntheticPractice) -> tuple:
+        rng = self._get_random('practice_row', practice.index)
+        return (
+            practice.odu_id, practice.server_id, f'Synthetic Animal Hospital {practice.index}',
+            rng.choice(('Denver', 'Austin', 'Madison', 'Pittsburgh', 'Boise', 'Tampa')),
+            rng.choice(('CO', 'TX', 'WI', 'PA', 'ID', 'FL')),
+            practice.sms_senders_phone, 'Synthetic', practice.is_archived, self.now, self.now,
+        )
+
+    def _get_practice_settings_row(self, practice: SyntheticPractice) -> tuple:
+        rng = self._get_random('practice_settings', practice.index)
+        launch_date = start_date_for_launch = end_date_for_launch = None
+        if practice.is_launching:
+            launch_date = self.today
+            window = rng.choice(('default', 'start', 'range'))
+            if window != 'default':
+                start_date_for_launch = self.today - datetime.timedelta(days=2 * 365)
+            if window == 'range':
+                end_date_for_launch = self.daily_date_due - datetime.timedelta(days=1)
+        return (
+            self._get_uuid(rng), practice.odu_id, not practice.is_archived, rng.random() < 0.3,
+            practice.sms_senders_phone, 'Sam', f'Synthetic Animal Hospital {practice.index}',
+            practice.sms_senders_phone, f'https://example.com/book/{practice.index}',
+            f'practice{practice.index}@example.com', launch_date, start_date_for_launch,
+            end_date_for_launch, 'scheduler@example.com', 'Regional Director',
+            'rdo@example.com', self.now, self.now,
+        )
+
+    def _add_household(self, practice: SyntheticPractice, index: int, rows: dict) -> None:
+        '''Adds the rows of a client and their pets.'''
+        rng = self._get_random(practice.index, index)
+        prefix = f'{self.prefix}-{practice.index}'
+        server_id = practice.server_id
+        client_id = f'{prefix}-client-{index}'
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows[Client].append(
+            (
+                client_id, server_id, first_name, last_name, f'{first_name} {last_name}',
+                rng.random() < CLIENT_DELETED_RATE, rng.random() < CLIENT_INACTIVE_RATE,
+                rng.random() < CLIENT_SUSPENDED_RATE, rng.random() >= CLIENT_OTHER_PRACTICE_RATE,
+                # set by the trigger
+                False, self._get_removed_at(rng), self.now, self.now,
+            )
+        )
+
+        primary_number = None
+        for phone_index in range(weighted_choice(rng, PHONES_PER_CLIENT)):
+            if phone_index > 0:
+                number = self._get_phone_number(rng)
+            elif index > 1 and rng.random() < SHARED_PHONE_NUMBER_RATE:
+                # spouses and roommates registered as separate clients
+                number = self._get_phone_number(self._get_random('phone', practice.index, index - 1))
+            else:
+                number = self._get_phone_number(self._get_random('phone', practice.index, index))
+            phone_type = weighted_choice(rng, PHONE_TYPES)
+            if phone_type is None:
+                phone_type = rng.choice(self.excluded_phone_types)
+            is_primary = phone_index == 0
+            removed_at = self._get_removed_at(rng)
+            if is_primary and removed_at is None:
+                primary_number = number
+            rows[Phone].append(
+                (
+                    f'{prefix}-phone-{index}-{phone_index}', server_id, client_id,
+                    f'({number[:3]}) {number[3:6]}-{number[6:]}', number, phone_type or None,
+                    is_primary, removed_at, self.now, self.now,
+                )
+            )
+
+        if rng.random() < EMAIL_RATE:
+            for email_index in range(2 if rng.random() < SECONDARY_EMAIL_RATE else 1):
+                rows[Email].append(
+                    (
+                        f'{prefix}-email-{index}-{email_index}', server_id, client_id,
+                        f'{first_name}.{last_name}{index}.{email_index}@example.com'.lower(),
+                        email_index == 0, self._get_removed_at(rng), self.now, self.now,
+                    )
+                )
+
+        sms_histories = {}
+        for pet_index in range(weighted_choice(rng, PETS_PER_CLIENT)):
+            patient_id = f'{prefix}-patient-{index}-{pet_index}'
+            is_deceased = rng.random() < PATIENT_DECEASED_RATE
+            rows[Patient].append(
+                (
+                    patient_id, server_id,
+                    None if rng.random() < PATIENT_UNNAMED_RATE else rng.choice(PET_NAMES),
+                    weighted_choice(rng, SPECIES),
+                    self.today - datetime.timedelta(days=rng.randint(60, 18 * 365)),
+                    self.today - datetime.timedelta(days=rng.randint(1, 3 * 365)) if is_deceased else None,
+                    is_deceased, rng.random() < PATIENT_INACTIVE_RATE, self._get_removed_at(rng),
+                    self.now, self.now,
+                )
+            )
+            rows[ClientPatientRelationship].append(
+                (
+                    f'{prefix}-relationship-{index}-{pet_index}', server_id, client_id,
+                    patient_id, True, self._get_removed_at(rng), self.now, self.now,
+                )
+            )
+            if index > 1 and rng.random() < CO_OWNED_PATIENT_RATE:
+                rows[ClientPatientRelationship].append(
+                    (
+                        f'{prefix}-relationship-{index}-{pet_index}-co-owner', server_id,
+                        f'{prefix}-client-{index - 1}', patient_id, False, None, self.now, self.now,
+                    )
+                )
+            self._add_reminders(
+                practice, rng, rows, sms_histories, client_id, patient_id,
+                f'{prefix}-reminder-{index}-{pet_index}',
+            )
+            for appointment_index in range(weighted_choice(rng, APPOINTMENTS_PER_PATIENT)):
+                rows[Appointment].append(
+                    (
+                        f'{prefix}-appointment-{index}-{pet_index}-{appointment_index}', server_id,
+                        client_id, patient_id, practice.odu_id,
+                        datetime.datetime.combine(
+                            self.today + datetime.timedelta(days=rng.randint(-5 * 365, 120)),
+                            # business hours in the US
+                            datetime.time(rng.randint(13, 23), rng.choice((0, 15, 30, 45))),
+                            datetime.timezone.utc,
+                        ),
+                        rng.choice(APPOINTMENT_TYPES), rng.choice((15, 30, 30, 45, 60)),
+                        rng.random() < CANCELED_APPOINTMENT_RATE, self._get_removed_at(rng),
+                        self.now, self.now,
+                    )
+                )
+
+        for date_due, (sms_history_id, patient_ids) in sms_histories.items():
+            self._add_sms_history(
+                practice, rng, rows, client_id, primary_number, date_due, sms_history_id, len(patient_ids)
+            )
+
+    def _add_reminders(
+        self,
+        practice: SyntheticPractice,
+        rng: random.Random,
+        rows: dict,
+        sms_histories: dict,
+        client_id: str,
+        patient_id: str,
+        odu_id_prefix: str,
+    ) -> None:
+        for reminder_index in range(weighted_choice(rng, REMINDERS_PER_PATIENT)):
+            if reminder_index == 0 and rng.random() < DAILY_REMINDER_RATE:
+                # the reminders the daily aggregation picks up
+                date_due = self.daily_date_due
+            else:
+                date_due = self.today + datetime.timedelta(
+                    days=rng.randint(-(MAX_EXPIRY_PERIOD_IN_YEARS + 1) * 365, 365)
+                )
+            sms_status = sms_history_id = None
+            # practices on their launch day never sent SMS before
+            if date_due < self.daily_date_due and not practice.is_launching:
+                if rng.random() >= PENDING_PAST_REMINDER_RATE:
+                    sms_status = weighted_choice(rng, REMINDER_STATUSES)
+            if sms_status == ReminderStatus.EVENT_CREATED.value:
+                # one SMS per client and due date, see SMSEventCreationTask
+                if date_due not in sms_histories:
+                    sms_histories[date_due] = (self._get_uuid(rng), set())
+                sms_history_id, patient_ids = sms_histories[date_due]
+                patient_ids.add(patient_id)
+            description = rng.choice(REMINDER_DESCRIPTIONS)
+            copies = 2 if rng.random() < DUPLICATE_REMINDER_RATE else 1
+            for copy_index in range(copies):
+                # the PIMS keeps duplicates of a reminder, e.g. after a catalog change
+                rows[Reminder].append(
+                    (
+                        f'{odu_id_prefix}-{reminder_index}{"-duplicate" if copy_index else ""}',
+                        practice.server_id, client_id, patient_id, practice.odu_id, date_due,
+                        description, sms_status, sms_history_id, self._get_removed_at(rng),
+                        self.now, self.now,
+                    )
+                )
+
+    def _add_sms_history(
+        self,
+        practice: SyntheticPractice,
+        rng: random.Random,
+        rows: dict,
+        client_id: str,
+        number_to: str | None,
+        date_due: datetime.date,
+        sms_history_id: uuid.UUID,
+        patient_count: int,
+    ) -> None:
+        send_at = datetime.datetime.combine(
+            date_due + datetime.timedelta(weeks=MIN_EXPIRY_PERIOD_IN_WEEKS),
+            datetime.time(SEND_AT_UTC_HOUR),
+            datetime.timezone.utc,
+        )
+        context = json.dumps(
+            asdict(
+                SMSContext(
+                    number_from=practice.sms_senders_phone,
+                    number_to=number_to or '',
+                    practice_id=practice.odu_id,
+                    sms_history_id=str(sms_history_id),
+                    text=(
+                        DEFAULT_SMS_TEMPLATE_W_LINK if patient_count < 2 else DEFAULT_SMS_TEMPLATE_W_PHONE
+                    ).format(
+                        scheduler='Sam',
+                        practice_name=f'Synthetic Animal Hospital {practice.index}',
+                        your_pets_capitalized='Your pets' if patient_count > 1 else 'Your pet',
+                        your_pets='your pets' if patient_count > 1 else 'your pet',
+                        be_verb='are' if patient_count > 1 else 'is',
+                        link=f'https://example.com/book/{practice.index}',
+                        practice_phone_number=practice.sms_senders_phone,
+                    ),
+                )
+            )
+        )
+        status = weighted_choice(rng, SMS_HISTORY_STATUSES)
+        sent_at = send_at if status == SMSHistoryStatus.SENT.value else None
+        practice.has_sms_history = True
+        rows[SMSHistory].append(
+            (
+                sms_history_id, practice.odu_id, client_id, context, sent_at, status,
+                json.dumps({'id': rng.getrandbits(48), 'state': 'delivered'}) if sent_at else None,
+                'Synthetic delivery error' if status == SMSHistoryStatus.ERROR.value else None,
+                sent_at is not None and rng.random() < FOLLOWED_SMS_RATE,
+                send_at - datetime.timedelta(hours=10), sent_at or send_at,
+            )
+        )
+        if status == SMSHistoryStatus.PENDING.value:
+            # sending went down before the event was claimed
+            rows[SMSEvent].append(
+                (
+                    self._get_uuid(rng), max(send_at, self.now), context,
+                    SMSEventStatus.PENDING.value, self.now, self.now,
+                )
+            )
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.8 on 2026-10-18 22:37
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the SMS history is written while SMS are sent, so the index is built without locking writes
+    atomic = False
+
+    dependencies = [
+        ('apps', '0041_practice_is_archived'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='smshistory',
+            index=models.Index(condition=models.Q(('status', 'SENT')), fields=['-sent_at', '-uuid'], name='sent_at_uuid_idx'),
+        ),
+    ]
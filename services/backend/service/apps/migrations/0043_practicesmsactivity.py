@@ -0,0 +1,46 @@
+# Generated by Django 4.2.8 on 2026-10-18 22:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def fill_practice_sms_activity(apps, schema_editor):
+    SMSHistory = apps.get_model("apps", "SMSHistory")
+    PracticeSMSActivity = apps.get_model("apps", "PracticeSMSActivity")
+    activity = (
+        SMSHistory.objects.filter(practice__isnull=False)
+        .values("practice_id")
+        .order_by()
+        .distinct()
+    )
+    PracticeSMSActivity.objects.bulk_create(
+        [PracticeSMSActivity(**practice_activity) for practice_activity in activity]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0042_smshistory_sent_at_uuid_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PracticeSMSActivity',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('practice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sms_activity', to='apps.practice')),
+            ],
+            options={
+                'verbose_name': 'practice SMS activity',
+                'verbose_name_plural': 'practice SMS activity',
+            },
+        ),
+        migrations.RunPython(
+            fill_practice_sms_activity,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
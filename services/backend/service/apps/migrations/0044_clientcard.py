@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-18 23:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import rest_framework.utils.encoders
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0043_practicesmsactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientCard',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='apps.client')),
+                ('version', models.BigIntegerField()),
+                ('etag', models.CharField(max_length=64)),
+                ('document', models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.8 on 2026-10-18 23:09
+
+from django.db import migrations, models
+
+# A client is callable when it is active, belongs to its home practice and its
+# server has a practice that is not archived. The extractor writes the clients
+# directly, so the flag is kept by triggers on the clients and the practices.
+# The existing clients are filled in by 0046, in batches.
+#
+# Rollout: the call center querysets filter on the flag, which is false
+# until the backfill has run, so every client is hidden from the client
+# list, detail, typeahead, caller ID and export in between. Apply the
+# migrations up to 0046 before the new code serves requests; the backfill
+# therefore comes before the index builds of 0047, which may take long.
+CREATE_TRIGGERS = '''
+ALTER TABLE apps_client ALTER COLUMN "APP_IS_CALLABLE" SET DEFAULT false;
+
+CREATE FUNCTION apps_client_is_callable(
+    is_deleted boolean,
+    is_inactive boolean,
+    is_home_practice boolean,
+    removed_at timestamptz,
+    server_id varchar
+) RETURNS boolean AS $$
+    SELECT is_deleted IS NOT TRUE
+        AND is_inactive IS NOT TRUE
+        AND is_home_practice IS NOT FALSE
+        AND removed_at IS NULL
+        AND EXISTS (
+            SELECT 1 FROM apps_practice
+            WHERE "SERVER_ODU_ID" = server_id AND NOT "APP_IS_ARCHIVED"
+        )
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION apps_client_set_is_callable() RETURNS trigger AS $$
+BEGIN
+    NEW."APP_IS_CALLABLE" := apps_client_is_callable(
+        NEW."PIMS_IS_DELETED",
+        NEW."PIMS_IS_INACTIVE",
+        NEW."IS_HOME_PRACTICE",
+        NEW."EXTRACTOR_REMOVED_AT_UTC",
+        NEW."SERVER_ODU_ID"
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER apps_client_is_callable
+BEFORE INSERT OR UPDATE OF
+    "PIMS_IS_DELETED",
+    "PIMS_IS_INACTIVE",
+    "IS_HOME_PRACTICE",
+    "EXTRACTOR_REMOVED_AT_UTC",
+    "SERVER_ODU_ID",
+    "APP_IS_CALLABLE"
+ON apps_client
+FOR EACH ROW EXECUTE FUNCTION apps_client_set_is_callable();
+
+-- APP_UPDATED_AT is touched, so the incremental client indexes pick the change up
+CREATE FUNCTION apps_practice_refresh_client_is_callable() RETURNS trigger AS $$
+DECLARE
+    server_ids varchar[] := '{}';
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        server_ids := server_ids || OLD."SERVER_ODU_ID";
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        server_ids := server_ids || NEW."SERVER_ODU_ID";
+    END IF;
+    -- the new value is set by the apps_client_is_callable trigger
+    UPDATE apps_client SET "APP_IS_CALLABLE" = NOT "APP_IS_CALLABLE", "APP_UPDATED_AT" = now()
+    WHERE "SERVER_ODU_ID" = ANY(server_ids)
+        AND "APP_IS_CALLABLE" IS DISTINCT FROM apps_client_is_callable(
+            "PIMS_IS_DELETED",
+            "PIMS_IS_INACTIVE",
+            "IS_HOME_PRACTICE",
+            "EXTRACTOR_REMOVED_AT_UTC",
+            "SERVER_ODU_ID"
+        );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER apps_practice_client_is_callable
+AFTER INSERT OR DELETE ON apps_practice
+FOR EACH ROW EXECUTE FUNCTION apps_practice_refresh_client_is_callable();
+
+CREATE TRIGGER apps_practice_client_is_callable_update
+AFTER UPDATE OF "APP_IS_ARCHIVED", "SERVER_ODU_ID" ON apps_practice
+FOR EACH ROW
+WHEN (
+    OLD."APP_IS_ARCHIVED" IS DISTINCT FROM NEW."APP_IS_ARCHIVED"
+    OR OLD."SERVER_ODU_ID" IS DISTINCT FROM NEW."SERVER_ODU_ID"
+)
+EXECUTE FUNCTION apps_practice_refresh_client_is_callable();
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER apps_practice_client_is_callable_update ON apps_practice;
+DROP TRIGGER apps_practice_client_is_callable ON apps_practice;
+DROP FUNCTION apps_practice_refresh_client_is_callable();
+DROP TRIGGER apps_client_is_callable ON apps_client;
+DROP FUNCTION apps_client_set_is_callable();
+DROP FUNCTION apps_client_is_callable(boolean, boolean, boolean, timestamptz, varchar);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps', '0044_clientcard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='is_callable',
+            field=models.BooleanField(db_column='APP_IS_CALLABLE', default=False),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, reverse_sql=DROP_TRIGGERS),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.8 on 2026-10-18 23:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 5000
+
+GET_BATCH_END = '''
+SELECT max("CLIENT_ODU_ID") FROM (
+    SELECT "CLIENT_ODU_ID" FROM apps_client
+    WHERE "CLIENT_ODU_ID" > %s
+    ORDER BY "CLIENT_ODU_ID"
+    LIMIT %s
+) batch
+'''
+
+# the clients written since 0045 are already set by the trigger
+BACKFILL_BATCH = '''
+UPDATE apps_client SET "APP_IS_CALLABLE" = apps_client_is_callable(
+    "PIMS_IS_DELETED",
+    "PIMS_IS_INACTIVE",
+    "IS_HOME_PRACTICE",
+    "EXTRACTOR_REMOVED_AT_UTC",
+    "SERVER_ODU_ID"
+)
+WHERE "CLIENT_ODU_ID" > %s AND "CLIENT_ODU_ID" <= %s
+    AND "APP_IS_CALLABLE" IS DISTINCT FROM apps_client_is_callable(
+        "PIMS_IS_DELETED",
+        "PIMS_IS_INACTIVE",
+        "IS_HOME_PRACTICE",
+        "EXTRACTOR_REMOVED_AT_UTC",
+        "SERVER_ODU_ID"
+    )
+'''
+
+
+def fill_client_is_callable(apps, schema_editor):
+    # the migration is not atomic, so every batch is committed on its own
+    # and the rows of the extractor-written table are locked only briefly
+    batch_start = ''
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(GET_BATCH_END, [batch_start, BACKFILL_BATCH_SIZE])
+            batch_end = cursor.fetchone()[0]
+            if batch_end is None:
+                break
+            cursor.execute(BACKFILL_BATCH, [batch_start, batch_end])
+            batch_start = batch_end
+
+
+class Migration(migrations.Migration):
+    # runs straight after 0045, before the long index builds of 0047, so that
+    # the clients are hidden from the querysets that filter on is_callable
+    # for as short as possible. The clients are written by the extractor, so
+    # the index is built without locking writes.
+    atomic = False
+
+    dependencies = [
+        ('apps', '0045_client_is_callable'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=fill_client_is_callable,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(condition=models.Q(('is_callable', True)), fields=['odu_id'], name='client_callable_odu_id_idx'),
+        ),
+    ]
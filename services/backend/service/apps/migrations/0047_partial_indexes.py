@@ -0,0 +1,48 @@
+# Generated by Django 4.2.8 on 2026-10-18 23:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the tables are written by the extractor, so the indexes are built without locking writes
+    atomic = False
+
+    dependencies = [
+        ('apps', '0046_client_is_callable_backfill'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('extractor_removed_at__isnull', True)), fields=['patient', '-appointment_datetime'], name='appointment_patient_dt_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='email',
+            index=models.Index(condition=models.Q(('extractor_removed_at__isnull', True), ('is_primary', True)), fields=['client'], name='primary_email_client_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phone',
+            index=models.Index(condition=models.Q(('extractor_removed_at__isnull', True), ('is_primary', True)), fields=['client'], name='primary_phone_client_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phone',
+            index=models.Index(condition=models.Q(('extractor_removed_at__isnull', True), ('is_primary', True)), fields=['app_number'], name='primary_phone_app_number_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('extractor_removed_at__isnull', True), ('sms_status__isnull', True)), fields=['practice', 'date_due', 'patient'], name='reminder_pending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('date_due__isnull', False), ('extractor_removed_at__isnull', True)), fields=['patient', 'date_due'], name='reminder_patient_date_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='smsevent',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['send_at'], name='sms_event_pending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='smsevent',
+            index=models.Index(condition=models.Q(('status', 'IN_PROGRESS')), fields=['status'], name='sms_event_in_progress_idx'),
+        ),
+    ]
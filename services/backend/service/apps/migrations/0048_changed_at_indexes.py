@@ -0,0 +1,108 @@
+# Generated by Django 4.2.8 on 2026-10-18 23:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the tables are written by the extractor, so the indexes are built without locking writes
+    atomic = False
+
+    dependencies = [
+        ('apps', '0047_partial_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['extractor_updated_at'], name='appointment_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['extractor_removed_at'], name='appointment_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='appointment',
+            index=models.Index(fields=['updated_at'], name='appointment_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(fields=['extractor_updated_at'], name='client_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(fields=['extractor_removed_at'], name='client_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(fields=['updated_at'], name='client_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientpatientrelationship',
+            index=models.Index(fields=['extractor_updated_at'], name='relationship_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientpatientrelationship',
+            index=models.Index(fields=['extractor_removed_at'], name='relationship_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientpatientrelationship',
+            index=models.Index(fields=['updated_at'], name='relationship_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='email',
+            index=models.Index(fields=['extractor_updated_at'], name='email_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='email',
+            index=models.Index(fields=['extractor_removed_at'], name='email_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='email',
+            index=models.Index(fields=['updated_at'], name='email_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='patient',
+            index=models.Index(fields=['extractor_updated_at'], name='patient_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='patient',
+            index=models.Index(fields=['extractor_removed_at'], name='patient_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='patient',
+            index=models.Index(fields=['updated_at'], name='patient_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phone',
+            index=models.Index(fields=['extractor_updated_at'], name='phone_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phone',
+            index=models.Index(fields=['extractor_removed_at'], name='phone_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='phone',
+            index=models.Index(fields=['updated_at'], name='phone_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='practice',
+            index=models.Index(fields=['updated_at'], name='practice_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reminder',
+            index=models.Index(fields=['extractor_updated_at'], name='reminder_ext_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reminder',
+            index=models.Index(fields=['extractor_removed_at'], name='reminder_ext_removed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='reminder',
+            index=models.Index(fields=['updated_at'], name='reminder_updated_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='smshistory',
+            index=models.Index(fields=['updated_at'], name='sms_history_updated_at_idx'),
+        ),
+    ]
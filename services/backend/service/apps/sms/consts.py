@@ -12,7 +12,6 @@ class SMSHistoryStatus(models.TextChoices):
     ERROR = 'ERROR'
 
 
-SMS_TEMPLATES_CACHE_KEY = 'sms_templates_cache_key'
 # Reduced from 700 to 100 to avoid Dialpad API rate limits (fixes 403 errors)
 SMS_LIMIT_PER_MINUTE = 100
 PHONE_CODE = '+1'
@@ -1,12 +1,19 @@
-from django.core.cache import cache
+from typing import Iterable
+
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django_jsonform.models.fields import ArrayField
 
+from libs.cache.reference import (
+    ReferenceDataCache,
+    ReferenceDataModelMixin,
+    ReferenceDataQuerySet,
+)
 from libs.db.base_models import BaseModel
 from apps.call_center.db.entities.clients import Client
-from apps.call_center.db.entities.practices import Practice
-from apps.sms.consts import SMS_TEMPLATES_CACHE_KEY, SMSEventStatus, SMSHistoryStatus
+from apps.call_center.db.entities.practices import Practice, practice_list_cache
+from apps.sms.consts import SMSEventStatus, SMSHistoryStatus
 
 
 class SMSEvent(BaseModel):
@@ -21,6 +28,16 @@ class SMSEvent(BaseModel):
     class Meta:
         indexes = [
             models.Index(fields=['send_at', 'status'], name='send_at_status_idx'),
+            models.Index(
+                fields=['send_at'],
+                condition=Q(status=SMSEventStatus.PENDING.value),
+                name='sms_event_pending_idx',
+            ),
+            models.Index(
+                fields=['status'],
+                condition=Q(status=SMSEventStatus.IN_PROGRESS.value),
+                name='sms_event_in_progress_idx',
+            ),
         ]
 
 
@@ -45,38 +62,68 @@ class SMSHistory(BaseModel):
     class Meta:
         indexes = [
             models.Index(fields=['sent_at'], name='sent_at_idx'),
+            models.Index(
+                fields=['-sent_at', '-uuid'],
+                name='sent_at_uuid_idx',
+                condition=Q(status=SMSHistoryStatus.SENT.value),
+            ),
+            models.Index(fields=['updated_at'], name='sms_history_updated_at_idx'),
         ]
 
 
-class SMSTemplate(BaseModel):
+class SMSTemplate(ReferenceDataModelMixin, BaseModel):
     key_words = ArrayField(
         models.CharField(max_length=64),
     )
     template = models.TextField()
 
-    def save(self, *args, **kwargs):
-        result = super().save(*args, **kwargs)
-        cache.delete(SMS_TEMPLATES_CACHE_KEY)
-        return result
+    reference_cache = ReferenceDataCache('sms_templates', timeout=1800)
 
-    def delete(self, *args, **kwargs):
-        result = super().delete(*args, **kwargs)
-        cache.delete(SMS_TEMPLATES_CACHE_KEY)
-        return result
+    objects = ReferenceDataQuerySet.as_manager()
 
     @classmethod
     def get_values_dict(cls):
-        cached_data = cache.get(SMS_TEMPLATES_CACHE_KEY)
-        if cached_data is not None:
-            return cached_data
-        templates = cls.objects.all()
-        templates_dict = {
-            tuple(key_word.lower() for key_word in obj.key_words): obj.template
-            for obj in templates
-        }
-        cache.set(SMS_TEMPLATES_CACHE_KEY, templates_dict, timeout=1800)  # cache for half an hour
-        return templates_dict
+        return cls.reference_cache.get(
+            'values',
+            lambda: {
+                tuple(key_word.lower() for key_word in obj.key_words): obj.template
+                for obj in cls.objects.all()
+            },
+        )
 
     class Meta:
         verbose_name = 'SMS template'
         verbose_name_plural = 'SMS templates'
+
+
+class PracticeSMSActivity(BaseModel):
+    '''
+    Practices with SMS history, i.e. the practices of the SMS dropdowns.
+
+    A row is added when the first SMSHistory of the practice is created.
+    Sending does not touch it, so concurrent senders of a practice do not
+    queue on its row.
+    '''
+    practice = models.OneToOneField(
+        Practice, on_delete=models.CASCADE, related_name='sms_activity'
+    )
+
+    class Meta:
+        verbose_name = 'practice SMS activity'
+        verbose_name_plural = 'practice SMS activity'
+
+    @classmethod
+    def register(cls, practice_ids: Iterable[str]) -> None:
+        practice_ids = {practice_id for practice_id in practice_ids if practice_id}
+        practice_ids -= set(
+            cls.objects.filter(practice_id__in=practice_ids).values_list(
+                'practice_id', flat=True
+            )
+        )
+        if not practice_ids:
+            return
+        cls.objects.bulk_create(
+            [cls(practice_id=practice_id) for practice_id in practice_ids],
+            ignore_conflicts=True,
+        )
+        practice_list_cache.invalidate_on_commit()
@@ -6,10 +6,11 @@ from typing import Generator, Iterable, Iterator, Literal, Type
 
 import arrow
 import pytz
-from django.db import transaction
-from django.db.models import Model, Prefetch, Q
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Model, Prefetch, Q, QuerySet
 from libs.celery.celery import app
 from libs.celery.consts import CeleryQueue
+from libs.db.routers import get_replica_db
 from libs.utils.holidays import USHolidaysWithoutBlackFriday
 
 from apps.call_center.consts import ReminderStatus
@@ -35,7 +36,12 @@ from apps.sms.consts import (
     OUTCOMES_TO_FILTER_OUT,
 )
 from apps.sms.dataclasses import SMSContext, SMSData
-from apps.sms.db.models import SMSEvent, SMSHistory, SMSTemplate
+from apps.sms.db.models import (
+    PracticeSMSActivity,
+    SMSEvent,
+    SMSHistory,
+    SMSTemplate,
+)
 
 logger = logging.getLogger(__package__)
 
@@ -86,6 +92,9 @@ class SMSEventCreationTask(app.Task):
         logger.info("start processing reminders")
         for patient in patients:
             reminders = patient.prefetched_reminders
+            # the lagging replica still lists reminders the primary has checked
+            if not reminders:
+                continue
             appointments = patient.prefetched_appointments
             if appointments and appointments[0].appointment_datetime.date() >= reminders[
                 0
@@ -144,8 +153,15 @@ class SMSEventCreationTask(app.Task):
 
     def _get_patients_iterator(self) -> Iterator[Patient]:
         logger.info("get patients")
+        return self._get_patients().iterator(chunk_size=PATIENTS_CHUNK_SIZE)
+
+    def _get_patients(self) -> QuerySet:
+        # the scan reads the replica, prefetches follow the database of the patients
+        # except the pending reminders, whose sms_status guards against processing
+        # a reminder twice and is read on the primary
         return (
-            Patient.objects.filter(
+            Patient.objects.using(get_replica_db())
+            .filter(
                 Q(name__isnull=False),
                 Q(reminders__practice=self.practice),
                 Q(reminders__sms_status__isnull=True),
@@ -192,14 +208,7 @@ class SMSEventCreationTask(app.Task):
                 ),
                 Prefetch(
                     'reminders',
-                    queryset=Reminder.objects.filter(
-                        self._get_date_lookup('date_due'),
-                        practice=self.practice,
-                        sms_status__isnull=True,
-                        extractor_removed_at__isnull=True,
-                    )
-                    .only('odu_id', 'patient', 'practice', 'date_due', 'description')
-                    .order_by('-date_due'),
+                    queryset=self._get_pending_reminders().using(DEFAULT_DB_ALIAS),
                     to_attr='prefetched_reminders',
                 ),
                 Prefetch(
@@ -214,7 +223,18 @@ class SMSEventCreationTask(app.Task):
                 ),
             )
             .only('odu_id', 'name')
-            .iterator(chunk_size=PATIENTS_CHUNK_SIZE)
+        )
+
+    def _get_pending_reminders(self) -> QuerySet:
+        return (
+            Reminder.objects.filter(
+                self._get_date_lookup('date_due'),
+                practice=self.practice,
+                sms_status__isnull=True,
+                extractor_removed_at__isnull=True,
+            )
+            .only('odu_id', 'patient', 'practice', 'date_due', 'description')
+            .order_by('-date_due')
         )
 
     def _get_date_lookup(self, field_name: str) -> Q:
@@ -383,6 +403,7 @@ class SMSEventCreationTask(app.Task):
         
         logger.info("create sms history")
         SMSHistory.objects.bulk_create(sms_history, batch_size=CREATE_BATCH_SIZE)
+        PracticeSMSActivity.register(history.practice_id for history in sms_history)
         
         self._run_bulk_update(Reminder, reminders, ['sms_status', 'sms_history'])
 
@@ -4,6 +4,7 @@ import time
 import arrow
 from django.conf import settings
 from django.db import transaction
+from django.db.models import QuerySet
 from sentry_sdk import capture_exception
 
 from apps.call_center.db.entities.practices import PracticeSettings
@@ -39,12 +40,12 @@ class SMSSendingTask(app.Task):
 
     @staticmethod
     def _get_practice_number(practice_id: str) -> str:
-        practice_settings = PracticeSettings.objects.get(practice_id=practice_id)
+        practice_settings = PracticeSettings.get_sms_sending_values(practice_id)
 
-        if not practice_settings.is_sms_mailing_enabled:
+        if not practice_settings['is_sms_mailing_enabled']:
             raise SMSExceptionMailingIsDisabled('SMS mailing for practice is disabled')
 
-        practice_number = practice_settings.sms_senders_phone
+        practice_number = practice_settings['sms_senders_phone']
         if not practice_number:
             raise SMSExceptionInvalidPracticeNumber('Invalid practice number')
 
@@ -181,6 +182,17 @@ class SMSEventPeriodicTask(app.Task):
         cls._rate_limit_cooldown_until = arrow.utcnow().shift(minutes=minutes)
         logger.warning(f"Rate limit cooldown set until {cls._rate_limit_cooldown_until}")
 
+    @staticmethod
+    def get_events_to_run(count: int) -> QuerySet:
+        return (
+            SMSEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                send_at__lte=arrow.utcnow().datetime,
+                status=SMSEventStatus.PENDING.value,
+            )
+            .all()[:count]
+        )
+
     @transaction.atomic
     def run(self) -> None:
         # Check if we're in rate limit cooldown period
@@ -194,20 +206,15 @@ class SMSEventPeriodicTask(app.Task):
         count_to_run = SMS_LIMIT_PER_MINUTE - count_events_in_progress
         
         if count_to_run > 0:
-            events_to_run = (
-                SMSEvent.objects.select_for_update(skip_locked=True)
-                .filter(
-                    send_at__lte=arrow.utcnow().datetime,
-                    status=SMSEventStatus.PENDING.value,
-                )
-                .all()[:count_to_run]
-            )
+            events_to_run = list(self.get_events_to_run(count_to_run))
 
             logger.info(f"Processing {len(events_to_run)} SMS events (limit: {SMS_LIMIT_PER_MINUTE}, in progress: {count_events_in_progress})")
-            
+
+            # one UPDATE for the batch, the events stay locked until the commit
+            SMSEvent.objects.filter(uuid__in=[event.uuid for event in events_to_run]).update(
+                status=SMSEventStatus.IN_PROGRESS.value, updated_at=arrow.utcnow().datetime
+            )
             for event in events_to_run:
-                event.status = SMSEventStatus.IN_PROGRESS.value
-                event.save()
                 SMSSendingTask().apply_async(kwargs={'event_uuid': str(event.uuid)})
                 
                 # Add tiny delay between queuing to spread out load
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django_redis import get_redis_connection
+from rest_framework.utils.encoders import JSONEncoder
+
+from libs.db.routers import use_primary
+from libs.metrics.requests import count_cache_result
+
+logger = logging.getLogger(__package__)
+
+VALUE_KEY = 'reference:{name}:{key}'
+VERSION_KEY = 'reference:{name}:version'
+INVALIDATION_CHANNEL = 'reference:invalidation'
+LISTENER_RECONNECT_DELAY_IN_SECONDS = 5
+
+
+class ReferenceDataCache:
+    '''
+    Two-level cache of small, rarely changed datasets.
+
+    Values are kept in a per-process LRU in front of Redis. Every cache has a
+    version stamp in Redis, and the values stored in Redis carry the version
+    they were loaded for, so invalidation is a single INCR. Invalidation is
+    also published over Redis pub/sub, and a listener thread in every process
+    drops the local copies of that cache. The local TTL bounds staleness if a
+    message is missed, e.g. while the listener reconnects.
+
+    Hits of both levels and misses are counted per cache, and in the metrics
+    of the request doing the lookup.
+    '''
+    registry: dict[str, 'ReferenceDataCache'] = {}
+
+    _listener_lock = threading.Lock()
+    _listener_pid: int | None = None
+
+    def __init__(
+        self,
+        name: str,
+        timeout: int = 60 * 60,
+        local_timeout: int = 60,
+        max_size: int = 1024,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+        self.max_size = max_size
+        self.stats = Counter()
+        # key: (expiry, value, fingerprint or None)
+        self._local: OrderedDict[str, tuple[float, Any, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.registry[name] = self
+
+    def _get_key(self, key: str) -> str:
+        return VALUE_KEY.format(name=self.name, key=key)
+
+    def _get_version_key(self) -> str:
+        return VERSION_KEY.format(name=self.name)
+
+    def get(self, key: str, load: Callable[[], Any]) -> Any:
+        '''
+        Returns the value of the key, loading it with `load` on a miss.
+
+        The local copy is shared within the process, so callers must not mutate it.
+        '''
+        return self._get(key, load, with_fingerprint=False)[0]
+
+    def get_entry(self, key: str, load: Callable[[], Any]) -> tuple[Any, str]:
+        '''
+        Returns the value of the key with a fingerprint of its content, e.g. for an ETag.
+
+        The fingerprint is computed once per loaded value and stored with it, so
+        it changes whenever the value does, also when the value expires after a
+        change that did not invalidate the cache. The value must be JSON serializable.
+        '''
+        return self._get(key, load, with_fingerprint=True)
+
+    @staticmethod
+    def get_fingerprint(value: Any) -> str:
+        content = json.dumps(value, cls=JSONEncoder, sort_keys=True).encode()
+        return hashlib.md5(content).hexdigest()
+
+    def _get(self, key: str, load: Callable[[], Any], with_fingerprint: bool) -> tuple[Any, str | None]:
+        self._ensure_listener()
+        local_value = None
+        with self._lock:
+            cached = self._local.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._local.move_to_end(key)
+                local_value = cached
+        if local_value is not None:
+            self.stats['local_hits'] += 1
+            count_cache_result(self.name, 'local_hits')
+            expires_at, value, fingerprint = local_value
+            if fingerprint is None and with_fingerprint:
+                # loaded by get(), the fingerprint is added to the local copy
+                fingerprint = self.get_fingerprint(value)
+                self._set_local(key, value, fingerprint, expires_at)
+            return value, fingerprint
+
+        value_key, version_key = self._get_key(key), self._get_version_key()
+        values = cache.get_many([value_key, version_key])
+        version = values.get(version_key, 0)
+        stored = values.get(value_key)
+        if stored is not None and stored['version'] == version:
+            self.stats['hits'] += 1
+            count_cache_result(self.name, 'hits')
+            value, fingerprint = stored['value'], stored.get('fingerprint')
+            if fingerprint is None and with_fingerprint:
+                fingerprint = self.get_fingerprint(value)
+        else:
+            self.stats['misses'] += 1
+            count_cache_result(self.name, 'misses')
+            # a lagging replica would store outdated data under the new version
+            with use_primary():
+                value = load()
+            fingerprint = self.get_fingerprint(value) if with_fingerprint else None
+            cache.set(
+                value_key,
+                {'version': version, 'value': value, 'fingerprint': fingerprint},
+                timeout=self.timeout,
+            )
+
+        self._set_local(key, value, fingerprint)
+        return value, fingerprint
+
+    def _set_local(self, key: str, value: Any, fingerprint: str | None, expires_at: float | None = None) -> None:
+        with self._lock:
+            self._local[key] = (
+                expires_at or time.monotonic() + self.local_timeout, value, fingerprint
+            )
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def invalidate(self) -> None:
+        redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+        redis.incr(cache.make_key(self._get_version_key()))
+        self.clear_local()
+        redis.publish(INVALIDATION_CHANNEL, self.name)
+
+    def invalidate_on_commit(self) -> None:
+        transaction.on_commit(self.invalidate)
+
+    @classmethod
+    def get_stats(cls) -> dict[str, dict[str, int]]:
+        return {name: dict(reference_cache.stats) for name, reference_cache in cls.registry.items()}
+
+    @classmethod
+    def _ensure_listener(cls) -> None:
+        # threads do not survive fork, so every worker process starts its own
+        if cls._listener_pid == os.getpid():
+            return
+        with cls._listener_lock:
+            if cls._listener_pid == os.getpid():
+                return
+            for reference_cache in cls.registry.values():
+                reference_cache.clear_local()
+            threading.Thread(
+                target=cls._listen, name='reference-cache-invalidation', daemon=True
+            ).start()
+            cls._listener_pid = os.getpid()
+
+    @classmethod
+    def _listen(cls) -> None:
+        while True:
+            try:
+                pubsub = get_redis_connection(settings.DEFAULT_CACHE_DB).pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    if reference_cache := cls.registry.get(message['data'].decode()):
+                        reference_cache.clear_local()
+            except Exception as error:
+                logger.warning(f'reference cache invalidation listener failed: {error}')
+            # messages may have been missed while disconnected
+            for reference_cache in cls.registry.values():
+                reference_cache.clear_local()
+            time.sleep(LISTENER_RECONNECT_DELAY_IN_SECONDS)
+
+
+class ReferenceDataModelMixin:
+    '''
+    Invalidates the reference cache of the model when an object is saved or deleted.
+
+    Caches of other datasets built from the model are listed in `dependent_reference_caches`.
+    The model's manager must come from ReferenceDataQuerySet, which covers the bulk
+    writes. Writes outside Django, e.g. of the extractor, are only picked up when the
+    cached values expire, after `timeout` of the cache plus its `local_timeout`.
+    '''
+    reference_cache: ReferenceDataCache
+    dependent_reference_caches: tuple[ReferenceDataCache, ...] = ()
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        self._invalidate_reference_caches()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._invalidate_reference_caches()
+        return result
+
+    @classmethod
+    def _invalidate_reference_caches(cls) -> None:
+        for reference_cache in (cls.reference_cache, *cls.dependent_reference_caches):
+            reference_cache.invalidate_on_commit()
+
+
+class ReferenceDataQuerySet(models.QuerySet):
+    '''
+    Invalidates the reference caches of a ReferenceDataModelMixin model on the bulk
+    writes, which skip save() and delete(), e.g. the bulk delete of the admin.
+    bulk_update() runs through update().
+    '''
+
+    def update(self, **kwargs) -> int:
+        rows = super().update(**kwargs)
+        self.model._invalidate_reference_caches()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs) -> list:
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self.model._invalidate_reference_caches()
+        return objs
+
+    def delete(self) -> tuple[int, dict[str, int]]:
+        result = super().delete()
+        self.model._invalidate_reference_caches()
+        return result
@@ -10,3 +10,6 @@ app.config_from_object(
 )
 
 app.autodiscover_tasks()
+
+# connects the task metrics signals in the workers and in the publishing processes
+import libs.celery.metrics  # noqa: E402,F401
@@ -10,6 +10,10 @@ DAILY_AT_1330PM_UTC = crontab(
 DAILY_AT_1PM_UTC = crontab(
     hour='13', minute='0'
 )
+DAILY_AT_1230PM_UTC = crontab(
+    hour='12', minute='30'
+)
+EVERY_FIVE_MINUTES = crontab(minute='*/5')
 RESULT_BACKEND_EXPIRES_DAYS = 7
 
 
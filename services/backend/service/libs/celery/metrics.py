@@ -0,0 +1,111 @@
+import datetime
+import time
+
+from celery import signals
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from libs.celery.consts import CeleryQueue
+from libs.db.queries import QueryRecorder
+from libs.metrics.registry import registry
+
+PUBLISHED_AT_HEADER = 'published_at'
+# kombu keeps the messages of priorities 3, 6 and 9 in separate lists
+PRIORITY_STEPS = (3, 6, 9)
+PRIORITY_SEPARATOR = '\x06\x16'
+UNACKED_KEY = 'unacked'
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+queue_wait = registry.histogram(
+    'celery_task_queue_wait_seconds',
+    'Time from publishing, or from the ETA, to the start of the task.',
+    ('task', 'queue'),
+    buckets=TASK_BUCKETS,
+)
+runtime = registry.histogram(
+    'celery_task_runtime_seconds',
+    'Execution time of the task.',
+    ('task', 'queue'),
+    buckets=TASK_BUCKETS,
+)
+tasks = registry.counter(
+    'celery_tasks_total',
+    'Finished tasks by state, e.g. SUCCESS, FAILURE or RETRY.',
+    ('task', 'queue', 'state'),
+)
+db_queries = registry.counter(
+    'celery_task_db_queries_total',
+    'Database queries executed by the tasks.',
+    ('task', 'queue'),
+)
+db_time = registry.counter(
+    'celery_task_db_seconds_total',
+    'Time the tasks spent in database queries.',
+    ('task', 'queue'),
+)
+
+# task id: (queue, start time, query recorder)
+_running: dict[str, tuple[str, float, QueryRecorder]] = {}
+
+
+@registry.collector('celery_queue_length', 'Messages waiting in the broker queue.', ('queue',))
+def get_queue_lengths():
+    redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+    pipeline = redis.pipeline(transaction=False)
+    for queue in CeleryQueue.values:
+        pipeline.llen(queue)
+        for priority in PRIORITY_STEPS:
+            pipeline.llen(f'{queue}{PRIORITY_SEPARATOR}{priority}')
+    lengths = pipeline.execute()
+    steps = len(PRIORITY_STEPS) + 1
+    return [
+        ((queue,), sum(lengths[index * steps:(index + 1) * steps]))
+        for index, queue in enumerate(CeleryQueue.values)
+    ]
+
+
+@registry.collector('celery_unacked_messages', 'Messages reserved by the workers and not acknowledged yet.')
+def get_unacked_messages():
+    return [((), get_redis_connection(settings.DEFAULT_CACHE_DB).hlen(UNACKED_KEY))]
+
+
+@signals.before_task_publish.connect
+def add_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@signals.task_prerun.connect
+def start_task_metrics(task_id=None, task=None, **kwargs):
+    started_at = time.time()
+    queue = (
+        (task.request.delivery_info or {}).get('routing_key')
+        or getattr(task, 'queue', None)
+        or CeleryQueue.DEFAULT.value
+    )
+    if published_at := getattr(task.request, PUBLISHED_AT_HEADER, None):
+        if isinstance(task.request.eta, str):
+            published_at = max(published_at, datetime.datetime.fromisoformat(task.request.eta).timestamp())
+        queue_wait.observe(max(started_at - published_at, 0), task=task.name, queue=queue)
+
+    recorder = QueryRecorder(stack_depth=0, keep_queries=False)
+    recorder.__enter__()
+    _running[task_id] = queue, time.perf_counter(), recorder
+
+
+@signals.task_postrun.connect
+def finish_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    if (running := _running.pop(task_id, None)) is None:
+        return
+    queue, started_at, recorder = running
+    recorder.__exit__(None, None, None)
+    runtime.observe(time.perf_counter() - started_at, task=task.name, queue=queue)
+    tasks.inc(task=task.name, queue=queue, state=state or 'UNKNOWN')
+    db_queries.inc(recorder.count, task=task.name, queue=queue)
+    db_time.inc(recorder.duration, task=task.name, queue=queue)
+    registry.flush()
+
+
+@signals.worker_process_shutdown.connect
+def flush_task_metrics(**kwargs):
+    registry.flush()
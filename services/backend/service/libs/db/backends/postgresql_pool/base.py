@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+logger = logging.getLogger(__package__)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    '''
+    PostgreSQL backend taking its connections from a psycopg ConnectionPool.
+
+    OPTIONS['pool'] holds the ConnectionPool arguments, e.g. min_size,
+    max_size, timeout (of the acquisition), max_idle and max_lifetime.
+    Closing the connection, which Django does at the end of every request
+    and Celery task with CONN_MAX_AGE=0, returns it to the pool.
+
+    Pools are per process, so prefork children never reuse the connections
+    of their parent.
+    '''
+    _pools: dict[tuple[str, int], ConnectionPool] = {}
+    # every thread has its own wrapper, but they share the pools
+    _pools_lock = threading.Lock()
+
+    def get_connection_params(self) -> dict:
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('the pooled backend requires CONN_MAX_AGE=0')
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params: dict) -> ConnectionPool:
+        key = (self.alias, os.getpid())
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+        with self._pools_lock:
+            # another thread may have opened the pool while this one waited
+            if key not in self._pools:
+                pool = ConnectionPool(
+                    kwargs=conn_params,
+                    name=self.alias,
+                    open=False,
+                    check=(
+                        ConnectionPool.check_connection
+                        if self.settings_dict['CONN_HEALTH_CHECKS']
+                        else None
+                    ),
+                    **self.settings_dict['OPTIONS'].get('pool', {}),
+                )
+                pool.open()
+                self._pools[key] = pool
+            return self._pools[key]
+
+    @classmethod
+    def get_pool_stats(cls) -> dict[str, dict[str, int]]:
+        '''Counters of the pools of the process, see ConnectionPool.get_stats().'''
+        return {
+            alias: pool.get_stats()
+            for (alias, pid), pool in cls._pools.items()
+            if pid == os.getpid()
+        }
+
+    @async_unsafe
+    def get_new_connection(self, conn_params: dict):
+        pool = self.get_pool(conn_params)
+        try:
+            connection = pool.getconn()
+        except PoolTimeout:
+            logger.error(f'no connection of the {self.alias} pool is available: {pool.get_stats()}')
+            raise
+
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(
+                isolation_level or IsolationLevel.READ_COMMITTED
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {isolation_level} specified.'
+            )
+        # the pool may hand out a connection configured by another wrapper
+        connection.isolation_level = self.isolation_level if isolation_level else None
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = getattr(self.connection, '_pool', None)
+        if pool is not self._pools.get((self.alias, os.getpid())):
+            # inherited from the parent process, the socket is not ours to close
+            self.connection = None
+            return
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        self.connection = None
+
+
+def _reset_pools_lock() -> None:
+    # a child forked while another thread held the lock would wait forever
+    DatabaseWrapper._pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pools_lock)
@@ -0,0 +1,94 @@
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+
+
+@dataclass
+class RecordedQuery:
+    alias: str
+    sql: str
+    duration: float
+    call_site: tuple[str, ...]
+
+
+class QueryRecorder:
+    '''
+    Records the statements executed on every database connection of the thread,
+    with their duration and the project frames that issued them.
+
+    Unlike CaptureQueriesContext it works with DEBUG off, since it is built on
+    connection.execute_wrapper(). Collecting the call site walks the stack, so
+    it is skipped with stack_depth=0. With keep_queries=False only the count
+    and the total duration are kept, e.g. for long running tasks.
+    '''
+
+    def __init__(self, stack_depth: int = 4, keep_queries: bool = True):
+        self.stack_depth = stack_depth
+        self.keep_queries = keep_queries
+        self.queries: list[RecordedQuery] = []
+        self.count = 0
+        self.duration = 0.0
+        self._root = f'{settings.BASE_DIR}/'
+        self._exit_stack: ExitStack | None = None
+
+    def __enter__(self) -> 'QueryRecorder':
+        self._exit_stack = ExitStack()
+        for alias in connections:
+            self._exit_stack.enter_context(
+                connections[alias].execute_wrapper(partial(self._record, alias))
+            )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._exit_stack.close()
+
+    def _record(self, alias: str, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started_at
+            self.count += 1
+            self.duration += duration
+            if self.keep_queries:
+                self.queries.append(
+                    RecordedQuery(
+                        alias=alias,
+                        sql=sql,
+                        duration=duration,
+                        call_site=self._get_call_site() if self.stack_depth else (),
+                    )
+                )
+
+    def _get_call_site(self) -> tuple[str, ...]:
+        frames = [
+            f'{frame.filename.removeprefix(self._root)}:{frame.lineno} in {frame.name}'
+            for frame in traceback.extract_stack()
+            if frame.filename.startswith(self._root)
+            and 'site-packages' not in frame.filename
+            and frame.filename != __file__
+        ]
+        return tuple(frames[-self.stack_depth:])
+
+    def group_by_call_site(self) -> list[tuple[tuple[str, ...], list[RecordedQuery]]]:
+        '''Queries grouped by call site, the sites with most queries first.'''
+        groups = defaultdict(list)
+        for query in self.queries:
+            groups[query.call_site].append(query)
+        return sorted(groups.items(), key=lambda group: len(group[1]), reverse=True)
+
+    def get_report(self, limit: int = 10) -> list[str]:
+        lines = []
+        for call_site, queries in self.group_by_call_site()[:limit]:
+            duration = sum(query.duration for query in queries) * 1000
+            lines.append(f'{len(queries)} queries, {duration:.1f} ms')
+            lines.extend(f'  {frame}' for frame in reversed(call_site))
+            for sql in dict.fromkeys(query.sql for query in queries):
+                lines.append(f'    {sql}')
+        return lines
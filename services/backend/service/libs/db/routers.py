@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB = 'replica'
+PRIMARY_PIN_KEY = 'db:primary_pin:{key}'
+
+_read_db: ContextVar[str | None] = ContextVar('read_db', default=None)
+
+
+def get_replica_db() -> str:
+    '''Alias of the replica, or of the primary when no replica is configured.'''
+    return REPLICA_DB if REPLICA_DB in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+def set_read_db(db: str) -> Token:
+    return _read_db.set(db)
+
+
+def reset_read_db(token: Token) -> None:
+    _read_db.reset(token)
+
+
+@contextmanager
+def read_from(db: str) -> Iterator[None]:
+    token = set_read_db(db)
+    try:
+        yield
+    finally:
+        reset_read_db(token)
+
+
+def use_replica():
+    return read_from(get_replica_db())
+
+
+def use_primary():
+    return read_from(DEFAULT_DB_ALIAS)
+
+
+def pin_to_primary(key) -> None:
+    '''Keeps the reads of the key, e.g. of a user, on the primary until the replica catches up.'''
+    cache.set(
+        PRIMARY_PIN_KEY.format(key=key), 1, timeout=settings.REPLICA_STICKINESS_IN_SECONDS
+    )
+
+
+def is_pinned_to_primary(key) -> bool:
+    return cache.get(PRIMARY_PIN_KEY.format(key=key)) is not None
+
+
+class ReplicaRouter:
+    '''
+    Sends reads to the database chosen by read_from(), the primary by default.
+
+    Writes always go to the primary, also for objects loaded from the replica,
+    and only the primary is migrated, the replica gets the schema by replication.
+    '''
+
+    def db_for_read(self, model, **hints) -> str | None:
+        return _read_db.get()
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import re
+from typing import Iterable, Iterator, Type
+
+from django.db.models import Model, QuerySet
+
+# details of a plan node worth showing next to its type
+PLAN_NODE_DETAILS = (
+    'Index Cond',
+    'Recheck Cond',
+    'Hash Cond',
+    'Merge Cond',
+    'Join Filter',
+    'Filter',
+    'Sort Key',
+)
+
+# literals, placeholders and whitespace that differ between runs of the same statement
+SQL_NORMALIZATIONS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    # IN lists of any length
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def get_estimated_count(queryset: QuerySet) -> int:
+    '''Returns the number of rows the Postgres planner expects the queryset to return.'''
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return plan[0]['Plan']['Plan Rows']
+
+
+def explain(connection, sql: str, params=None, options: str = '') -> dict:
+    '''Returns the EXPLAIN (FORMAT JSON) output of the statement.'''
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN ({options + ", " if options else ""}FORMAT JSON) {sql}', params)
+        explained = cursor.fetchone()[0]
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    return explained[0]
+
+
+def normalize_sql(sql: str) -> str:
+    for pattern, replacement in SQL_NORMALIZATIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_statement_key(sql: str) -> str:
+    '''Hash of the normalized statement, the same for every run whatever its parameters.'''
+    return hashlib.md5(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def iter_plan_nodes(plan: dict, depth: int = 0) -> Iterator[tuple[int, dict]]:
+    yield depth, plan
+    for subplan in plan.get('Plans', ()):
+        yield from iter_plan_nodes(subplan, depth + 1)
+
+
+def describe_plan_node(node: dict) -> str:
+    description = node['Node Type']
+    if 'Relation Name' in node:
+        description += f' on {node["Relation Name"]}'
+    if 'Index Name' in node:
+        description += f' using {node["Index Name"]}'
+    return description
+
+
+def render_plan(plan: dict) -> list[str]:
+    '''Plan tree as indented lines with the estimates and conditions of every node.'''
+    lines = []
+    for depth, node in iter_plan_nodes(plan):
+        indent = '  ' * depth
+        lines.append(
+            f'{indent}{describe_plan_node(node)} '
+            f'(cost={node["Total Cost"]:.0f} rows={node["Plan Rows"]})'
+        )
+        for detail in PLAN_NODE_DETAILS:
+            if detail in node:
+                value = node[detail]
+                if isinstance(value, list):
+                    value = ', '.join(value)
+                lines.append(f'{indent}  {detail}: {value}')
+    return lines
+
+
+def copy_rows(connection, model: Type[Model], fields: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    '''
+    Loads the rows into the table of the model with COPY FROM STDIN and returns their number.
+
+    Values are given in the order of `fields`, model field names. Nothing of the
+    model runs, i.e. no defaults, auto_now or save(), but database triggers do.
+    '''
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(quote_name(model._meta.get_field(name).column) for name in fields)
+    count = 0
+    with connection.cursor() as cursor:
+        with cursor.copy(f'COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
@@ -0,0 +1,114 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from libs.db.routers import (
+    get_replica_db,
+    is_pinned_to_primary,
+    reset_read_db,
+    set_read_db,
+)
+from libs.drf.profiling import PROFILE_ID_HEADER, RequestProfiler, is_profiling_requested
+from libs.drf.serializers import ValuesSerializer
+
+
+class ValuesListModelMixin:
+    '''
+    List a queryset with a ValuesSerializer.
+
+    The filtered queryset is turned into named rows before pagination, so the
+    paginator works on tuples and no model instances are built.
+    serializer_class stays in place for the schema.
+    '''
+    values_serializer_class: type[ValuesSerializer]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.values_serializer_class.get_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.values_serializer_class(page, many=True).data
+            )
+        return Response(self.values_serializer_class(queryset, many=True).data)
+
+
+class ReplicaReadMixin:
+    '''
+    Serve safe requests from the read replica.
+
+    Users who have just written are pinned to the primary (see
+    libs.db.routers.pin_to_primary), so they read their own writes.
+    The database is chosen after authentication, which reads the primary.
+    '''
+    _read_db_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(request.user.pk):
+            self._read_db_token = set_read_db(get_replica_db())
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # also when an exception DRF does not handle skips finalize_response()
+            if self._read_db_token is not None:
+                reset_read_db(self._read_db_token)
+                self._read_db_token = None
+
+
+class ProfilingMixin:
+    '''
+    Profile a request of a staff user on demand.
+
+    A request with the _profile query parameter or the X-Profile header runs
+    under RequestProfiler, from authentication to the rendered response.
+    The id of the stored report is returned in the X-Profile-Id header and
+    the report is downloaded from /api/profiles/<id>. The profile of other
+    users is dropped once they are authenticated, and requests without the
+    flag only pay for the check. Views skip their caches while profiling,
+    see is_profiling.
+    '''
+    _profiler: RequestProfiler | None = None
+
+    @property
+    def is_profiling(self) -> bool:
+        return self._profiler is not None
+
+    def initial(self, request, *args, **kwargs):
+        if is_profiling_requested(request):
+            self._profiler = RequestProfiler(request, type(self).__name__)
+            self._profiler.start()
+        super().initial(request, *args, **kwargs)
+        if self._profiler is not None and not request.user.is_staff:
+            self._cancel_profiler()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._profiler is None:
+            return response
+        # initial() failed, e.g. on authentication, before the user was checked
+        if not request.user.is_staff:
+            self._cancel_profiler()
+            return response
+        profiler, self._profiler = self._profiler, None
+        try:
+            if hasattr(response, 'render'):
+                response.render()
+        finally:
+            profile_id = profiler.stop(response.status_code)
+        response[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # an exception DRF does not handle skips finalize_response()
+            if self._profiler is not None:
+                self._cancel_profiler()
+
+    def _cancel_profiler(self) -> None:
+        self._profiler.cancel()
+        self._profiler = None
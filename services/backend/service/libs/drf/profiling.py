@@ -0,0 +1,132 @@
+import cProfile
+import pstats
+import time
+import uuid
+from collections import defaultdict
+
+import arrow
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+
+from libs.db.queries import QueryRecorder
+from libs.drf.serializers import ValuesSerializer
+
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_CACHE_KEY = 'profile:{profile_id}'
+PROFILE_TIMEOUT = 24 * 60 * 60
+TOP_FUNCTIONS_LIMIT = 50
+SLOWEST_QUERIES_LIMIT = 20
+
+# the outermost calls of a serializer, nested serializers run inside them
+SERIALIZER_ENTRY_POINTS = tuple(
+    cProfile.label(serializer.data.fget.__code__)
+    for serializer in (BaseSerializer, ValuesSerializer)
+)
+
+
+def is_profiling_requested(request: Request) -> bool:
+    return PROFILE_QUERY_PARAM in request.query_params or PROFILE_HEADER in request.headers
+
+
+class RequestProfiler:
+    '''
+    Runs a request under cProfile together with a QueryRecorder and stores
+    the report in the cache for PROFILE_TIMEOUT, to be downloaded by the id.
+
+    The report lists the functions with the highest cumulative time, the
+    queries with their timings and call sites, the statements executed more
+    than once, e.g. by an N+1, and the time spent in serializers.
+    '''
+
+    def __init__(self, request: Request, view_name: str):
+        self.request = request
+        self.view_name = view_name
+        self.profile_id = uuid.uuid4().hex
+        self._profile = cProfile.Profile()
+        self._recorder = QueryRecorder()
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        self._recorder.__enter__()
+        self._started_at = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self, status_code: int) -> str:
+        self._profile.disable()
+        duration = time.perf_counter() - self._started_at
+        self._recorder.__exit__(None, None, None)
+        cache.set(
+            PROFILE_CACHE_KEY.format(profile_id=self.profile_id),
+            self.get_report(duration, status_code),
+            timeout=PROFILE_TIMEOUT,
+        )
+        return self.profile_id
+
+    def cancel(self) -> None:
+        self._profile.disable()
+        self._recorder.__exit__(None, None, None)
+
+    @staticmethod
+    def load(profile_id: str) -> dict | None:
+        return cache.get(PROFILE_CACHE_KEY.format(profile_id=profile_id))
+
+    def get_report(self, duration: float, status_code: int) -> dict:
+        stats = pstats.Stats(self._profile).stats
+        return {
+            'id': self.profile_id,
+            'created_at': arrow.utcnow().isoformat(),
+            'user': self.request.user.get_username(),
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'view': self.view_name,
+            'status': status_code,
+            'duration': duration,
+            'serializer_time': sum(
+                stats[entry_point][3] for entry_point in SERIALIZER_ENTRY_POINTS if entry_point in stats
+            ),
+            'queries': self._get_queries_report(),
+            'functions': [
+                {
+                    'function': f'{filename}:{lineno}({name})',
+                    'calls': calls,
+                    'total_time': total_time,
+                    'cumulative_time': cumulative_time,
+                }
+                for (filename, lineno, name), (_, calls, total_time, cumulative_time, _) in sorted(
+                    stats.items(), key=lambda item: item[1][3], reverse=True
+                )[:TOP_FUNCTIONS_LIMIT]
+            ],
+        }
+
+    def _get_queries_report(self) -> dict:
+        by_sql = defaultdict(list)
+        for query in self._recorder.queries:
+            by_sql[query.sql].append(query)
+        return {
+            'count': self._recorder.count,
+            'duration': self._recorder.duration,
+            'slowest': [
+                {
+                    'alias': query.alias,
+                    'sql': query.sql,
+                    'duration': query.duration,
+                    'call_site': query.call_site,
+                }
+                for query in sorted(
+                    self._recorder.queries, key=lambda query: query.duration, reverse=True
+                )[:SLOWEST_QUERIES_LIMIT]
+            ],
+            'duplicates': [
+                {
+                    'sql': sql,
+                    'count': len(queries),
+                    'duration': sum(query.duration for query in queries),
+                    'call_sites': list(dict.fromkeys(query.call_site for query in queries)),
+                }
+                for sql, queries in sorted(by_sql.items(), key=lambda item: len(item[1]), reverse=True)
+                if len(queries) > 1
+            ],
+        }
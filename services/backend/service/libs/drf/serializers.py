@@ -0,0 +1,94 @@
+import operator
+from collections import defaultdict
+from typing import Any, Callable, Iterable
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+FieldSpec = str | tuple[str, serializers.Field] | None
+
+
+def group_by(rows: Iterable[tuple], attribute: str) -> dict[Any, list[tuple]]:
+    groups = defaultdict(list)
+    get_key = operator.attrgetter(attribute)
+    for row in rows:
+        groups[get_key(row)].append(row)
+    return groups
+
+
+class ValuesSerializer:
+    '''
+    Read-only serializer of named values_list() rows.
+
+    `fields` maps output names to lookups. A lookup may come with a DRF field
+    whose to_representation() formats non-null values the way ModelSerializer
+    would, and a field without a lookup is filled by the get_<name>() method.
+    The plan is compiled once per class, so serializing a row is a loop over
+    attrgetters instead of a walk over bound fields and model instances.
+
+    Nested data is loaded in bulk for all rows by load_related().
+    '''
+    fields: dict[str, FieldSpec] = {}
+    # lookups that are only read by get_<name>() methods
+    extra_lookups: tuple[str, ...] = ()
+
+    lookups: tuple[str, ...] = ()
+    _plan: tuple[tuple[str, Callable, Callable | None, bool], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        lookups = []
+        plan = []
+        for name, spec in cls.fields.items():
+            if spec is None:
+                plan.append((name, getattr(cls, f'get_{name}'), None, True))
+                continue
+            lookup, field = (spec, None) if isinstance(spec, str) else spec
+            lookups.append(lookup)
+            plan.append((
+                name,
+                operator.attrgetter(lookup),
+                field.to_representation if field is not None else None,
+                False,
+            ))
+        lookups.extend(cls.extra_lookups)
+        cls.lookups = tuple(dict.fromkeys(lookups))
+        cls._plan = tuple(plan)
+
+    def __init__(self, instance, many: bool = False, context: dict | None = None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @classmethod
+    def get_rows(cls, queryset: QuerySet, *lookups: str) -> QuerySet:
+        '''Turns the queryset into named rows with the lookups of the plan.'''
+        if not queryset.query.combinator:
+            queryset = queryset.prefetch_related(None)
+        return queryset.values_list(
+            *dict.fromkeys(cls.lookups + lookups), named=True
+        )
+
+    def load_related(self, rows: list[tuple]) -> None:
+        pass
+
+    def to_representation(self, row: tuple) -> dict:
+        ret = {}
+        for name, get_value, to_representation, is_method in self._plan:
+            if is_method:
+                ret[name] = get_value(self, row)
+                continue
+            value = get_value(row)
+            if value is not None and to_representation is not None:
+                value = to_representation(value)
+            ret[name] = value
+        return ret
+
+    @property
+    def data(self) -> list[dict] | dict:
+        if self.many:
+            rows = list(self.instance)
+            self.load_related(rows)
+            return [self.to_representation(row) for row in rows]
+        self.load_related([self.instance])
+        return self.to_representation(self.instance)
@@ -0,0 +1,84 @@
+import time
+
+from django.http import HttpRequest, HttpResponse
+
+from libs.db.queries import QueryRecorder
+from libs.metrics.registry import registry
+from libs.metrics.requests import start_cache_results, stop_cache_results
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNRESOLVED_VIEW = 'unresolved'
+
+duration = registry.histogram(
+    'http_request_duration_seconds',
+    'Time to build the response of the request.',
+    ('view', 'method', 'params', 'status'),
+)
+response_size = registry.histogram(
+    'http_response_size_bytes',
+    'Size of the response body, streaming responses are not counted.',
+    ('view', 'method', 'params'),
+    buckets=SIZE_BUCKETS,
+)
+db_queries = registry.counter(
+    'http_request_db_queries_total',
+    'Database queries executed by the requests.',
+    ('view', 'method', 'params'),
+)
+db_time = registry.counter(
+    'http_request_db_seconds_total',
+    'Time the requests spent in database queries.',
+    ('view', 'method', 'params'),
+)
+cache_lookups = registry.counter(
+    'http_request_cache_lookups_total',
+    'Cache lookups of the requests by cache and result, e.g. hits or misses.',
+    ('view', 'method', 'cache', 'result'),
+)
+
+
+class RequestMetricsMiddleware:
+    '''
+    Records the latency, the response size, the database queries and the cache
+    lookups of every request, labelled by the view class and the method.
+
+    Views list the query parameters that change their cost in
+    `metrics_query_params`, e.g. the search of the client list, and the ones
+    present in the request become the `params` label. Other parameters are
+    not recorded, so the number of series stays bounded.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        cache_results, token = start_cache_results()
+        started_at = time.perf_counter()
+        try:
+            with QueryRecorder(stack_depth=0, keep_queries=False) as recorder:
+                response = self.get_response(request)
+        finally:
+            stop_cache_results(token)
+        elapsed = time.perf_counter() - started_at
+
+        view, params = self._get_view_labels(request)
+        labels = {'view': view, 'method': request.method, 'params': params}
+        duration.observe(elapsed, status=f'{response.status_code // 100}xx', **labels)
+        if not response.streaming:
+            response_size.observe(len(response.content), **labels)
+        if recorder.count:
+            db_queries.inc(recorder.count, **labels)
+            db_time.inc(recorder.duration, **labels)
+        for (cache_name, result), count in cache_results.items():
+            cache_lookups.inc(count, view=view, method=request.method, cache=cache_name, result=result)
+        return response
+
+    @staticmethod
+    def _get_view_labels(request: HttpRequest) -> tuple[str, str]:
+        if request.resolver_match is None:
+            return UNRESOLVED_VIEW, ''
+        view = getattr(request.resolver_match.func, 'view_class', request.resolver_match.func)
+        params = '+'.join(
+            param for param in getattr(view, 'metrics_query_params', ()) if param in request.GET
+        )
+        return view.__name__, params
@@ -0,0 +1,205 @@
+import atexit
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__package__)
+
+METRIC_KEY = 'metrics:{name}'
+FLUSH_INTERVAL_IN_SECONDS = 10
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# a collector returns the label values and the value of every series
+Collect = Callable[[], Iterable[tuple[tuple[str, ...], float]]]
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return str(int(value)) if value == int(value) else repr(float(value))
+
+
+def format_sample(name: str, labels: str, value: float) -> str:
+    return f'{name}{{{labels}}} {format_value(value)}' if labels else f'{name} {format_value(value)}'
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, label_names: tuple[str, ...]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def _format_labels(self, labels: dict) -> str:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f'{self.name} has labels {", ".join(self.label_names)}')
+        return ','.join(
+            f'{name}="{escape_label_value(labels[name])}"' for name in self.label_names
+        )
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, value: float = 1, **labels) -> None:
+        self.registry.add(self.name, self._format_labels(labels), value)
+
+    def render(self, fields: dict[str, float]) -> list[str]:
+        return [format_sample(self.name, labels, value) for labels, value in sorted(fields.items())]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        formatted_labels = self._format_labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        # buckets are stored non-cumulative, one increment per observation
+        if index < len(self.buckets):
+            self.registry.add(self.name, f'bucket:{index}\t{formatted_labels}', 1)
+        self.registry.add(self.name, f'sum\t{formatted_labels}', value)
+        self.registry.add(self.name, f'count\t{formatted_labels}', 1)
+
+    def render(self, fields: dict[str, float]) -> list[str]:
+        series: dict[str, dict[str, float]] = defaultdict(dict)
+        for field, value in fields.items():
+            series_name, labels = field.split('\t', 1)
+            series[labels][series_name] = value
+
+        lines = []
+        for labels, values in sorted(series.items()):
+            prefix = f'{labels},' if labels else ''
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += values.get(f'bucket:{index}', 0)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{format_value(bound)}"}} {format_value(cumulative)}')
+            count = values.get('count', 0)
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {format_value(count)}')
+            lines.append(format_sample(f'{self.name}_sum', labels, values.get('sum', 0)))
+            lines.append(format_sample(f'{self.name}_count', labels, count))
+        return lines
+
+
+class MetricsRegistry:
+    '''
+    Counters and histograms aggregated across processes in Redis.
+
+    Observations are buffered in the process and added to one Redis hash per
+    metric with HINCRBYFLOAT, at most every FLUSH_INTERVAL_IN_SECONDS, so
+    recording stays a dict update and every gunicorn and Celery worker adds
+    up to the same totals. Celery workers flush after every task, since an
+    idle worker would keep its last observations. Gauges that are read at
+    scrape time, e.g. queue lengths, are registered as collectors. render()
+    returns the Prometheus text format.
+
+    Metrics are best effort: Redis errors are logged and the buffer dropped.
+    '''
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[tuple[str, str, tuple[str, ...], Collect]] = []
+        self._buffer: dict[tuple[str, str], float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self, name, documentation, label_names, buckets=buckets))
+
+    def collector(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Callable[[Collect], Collect]:
+        '''Registers a function returning the values of a gauge when metrics are rendered.'''
+        def register(collect: Collect) -> Collect:
+            self.collectors.append((name, documentation, label_names, collect))
+            return collect
+        return register
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f'metric {metric.name} is registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, name: str, field: str, value: float) -> None:
+        with self._lock:
+            self._buffer[name, field] += value
+            due = time.monotonic() - self._flushed_at >= FLUSH_INTERVAL_IN_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            buffer, self._buffer = self._buffer, defaultdict(float)
+            self._flushed_at = time.monotonic()
+        if not buffer:
+            return
+        try:
+            pipeline = get_redis_connection(settings.DEFAULT_CACHE_DB).pipeline(transaction=False)
+            for (name, field), value in buffer.items():
+                pipeline.hincrbyfloat(METRIC_KEY.format(name=name), field, value)
+            pipeline.execute()
+        except RedisError:
+            logger.exception(f'Dropped {len(buffer)} metric values')
+
+    def reset(self) -> None:
+        '''Drops the buffer, e.g. in a forked process, which must not flush the values of its parent.'''
+        self._lock = threading.Lock()
+        self._buffer = defaultdict(float)
+        self._flushed_at = time.monotonic()
+
+    def render(self) -> str:
+        redis = get_redis_connection(settings.DEFAULT_CACHE_DB)
+        pipeline = redis.pipeline(transaction=False)
+        for name in self.metrics:
+            pipeline.hgetall(METRIC_KEY.format(name=name))
+
+        lines = []
+        for metric, fields in zip(self.metrics.values(), pipeline.execute()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(
+                metric.render({field.decode(): float(value) for field, value in fields.items()})
+            )
+        for name, documentation, label_names, collect in self.collectors:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            for label_values, value in collect():
+                labels = ','.join(
+                    f'{label_name}="{escape_label_value(label_value)}"'
+                    for label_name, label_value in zip(label_names, label_values)
+                )
+                lines.append(format_sample(name, labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush)
@@ -0,0 +1,20 @@
+from collections import Counter
+from contextvars import ContextVar
+
+# (cache name, result) counts of the request being served
+_cache_results: ContextVar[Counter | None] = ContextVar('cache_results', default=None)
+
+
+def count_cache_result(cache_name: str, result: str) -> None:
+    '''Counts a cache lookup for the metrics of the current request, outside of requests it is a no-op.'''
+    if (results := _cache_results.get()) is not None:
+        results[cache_name, result] += 1
+
+
+def start_cache_results() -> tuple[Counter, object]:
+    results = Counter()
+    return results, _cache_results.set(results)
+
+
+def stop_cache_results(token) -> None:
+    _cache_results.reset(token)
@@ -42,6 +42,9 @@ imports = (
     'apps.sms.tasks.sms_sending',
     'apps.sms.tasks.sms_aggregating',
     'apps.email.tasks.daily_updates_emailing',
+    'apps.call_center.tasks.client_indexing',
+    'apps.call_center.tasks.client_detail_cache',
+    'apps.call_center.tasks.outcome_side_effects',
 )
 task_routes = {
     'apps.sms.tasks.sms_sending.SMSEventPeriodicTask': {
@@ -62,6 +65,21 @@ task_routes = {
     'apps.email.tasks.daily_updates_emailing.SendDailyUpdatesEmailTask': {
         'queue': celery_consts.CeleryQueue.EMAIL.value
     },
+    'apps.call_center.tasks.client_indexing.ClientTypeaheadIndexingPeriodicTask': {
+        'queue': celery_consts.CeleryQueue.DEFAULT.value
+    },
+    'apps.call_center.tasks.client_indexing.ClientCallerIdIndexingPeriodicTask': {
+        'queue': celery_consts.CeleryQueue.DEFAULT.value
+    },
+    'apps.call_center.tasks.client_detail_cache.ClientDetailCacheInvalidationTask': {
+        'queue': celery_consts.CeleryQueue.DEFAULT.value
+    },
+    'apps.call_center.tasks.client_detail_cache.ClientCardRefreshPeriodicTask': {
+        'queue': celery_consts.CeleryQueue.DEFAULT.value
+    },
+    'apps.call_center.tasks.outcome_side_effects.OutcomeSideEffectsTask': {
+        'queue': celery_consts.CeleryQueue.DEFAULT.value
+    },
 }
 beat_schedule = {
     'call_sms_event_every_one_minute': {
@@ -85,4 +103,41 @@ beat_schedule = {
             'queue': celery_consts.CeleryQueue.EMAIL.value,
         },
     },
+    'client_typeahead_indexing_every_five_minutes': {
+        'task': 'call_center.client_typeahead_indexing',
+        'schedule': celery_consts.EVERY_FIVE_MINUTES,
+        'options': {
+            'queue': celery_consts.CeleryQueue.DEFAULT.value,
+        },
+    },
+    'client_typeahead_rebuild_daily_at_1230pm': {
+        'task': 'call_center.client_typeahead_indexing',
+        'schedule': celery_consts.DAILY_AT_1230PM_UTC,
+        'kwargs': {'full_rebuild': True},
+        'options': {
+            'queue': celery_consts.CeleryQueue.DEFAULT.value,
+        },
+    },
+    'client_card_refresh_every_five_minutes': {
+        'task': 'call_center.client_card_refresh',
+        'schedule': celery_consts.EVERY_FIVE_MINUTES,
+        'options': {
+            'queue': celery_consts.CeleryQueue.DEFAULT.value,
+        },
+    },
+    'client_caller_id_indexing_every_five_minutes': {
+        'task': 'call_center.client_caller_id_indexing',
+        'schedule': celery_consts.EVERY_FIVE_MINUTES,
+        'options': {
+            'queue': celery_consts.CeleryQueue.DEFAULT.value,
+        },
+    },
+    'client_caller_id_rebuild_daily_at_1230pm': {
+        'task': 'call_center.client_caller_id_indexing',
+        'schedule': celery_consts.DAILY_AT_1230PM_UTC,
+        'kwargs': {'full_rebuild': True},
+        'options': {
+            'queue': celery_consts.CeleryQueue.DEFAULT.value,
+        },
+    },
 }
@@ -2,6 +2,7 @@ import datetime
 import sys
 import logging
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import sentry_sdk
 from decouple import config
@@ -25,7 +26,14 @@ ALLOWED_HOSTS = config('DJANGO_ALLOWED_HOST', cast=str_split)
 CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', cast=str_split)
 LOG_DB_QUERIES = config('LOG_DB_QUERIES', cast=bool, default=False)
 CACHE_STORAGE = config('CACHE_STORAGE')
+# flushed by the tests, by default database 15 of the cache server
+TEST_CACHE_STORAGE = config(
+    'TEST_CACHE_STORAGE', default=urlsplit(CACHE_STORAGE)._replace(path='/15').geturl()
+)
 USE_SENTRY = config('USE_SENTRY', cast=bool, default=False)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# run the SMS follow-up of patient outcomes in a Celery task after the request
+DEFER_OUTCOME_SIDE_EFFECTS = config('DEFER_OUTCOME_SIDE_EFFECTS', cast=bool, default=False)
 
 # Dialpad integration
 SEND_DIALPAD_SMS = config('SEND_DIALPAD_SMS', cast=bool, default=False)
@@ -72,6 +80,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'libs.metrics.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -120,6 +129,36 @@ DATABASES = {
         'CONN_HEALTH_CHECKS': True,  # Verify connection health before reuse
     },
 }
+if config('POSTGRES_POOL', cast=bool, default=False):
+    DATABASES['default'].update({
+        'ENGINE': 'libs.db.backends.postgresql_pool',
+        # connections are returned to the pool at the end of every request and task
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': config('POSTGRES_POOL_MIN_SIZE', cast=int, default=1),
+                'max_size': config('POSTGRES_POOL_MAX_SIZE', cast=int, default=4),
+                'timeout': config('POSTGRES_POOL_TIMEOUT', cast=float, default=10),
+                'max_idle': config('POSTGRES_POOL_MAX_IDLE', cast=float, default=300),
+                'max_lifetime': config('POSTGRES_POOL_MAX_LIFETIME', cast=float, default=3600),
+            },
+        },
+    })
+# pgbouncer in transaction mode gives every transaction any server connection,
+# so cursors must not outlive a transaction; prepared statements are already off
+if config('POSTGRES_PGBOUNCER_TRANSACTION_MODE', cast=bool, default=False):
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+# optional streaming replica, see libs.db.routers
+if REPLICA_POSTGRES_HOST := config('REPLICA_POSTGRES_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': REPLICA_POSTGRES_HOST,
+        'PORT': config('REPLICA_POSTGRES_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['libs.db.routers.ReplicaRouter']
+# reads of a user stay on the primary for this long after a write, to cover the replication lag
+REPLICA_STICKINESS_IN_SECONDS = config('REPLICA_STICKINESS_IN_SECONDS', cast=int, default=30)
 
 
 # Password validation
@@ -192,7 +231,7 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'libs.drf.renderers.ORJSONRenderer',
     ]
 }
 